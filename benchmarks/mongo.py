@@ -0,0 +1,189 @@
+# benchmarks/mongo.py
+# MongoDB em memória com o subconjunto da API do pymongo usado por utils/db.py
+
+import copy
+import itertools
+import threading
+from types import SimpleNamespace
+
+import utils.db
+
+
+def _values(value):
+    # Campos com lista casam com qualquer um dos elementos, como no MongoDB
+    return value if isinstance(value, list) else [value]
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        values = _values(doc.get(field))
+        if isinstance(condition, dict):
+            for operator, argument in condition.items():
+                if operator == "$in":
+                    if not any(value in argument for value in values):
+                        return False
+                elif operator == "$gte":
+                    if doc.get(field) is None or doc[field] < argument:
+                        return False
+                else:
+                    raise NotImplementedError(f"Operador não suportado: {operator}")
+        elif condition not in values:
+            return False
+    return True
+
+
+def _project(doc, projection):
+    if not projection:
+        return copy.copy(doc)
+    fields = [field for field, include in projection.items() if include]
+    result = {field: doc[field] for field in fields if field in doc}
+    if projection.get("_id", 1) and "_id" in doc:
+        result["_id"] = doc["_id"]
+    return result
+
+
+class MemoryCollection:
+    """
+    Coleção em memória. Os índices criados com create_index são mantidos como
+    dicionários valor -> _ids, então consultas por campo indexado (url, bands)
+    não percorrem a coleção inteira, como no servidor real.
+    """
+
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self.docs = {}
+        self._indexes = {"_id_": {"key": [("_id", 1)]}}
+        self._by_field = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    def create_index(self, field, name=None, **options):
+        name = name or f"{field}_1"
+        with self._lock:
+            self._indexes[name] = {"key": [(field, 1)], **options}
+            if field not in self._by_field:
+                self._by_field[field] = {}
+                for _id, doc in self.docs.items():
+                    self._index_doc(field, _id, doc)
+        return name
+
+    def index_information(self):
+        with self._lock:
+            return copy.deepcopy(self._indexes)
+
+    def drop_index(self, name):
+        with self._lock:
+            field = self._indexes.pop(name)["key"][0][0]
+            if not any(info["key"][0][0] == field for info in self._indexes.values()):
+                self._by_field.pop(field, None)
+
+    def _index_doc(self, field, _id, doc):
+        for value in _values(doc.get(field)):
+            self._by_field[field].setdefault(value, set()).add(_id)
+
+    def _candidates(self, query):
+        for field, condition in query.items():
+            if field not in self._by_field:
+                continue
+            if isinstance(condition, dict):
+                if "$in" not in condition:
+                    continue
+                keys = condition["$in"]
+            else:
+                keys = [condition]
+            index = self._by_field[field]
+            return sorted(set().union(*(index.get(key, ()) for key in keys)))
+        return list(self.docs)
+
+    def find(self, query=None, projection=None, **kwargs):
+        query = query or {}
+        with self._lock:
+            found = [_project(self.docs[_id], projection) for _id in self._candidates(query)
+                     if _matches(self.docs[_id], query)]
+        return iter(found)
+
+    def find_one(self, query=None, projection=None):
+        return next(self.find(query, projection), None)
+
+    def insert_one(self, doc):
+        with self._lock:
+            doc = dict(doc)
+            doc.setdefault("_id", next(self._ids))
+            self.docs[doc["_id"]] = doc
+            for field in self._by_field:
+                self._index_doc(field, doc["_id"], doc)
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    def update_one(self, filter, update, upsert=False):
+        with self._lock:
+            existing = self.find_one(filter, {"_id": 1})
+            if existing is not None:
+                if "$set" in update:
+                    doc = self.docs[existing["_id"]]
+                    doc.update(update["$set"])
+                    for field in self._by_field:
+                        self._index_doc(field, doc["_id"], doc)
+                return SimpleNamespace(matched_count=1, upserted_id=None)
+            if not upsert:
+                return SimpleNamespace(matched_count=0, upserted_id=None)
+
+            doc = {field: value for field, value in filter.items() if not isinstance(value, dict)}
+            doc.update(update.get("$setOnInsert", {}))
+            doc.update(update.get("$set", {}))
+            return SimpleNamespace(matched_count=0, upserted_id=self.insert_one(doc).inserted_id)
+
+    def bulk_write(self, requests, ordered=True):
+        upserted_ids = {}
+        with self._lock:
+            for position, request in enumerate(requests):
+                result = self.update_one(request._filter, request._doc, request._upsert)
+                if result.upserted_id is not None:
+                    upserted_ids[position] = result.upserted_id
+        return SimpleNamespace(upserted_ids=upserted_ids)
+
+    def delete_many(self, query):
+        with self._lock:
+            ids = [_id for _id in self._candidates(query) if _matches(self.docs[_id], query)]
+            for _id in ids:
+                del self.docs[_id]
+            for index in self._by_field.values():
+                for keys in index.values():
+                    keys.difference_update(ids)
+        return SimpleNamespace(deleted_count=len(ids))
+
+
+class MemoryDatabase:
+    def __init__(self, name):
+        self.name = name
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def command(self, *args, **kwargs):
+        return {"ok": 1}
+
+
+class MemoryClient:
+    """Substitui o MongoClient: client[DB_NAME][COLLECTION_NAME] devolve uma MemoryCollection."""
+
+    def __init__(self):
+        self._databases = {}
+
+    def __getitem__(self, name):
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(name)
+        return self._databases[name]
+
+    def close(self):
+        pass
+
+
+def install():
+    """Faz utils.db usar um banco em memória vazio no lugar do MongoDB."""
+    utils.db.close_mongo_client()
+    utils.db._client = MemoryClient()
+    return utils.db._client
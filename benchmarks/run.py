@@ -0,0 +1,253 @@
+# benchmarks/run.py
+"""
+Benchmark offline do crawl, sem acesso à rede nem ao MongoDB.
+
+As páginas gravadas de cada tipo de alvo (benchmarks/fixtures) são servidas por um
+servidor HTTP local e o banco é substituído por um MongoDB em memória (ou pelo
+backend SQLite, em um arquivo temporário, com --storage sqlite); todo o resto
+(download, parse, filtro por palavras-chave, resumo, quase duplicatas e briefing)
+é o código real. Cada caso roda em um processo novo, então o pico de memória e o
+estado local (cache de URLs vistas, cache HTTP, agenda) não vazam entre os casos.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.run                                  # 10, 1000 e 10000 páginas, serial e concorrente
+    python -m benchmarks.run --pages 1000 --modes concurrent --output bench.json
+    python -m benchmarks.run --pages 1000 --storage memory sqlite   # compara os backends do banco
+    python -m benchmarks.run --baseline bench.json            # falha se houver regressão
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+# Tamanhos e modos medidos por padrão
+SIZES = (10, 1000, 10000)
+MODES = ("serial", "concurrent")
+# Bancos: MongoDB em memória ou o backend SQLite de utils/storage.py
+STORAGES = ("memory", "sqlite")
+# Etapas mostradas na tabela (o JSON traz todas)
+TABLE_STAGES = ("fetch", "parse", "select", "keywords", "summarize", "db", "write")
+# Queda de vazão (ou aumento de memória) tolerada em relação à linha de base
+TOLERANCE = 0.2
+
+
+def prepare_state(work_dir, storage="memory"):
+    """Aponta o estado local para work_dir, troca o banco (storage) e desliga o limite de taxa."""
+    import benchmarks.mongo
+    import utils.db
+    import utils.http_cache
+    import utils.metrics
+    import utils.page_cache
+    import utils.policy
+    import utils.schedule
+    import utils.storage
+
+    utils.http_cache.HTTP_CACHE_PATH = os.path.join(work_dir, "http_cache.json")
+    utils.http_cache.clear_http_cache()
+    utils.schedule.SCHEDULE_PATH = os.path.join(work_dir, "schedule.json")
+    utils.schedule.clear_schedule()
+    utils.db.SEEN_CACHE_PATH = os.path.join(work_dir, "seen_urls.bloom")
+    utils.page_cache.PAGE_CACHE_DIR = os.path.join(work_dir, "page_cache")
+    utils.page_cache.clear_page_cache()
+    utils.db._seen_cache = None
+    utils.metrics.METRICS_DIR = os.path.join(work_dir, "reports")
+    # Todos os alvos estão no mesmo host local: o limite de taxa só mediria a espera
+    utils.policy.RATE_PER_HOST = 0
+    utils.policy.reset_policy()
+    utils.db.close_storage()
+    if storage == "sqlite":
+        utils.db.STORAGE_BACKEND = "sqlite"
+        utils.storage.SQLITE_PATH = os.path.join(work_dir, "scrapper.sqlite3")
+    else:
+        utils.db.STORAGE_BACKEND = "mongo"
+        benchmarks.mongo.install()
+
+
+def silence_stdout():
+    """Descarta o que for impresso no processo (inicializador dos workers de parse sem --verbose)."""
+    sys.stdout = open(os.devnull, "w")
+
+
+def run_case(mode, pages, base_url, work_dir, parse_workers=0, max_workers=None, storage="memory", verbose=True):
+    """
+    Executa um caso no processo atual e retorna as medições. Com verbose=False os
+    processos de parse do modo concorrente também não imprimem nada.
+    """
+    import benchmarks.site
+    import scrapers.engine
+    import utils.crawler
+    import utils.db
+    import utils.fetch
+    import utils.md
+    import utils.metrics
+
+    if mode not in MODES:
+        raise ValueError(f"Opção inválida: {mode}")
+    if storage not in STORAGES:
+        raise ValueError(f"Opção inválida: {storage}")
+
+    prepare_state(work_dir, storage)
+    targets = benchmarks.site.make_targets(base_url, pages)
+    max_workers = max_workers or utils.fetch.MAX_WORKERS
+    utils.metrics.reset()
+
+    start = time.perf_counter()
+    utils.md.open_briefing(os.path.join(work_dir, "briefing.md"))
+    try:
+        if mode == "serial":
+            for target in targets:
+                scrapers.engine.get_child_pages(target)
+        else:
+            # Um único host local: o limite por host passa a ser o limite total
+            utils.crawler.crawl(targets, max_workers=max_workers, max_per_host=max_workers,
+                                parse_workers=parse_workers, initializer=None if verbose else silence_stdout)
+    finally:
+        utils.md.close_briefing()
+    seconds = time.perf_counter() - start
+    report = utils.metrics.report()
+    utils.db.close_storage()
+    utils.db.close_mongo_client()
+    counters = {name: entry["total"] for name, entry in report["counters"].items()}
+    # A vazão conta só as notícias baixadas (ou lidas do feed) e processadas: os links
+    # descartados pelo pré-filtro ou já registrados não custam nada e não entram
+    processed = (counters.get("pages_fetched", 0) + counters.get("fetch_avoided", 0)
+                 - (len(targets) - counters.get("index_unchanged", 0)))
+
+    return {
+        "mode": mode,
+        "storage": storage,
+        "pages": pages,
+        "targets": len(targets),
+        "parse_workers": parse_workers if mode == "concurrent" else 0,
+        "pages_processed": processed,
+        "seconds": round(seconds, 3),
+        "pages_per_second": round(processed / seconds, 2),
+        "counters": counters,
+        "stages": {stage: {key: entry[key] for key in ("count", "sum", "mean", "max")}
+                   for stage, entry in report["stages"].items()},
+    }
+
+
+def _child(conn, mode, pages, base_url, parse_workers, max_workers, verbose, storage):
+    with tempfile.TemporaryDirectory() as work_dir:
+        with open(os.devnull, "w") as devnull, \
+                contextlib.redirect_stdout(sys.stdout if verbose else devnull):
+            result = run_case(mode, pages, base_url, work_dir, parse_workers, max_workers, storage, verbose)
+    # ru_maxrss em KB no Linux (em bytes no macOS)
+    scale = 1 if sys.platform == "darwin" else 1024
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20, 1)
+    result["peak_rss_workers_mb"] = round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 2 ** 20, 1)
+    conn.send(result)
+    conn.close()
+
+
+def run_isolated(mode, pages, base_url, parse_workers=0, max_workers=None, verbose=False, storage="memory"):
+    """Executa um caso em um processo novo (pico de memória e estado só daquele caso)."""
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child,
+                              args=(sender, mode, pages, base_url, parse_workers, max_workers, verbose, storage))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        raise RuntimeError(f"Caso {mode}/{pages} terminou sem resultado (código {process.exitcode})")
+    finally:
+        process.join()
+    return result
+
+
+def format_table(results):
+    header = ["modo", "banco", "páginas", "tempo(s)", "págs/s", "RSS(MB)"] + [f"{stage}(ms)" for stage in TABLE_STAGES]
+    rows = [header]
+    for result in results:
+        row = [result["mode"], result.get("storage", "memory"), str(result["pages"]), f"{result['seconds']:.2f}", f"{result['pages_per_second']:.1f}",
+               f"{result['peak_rss_mb']:.0f}"]
+        for stage in TABLE_STAGES:
+            mean = result["stages"].get(stage, {}).get("mean")
+            row.append("-" if mean is None else f"{mean * 1000:.2f}")
+        rows.append(row)
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def find_regressions(results, baseline, tolerance=TOLERANCE):
+    """Compara com os resultados de uma execução anterior (mesmo modo, banco e tamanho)."""
+    def key(entry):
+        return entry["mode"], entry.get("storage", "memory"), entry["pages"]
+
+    previous = {key(entry): entry for entry in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(key(result))
+        if before is None:
+            continue
+        if result["pages_per_second"] < before["pages_per_second"] * (1 - tolerance):
+            regressions.append(f"{result['mode']}/{result['pages']}: vazão {before['pages_per_second']} -> "
+                               f"{result['pages_per_second']} págs/s")
+        if result["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{result['mode']}/{result['pages']}: memória {before['peak_rss_mb']} -> "
+                               f"{result['peak_rss_mb']} MB")
+    return regressions
+
+
+def parse_args(argv=None):
+    import utils.crawler
+
+    parser = argparse.ArgumentParser(description="Benchmark offline do crawl com páginas gravadas.")
+    parser.add_argument("--pages", type=int, nargs="+", default=list(SIZES),
+                        help="Quantidades de páginas filhas (padrão: 10 1000 10000)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES),
+                        help="Modos medidos (padrão: serial concurrent)")
+    parser.add_argument("--storage", nargs="+", choices=STORAGES, default=["memory"],
+                        help="Bancos medidos (padrão: memory)")
+    parser.add_argument("--parse-workers", type=int, default=utils.crawler.PARSE_WORKERS,
+                        help="Processos de parse do modo concorrente")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Requisições simultâneas do modo concorrente")
+    parser.add_argument("--output", help="Grava os resultados em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Variação tolerada em relação à linha de base (padrão: 0.2)")
+    parser.add_argument("--verbose", action="store_true", help="Mostra o log do crawl")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    import benchmarks.site
+
+    args = parse_args(argv)
+    results = []
+    with benchmarks.site.LocalSite() as site:
+        for pages in args.pages:
+            for mode in args.modes:
+                for storage in args.storage:
+                    print(f"[INFO] Benchmark | {mode} | {storage} | {pages} páginas")
+                    results.append(run_isolated(mode, pages, site.base_url, args.parse_workers,
+                                                args.max_workers, args.verbose, storage))
+
+    print(format_table(results))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"[ERROR] Regressão | {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+# benchmarks/site.py
+# Site local que serve as páginas gravadas dos alvos (índices e notícias) para o benchmark
+
+import math
+import multiprocessing
+import os
+import random
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Páginas filhas por alvo (o "depth" de cada alvo gerado)
+PAGES_PER_TARGET = 50
+# Uma a cada KEYWORDLESS_EVERY notícias não tem palavras-chave (nem na chamada do índice)
+# e é descartada pelo pré-filtro, sem ser baixada
+KEYWORDLESS_EVERY = 4
+
+KINDS = ("pcl", "sal")
+
+# Como cada tipo lista as notícias no índice e escreve os parágrafos, como nas páginas gravadas
+LINK_TEMPLATES = {
+    "pcl": '    <article class="item"><div class="t"><a href="{href}">{title}</a></div><p class="s">{teaser}</p></article>',
+    "sal": '      <div class="card"><h3 class="headline-extra-small"><a href="{href}">{title}</a></h3>'
+           '<p class="body-small">{teaser}</p></div>',
+}
+PARAGRAPH_TEMPLATES = {
+    "pcl": "      <p>{}</p>",
+    "sal": '        <p class="body-extra-large">{}</p>',
+}
+
+# Vocabulário dos textos gerados; cada notícia tem o seu texto, para não serem quase duplicatas
+WORDS = """
+empresa mercado governo projeto usuários dados plataforma lançamento versão recurso sistema rede
+aplicativo serviço modelo tecnologia pesquisa universidade laboratório equipe resultado estudo
+investimento startup produto cliente setor indústria banco pagamento segurança privacidade nuvem
+servidor chip processador bateria tela câmera sensor energia carro robô satélite internet
+brasileiro global nacional regional novo recente primeiro maior menor rápido eficiente seguro
+aberto público privado digital móvel anunciou apresentou lançou afirmou revelou confirmou
+prevê pretende deve pode vai começou ampliou reduziu aumentou testou desenvolveu integrou
+semana mês ano trimestre semestre hoje ontem amanhã prazo meta custo preço valor receita
+bilhões milhões usuários países cidades escolas hospitais fábricas lojas parceiros analistas
+""".split()
+# sal não tem chamada no índice: as notícias com palavras-chave levam uma delas no título,
+# senão o pré-filtro descartaria todas e o benchmark não mediria o trabalho das notícias
+TITLE_KEYWORDS = ("Inteligência artificial", "Inovação", "Educação")
+KEYWORD_SENTENCES = (
+    "A inteligência artificial é o centro da nova estratégia da empresa",
+    "O projeto usa inteligência artificial para analisar os dados em tempo real",
+    "Segundo os pesquisadores, a inovação deve chegar ao mercado brasileiro ainda este ano",
+)
+
+_ARTICLE_PATH = re.compile(r"^/(pcl|sal)/(\d+)/noticia-(\d+)$")
+_INDEX_PATH = re.compile(r"^/(pcl|sal)/(\d+)/$")
+
+_fixtures = {}
+
+
+def load_fixture(name):
+    """Lê (uma única vez) uma das páginas gravadas em benchmarks/fixtures."""
+    if name not in _fixtures:
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            _fixtures[name] = f.read()
+    return _fixtures[name]
+
+
+def _sentence(rng, size):
+    words = [rng.choice(WORDS) for _ in range(size)]
+    return " ".join(words).capitalize()
+
+
+def has_keywords(number):
+    return number % KEYWORDLESS_EVERY != KEYWORDLESS_EVERY - 1
+
+
+def article_title(kind, target_index, number):
+    rng = random.Random(f"title/{kind}/{target_index}/{number}")
+    title = _sentence(rng, 8)
+    if kind == "sal" and has_keywords(number):
+        title = f"{rng.choice(TITLE_KEYWORDS)}: {title.lower()}"
+    return f"{title} ({kind.upper()} {target_index}-{number})"
+
+
+def article_paragraphs(kind, target_index, number, paragraphs=6):
+    """Parágrafos da notícia, sempre os mesmos para a mesma URL."""
+    rng = random.Random(f"body/{kind}/{target_index}/{number}")
+    result = []
+    for position in range(paragraphs):
+        sentences = [_sentence(rng, rng.randint(12, 24)) for _ in range(rng.randint(3, 5))]
+        if position == 0 and has_keywords(number):
+            sentences.insert(0, rng.choice(KEYWORD_SENTENCES))
+        result.append(". ".join(sentences) + ".")
+    return result
+
+
+def article_path(kind, target_index, number):
+    return f"/{kind}/{target_index}/noticia-{number}"
+
+
+def render_index(kind, target_index, base_url, depth=PAGES_PER_TARGET):
+    links = []
+    for number in range(depth):
+        path = article_path(kind, target_index, number)
+        # pcl usa links absolutos (uri vazio); sal usa links relativos completados pelo uri
+        href = f"{base_url}{path}" if kind == "pcl" else path
+        teaser = article_paragraphs(kind, target_index, number, 1)[0][:160]
+        links.append(LINK_TEMPLATES[kind].format(href=href, title=article_title(kind, target_index, number),
+                                                 teaser=teaser))
+    return load_fixture(f"{kind}_index.html").replace("<!--LINKS-->", "\n".join(links))
+
+
+def render_article(kind, target_index, number):
+    body = "\n".join(PARAGRAPH_TEMPLATES[kind].format(paragraph)
+                     for paragraph in article_paragraphs(kind, target_index, number))
+    return (load_fixture(f"{kind}_article.html")
+            .replace("<!--TITLE-->", article_title(kind, target_index, number))
+            .replace("<!--BODY-->", body))
+
+
+def make_targets(base_url, pages, per_target=PAGES_PER_TARGET):
+    """
+    Alvos que somam 'pages' páginas filhas, alternando os tipos pcl e sal,
+    com os mesmos seletores dos alvos reais de configs/urls.json.
+    """
+    targets = []
+    for index in range(math.ceil(pages / per_target)):
+        kind = KINDS[index % len(KINDS)]
+        target = {
+            "active": True,
+            "label": f"bench-{kind}-{index}",
+            "type": kind,
+            "url": f"{base_url}/{kind}/{index}/",
+            "depth": min(per_target, pages - index * per_target),
+        }
+        if kind == "pcl":
+            target.update({
+                "parent_container": "div.tbl",
+                "child_anchor": "article div.t a",
+                "uri": "",
+                "page": {"title": "h1#id_title", "content": "div#id_text p"},
+            })
+        else:
+            target.update({
+                "anchor_selector": "h3.headline-extra-small a",
+                "uri": base_url,
+                "page": {"title": "div.news-content-container h1.headline-large",
+                         "content": "p.body-extra-large"},
+            })
+        targets.append(target)
+    return targets
+
+
+class Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 com Content-Length: os clientes reaproveitam as conexões, como nos sites reais
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        article = _ARTICLE_PATH.match(self.path)
+        index = _INDEX_PATH.match(self.path)
+        if article:
+            html = render_article(article[1], int(article[2]), int(article[3]))
+        elif index:
+            # O índice sempre lista PAGES_PER_TARGET notícias; o depth do alvo limita quantas são lidas
+            html = render_index(index[1], int(index[2]), self.server.base_url)
+        else:
+            self.send_error(404)
+            return
+
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve(ready):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    ready.put(server.base_url)
+    server.serve_forever()
+
+
+class LocalSite:
+    """
+    Servidor HTTP local, em um processo separado para não disputar o GIL com o crawl medido.
+
+        with LocalSite() as site:
+            targets = make_targets(site.base_url, 1000)
+    """
+
+    def __init__(self):
+        self.base_url = None
+        self._process = None
+
+    def __enter__(self):
+        context = multiprocessing.get_context("spawn")
+        ready = context.Queue()
+        self._process = context.Process(target=_serve, args=(ready,), daemon=True)
+        self._process.start()
+        self.base_url = ready.get(timeout=30)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._process.terminate()
+        self._process.join()
@@ -1,8 +1,17 @@
 # main.py
 
+import argparse
 import json
-import scrapers.pcl
-import scrapers.sal
+import scrapers.engine
+import utils.crawler
+import utils.daemon
+import utils.db
+import utils.http_cache
+import utils.md
+import utils.metrics
+import utils.page_cache
+import utils.reprocess
+import utils.schedule
 
 def load_urls(file_path):
     """Carrega a lista de URLs de um arquivo txt."""
@@ -10,23 +19,77 @@ def load_urls(file_path):
         data = json.load(file)
     return data
 
-def default_exception(target):
-    raise ValueError(f"Opção inválida: {target['type']}")
 
-
-def main():
+def main(concurrent=False):
     # 1. Carregar URLs
     urls = load_urls('configs/urls.json')
 
-    cases = {
-        "pcl": scrapers.pcl.get_child_pages,
-        "sal": scrapers.sal.get_child_pages
-    }
+    # Briefing aberto uma única vez; as entradas são gravadas juntas no final
+    utils.md.open_briefing()
+    utils.metrics.reset()
+
+    try:
+        # 2. Só os alvos ativos cujo intervalo de coleta já passou
+        targets = utils.schedule.due_targets(urls['target'])
+
+        # 3. Modo concorrente: todos os alvos em paralelo
+        if concurrent:
+            utils.crawler.crawl(targets)
+            return
+
+        # Tipos e campos conferidos antes de começar; o motor é o mesmo para todos os tipos
+        scrapers.engine.validate(targets)
+
+        for target in targets:
+            # Uma fonte com erro (mesmo após as novas tentativas) não interrompe as demais
+            try:
+                scrapers.engine.get_child_pages(target)
+            except Exception as e:
+                print(f"[ERROR] Alvo ignorado | {target.get('label', target['type'])} | {e}")
+                continue
+            utils.schedule.mark_crawled(target)
+    finally:
+        utils.md.close_briefing()
+        utils.db.save_seen_cache()
+        utils.http_cache.save_http_cache()
+        utils.page_cache.save_page_cache()
+        utils.schedule.save_schedule()
+        utils.metrics.write_reports()
+        utils.db.close_storage()
+
+
+def daemon():
+    """Modo daemon: ciclos de crawl concorrente agendados, até receber SIGTERM."""
+    utils.daemon.run(lambda: load_urls('configs/urls.json')['target'])
+
+
+def reprocess():
+    """Modo reprocess: briefing novo a partir das páginas em cache, sem acessar a rede nem o banco."""
+    urls = load_urls('configs/urls.json')
+    utils.metrics.reset()
+    try:
+        utils.reprocess.run(urls['target'])
+    finally:
+        utils.page_cache.save_page_cache()
+        utils.metrics.write_reports()
+
 
-    for target in urls['target']:
-        func = cases.get(target['type'], default_exception)
-        func(target)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gera o briefing diário a partir das fontes configuradas.")
+    parser.add_argument("--concurrent", action="store_true",
+                        help="Baixa os alvos e as páginas filhas em paralelo")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Roda continuamente, com ciclos agendados e estado mantido em memória")
+    parser.add_argument("--reprocess", action="store_true",
+                        help="Gera um briefing novo a partir das páginas em cache, sem baixar nada")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.daemon:
+        daemon()
+    elif args.reprocess:
+        reprocess()
+    else:
+        main(concurrent=args.concurrent)
@@ -0,0 +1,4 @@
+# scrapers/__init__.py
+# Tipos de alvo: cada módulo registra o seu no motor (scrapers.engine) ao ser importado
+
+from scrapers import pcl, rss, sal, sitemap  # noqa: F401
@@ -0,0 +1,396 @@
+# scrapers/engine.py
+# Motor único de scraping: busca, parse, filtro e persistência comuns a todos os tipos de alvo
+
+import functools
+import os
+import re
+import urllib.parse
+from collections import namedtuple
+
+import utils.db
+import utils.feeds
+import utils.html
+import utils.http_cache
+import utils.keywords
+import utils.md
+import utils.metrics
+import utils.page_cache
+import utils.policy
+import utils.stream
+from bs4 import BeautifulSoup
+
+# Tipos de alvo registrados ("type" em configs/urls.json -> instância do tipo)
+TYPES = {}
+
+# Campos que todo alvo precisa ter, além dos campos próprios do tipo
+REQUIRED_FIELDS = ("url", "type", "depth")
+
+# Pré-filtro por palavras-chave nos sinais do índice, antes de baixar as notícias
+KEYWORD_PREFILTER = os.environ.get("KEYWORD_PREFILTER", "1") != "0"
+# Abaixo disso os sinais do item não bastam para descartá-lo
+PREFILTER_MIN_WORDS = int(os.environ.get("PREFILTER_MIN_WORDS", 4))
+
+# Item do índice: URL da página filha e, quando o índice traz, título (ou texto do link),
+# data de publicação (datetime com fuso), texto (feeds) e chamada da notícia na lista
+Entry = namedtuple("Entry", "url title published text teaser", defaults=(None, None, "", ""))
+
+# Seletores de um alvo já compilados (soupsieve) e os strainers que limitam o parsing
+CompiledIndex = namedtuple("CompiledIndex", "links strainer container")
+CompiledPage = namedtuple("CompiledPage", "title content strainer")
+
+
+def register(name):
+    """
+    Decorador que registra um tipo de alvo:
+
+        @scrapers.engine.register("pcl")
+        class ParentChildList(scrapers.engine.TargetType):
+            ...
+    """
+    def decorator(cls):
+        cls.name = name
+        TYPES[name] = cls()
+        return cls
+    return decorator
+
+
+def get_type(name):
+    """Retorna o tipo de alvo registrado com esse nome."""
+    if name not in TYPES:
+        raise ValueError(f"Opção inválida: {name}")
+    return TYPES[name]
+
+
+def validate(targets):
+    """Confere o tipo e os campos obrigatórios de todos os alvos antes de começar a coleta."""
+    for target in targets:
+        get_type(target.get('type')).validate(target)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_index(query, scope, container=None):
+    """
+    Seletor dos links do índice, strainer do trecho que os contém e seletor do
+    elemento que contém os itens da lista, compilados uma vez por alvo.
+    """
+    return CompiledIndex(utils.html.compile_selector(query), utils.html.strainer_for(*scope),
+                         utils.html.compile_selector(container) if container else None)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_page(title, content):
+    """Seletores do título e do conteúdo das páginas filhas, compilados uma vez por alvo."""
+    return CompiledPage(utils.html.compile_selector(title), utils.html.compile_selector(content),
+                        utils.html.strainer_for(title, content))
+
+
+class TargetType:
+    """
+    Tipo de alvo. A busca das páginas, o filtro por palavras-chave, a detecção de
+    duplicatas e a escrita do briefing são do motor; o tipo só descreve onde estão
+    os links no índice (e, se precisar, como extrair as URLs de um índice que não
+    é uma lista HTML, sobrescrevendo parse_child_urls, ou os itens completos,
+    sobrescrevendo parse_entries).
+    """
+
+    name = None
+    # Nome mostrado no log
+    description = None
+    # Campos obrigatórios próprios do tipo
+    fields = ()
+    # Sem "page" o alvo só publica o que o próprio índice traz (título e texto do item)
+    requires_page = True
+    # Índice parseado a partir dos bytes da resposta (XML declara a própria codificação)
+    binary_index = False
+
+    def validate(self, target):
+        required = REQUIRED_FIELDS + (("page",) if self.requires_page else ()) + tuple(self.fields)
+        missing = [field for field in required if field not in target]
+        if missing:
+            raise ValueError(f"Opção inválida: alvo {target.get('label', target.get('url'))} sem {', '.join(missing)}")
+
+    def index_selector(self, target):
+        """Seletor CSS dos links das notícias na página índice."""
+        raise NotImplementedError
+
+    def index_scope(self, target):
+        """Seletores que delimitam o trecho do índice que precisa ser parseado."""
+        return (self.index_selector(target),)
+
+    def teaser_container(self, target):
+        """Seletor do elemento que contém os itens da lista (o texto do item é a chamada da notícia)."""
+        return None
+
+    def parse_links(self, html, target):
+        """
+        Extrai da página índice os links das páginas filhas, na ordem em que aparecem,
+        com os sinais baratos para o pré-filtro: texto e title do link (Entry.title)
+        e o texto do item da lista onde ele está (Entry.teaser).
+        """
+        parser = utils.html.get_parser(target)
+        label = target.get('label')
+        container = self.teaser_container(target)
+
+        if parser == 'selectolax':
+            with utils.metrics.timer("parse", label):
+                links = utils.html.select_links(html, self.index_selector(target), target['depth'], container)
+        else:
+            compiled = compile_index(self.index_selector(target), tuple(self.index_scope(target)), container)
+            # Parsear o HTML, só dentro dos trechos que contêm os links
+            with utils.metrics.timer("parse", label):
+                soup = BeautifulSoup(html, parser, parse_only=compiled.strainer)
+
+            # Busca os elementos a serem coletados
+            with utils.metrics.timer("select", label):
+                elementos = compiled.links.select(soup, limit=target['depth'])
+                links = [
+                    (elemento['href'], utils.html.link_text(elemento),
+                     utils.html.item_text(elemento, compiled.container) if container else '')
+                    for elemento in elementos
+                ]
+
+        return [
+            Entry(f"{target.get('uri', '')}{href}", text or None, teaser=teaser if teaser != text else '')
+            for href, text, teaser in links
+        ]
+
+    def parse_child_urls(self, html, target):
+        """Extrai da página índice as URLs das páginas filhas, na ordem em que aparecem."""
+        return [entry.url for entry in self.parse_links(html, target)]
+
+    def parse_entries(self, body, target):
+        """Extrai os itens do índice (Entry), na ordem em que aparecem."""
+        if type(self).parse_child_urls is not TargetType.parse_child_urls:
+            # Tipo que só sabe extrair as URLs do índice
+            return [Entry(url) for url in self.parse_child_urls(body, target)]
+        return self.parse_links(body, target)
+
+    def parse_page(self, html, target):
+        """Extrai o título e o conteúdo de uma página filha."""
+        parser = utils.html.get_parser(target)
+        label = target.get('label')
+
+        if parser == 'selectolax':
+            with utils.metrics.timer("parse", label):
+                title, content = utils.html.select_texts(html, (target['page']['title'], target['page']['content']))
+            return title, content
+
+        compiled = compile_page(target['page']['title'], target['page']['content'])
+        # Parsear o HTML, só dentro dos elementos do título e do conteúdo
+        with utils.metrics.timer("parse", label):
+            soup = BeautifulSoup(html, parser, parse_only=compiled.strainer)
+        with utils.metrics.timer("select", label):
+            title = compiled.title.select_one(soup).get_text(' ', strip=True)
+            content = compiled.content.select_one(soup).get_text(' ', strip=True)
+        return title, content
+
+
+def parse_child_urls(html, target):
+    return get_type(target['type']).parse_child_urls(html, target)
+
+
+def parse_entries(body, target):
+    return get_type(target['type']).parse_entries(body, target)
+
+
+def parse_page(html, target):
+    return get_type(target['type']).parse_page(html, target)
+
+
+def index_body(response, target):
+    """Corpo do índice no formato que o tipo do alvo parseia (texto ou bytes)."""
+    return response.content if get_type(target['type']).binary_index else response.text
+
+
+def feed_item(entry, target):
+    """
+    Título e conteúdo tirados do próprio item do índice, quando ele traz texto suficiente
+    (FEED_MIN_TEXT ou "feed_min_text" no alvo) ou quando o alvo não tem "page".
+    Retorna None se a página da notícia precisa ser baixada.
+    """
+    if entry is None:
+        return None
+    if 'page' not in target:
+        return entry.title or '', entry.text or entry.title or ''
+    if entry.text and len(entry.text) >= target.get('feed_min_text', utils.feeds.FEED_MIN_TEXT):
+        return entry.title or '', entry.text
+    return None
+
+
+def url_words(url):
+    """Palavras do caminho da URL ("/tech/2025/ia-generativa.html" -> "tech ia generativa")."""
+    path = urllib.parse.urlsplit(url).path
+    path = re.sub(r'\.[a-z]{2,5}$', '', path, flags=re.IGNORECASE)
+    return ' '.join(word for word in re.split(r'[\W_]+', path) if word and not word.isdigit())
+
+
+def prefilter(entries, target):
+    """
+    Pré-filtro por palavras-chave nos sinais baratos que o índice já traz (texto e
+    title do link, chamada da notícia, título e texto do feed e palavras da URL),
+    antes de qualquer consulta ao banco ou download. Só seguem os itens que contêm
+    alguma palavra-chave e os que não têm sinais suficientes para decidir (menos de
+    PREFILTER_MIN_WORDS palavras). Desabilitado com KEYWORD_PREFILTER=0 ou
+    "prefilter": false no alvo.
+    """
+    if not target.get('prefilter', KEYWORD_PREFILTER):
+        return list(entries)
+
+    label = target.get('label')
+    matcher = utils.keywords.get_matcher()
+    kept = []
+    with utils.metrics.timer("keywords", label):
+        for entry in entries:
+            signals = ' '.join(filter(None, (entry.title, entry.teaser, entry.text, url_words(entry.url))))
+            if len(signals.split()) < PREFILTER_MIN_WORDS or matcher.search(signals):
+                kept.append(entry)
+
+    if len(kept) < len(entries):
+        print(f"[INFO] Pré-filtro: {len(entries) - len(kept)} de {len(entries)} links sem palavras-chave ignorados | {label}")
+        utils.metrics.incr("prefiltered", len(entries) - len(kept), target=label)
+    return kept
+
+
+def page_failed(url, error, target):
+    """
+    Registra no log e nas métricas a falha de uma página filha, que não interrompe as
+    demais do alvo. Retorna True se a falha é permanente (utils.policy.is_permanent_failure)
+    e a URL deve ser registrada para não ser tentada de novo a cada execução.
+    """
+    permanent = utils.policy.is_permanent_failure(error)
+    kind = "permanente" if permanent else "temporária"
+    print(f"[ERROR] Página ignorada - falha {kind} | URL: {url} | {error!r}")
+    utils.metrics.incr("pages_failed", target=target.get('label'))
+    return permanent
+
+
+def get_child_pages(target):
+    """
+    Modo serial: baixa o índice do alvo e processa cada página filha nova.
+    Uma página com erro é pulada (page_failed); o alvo só é interrompido se o índice
+    falhar ou se o circuito do host abrir (HostUnavailable).
+    """
+    # Requisição HTTP (condicional, se o índice já foi visto antes)
+    label = target.get('label')
+    headers = utils.http_cache.request_headers(target['url'])
+    with utils.metrics.timer("fetch", label):
+        response = utils.policy.get(target['url'], timeout=10, headers=headers)
+    if utils.http_cache.is_unchanged(target['url'], response.status_code):
+        print(f"[INFO] Página índice sem alterações (304) | URL: {target['url']}")
+        utils.metrics.incr("index_unchanged", target=label)
+        return
+    response.raise_for_status()  # Garante que a resposta foi 200
+    utils.metrics.incr("pages_fetched", target=label)
+    utils.metrics.incr("bytes_fetched", len(response.content), target=label)
+    if not get_type(target['type']).binary_index:
+        with utils.metrics.timer("encoding", label):
+            response.encoding = response.apparent_encoding  # Detecta e define a codificação correta
+
+    # Corpo idêntico ao da última execução: nada novo para parsear
+    if utils.http_cache.is_unchanged(target['url'], response.status_code, response.text):
+        print(f"[INFO] Página índice sem alterações | URL: {target['url']}")
+        utils.metrics.incr("index_unchanged", target=label)
+        return
+
+    entries = {}
+    for entry in prefilter(parse_entries(index_body(response, target), target), target):
+        entries.setdefault(entry.url, entry)
+    # Uma consulta ao banco para todas as URLs do índice e um único upsert em lote no final
+    new_urls = utils.db.filter_new_urls(list(entries))
+    utils.metrics.incr("skipped_dedup", len(entries) - len(new_urls), target=label)
+
+    scrapped = []
+    items = []
+    complete = True
+    try:
+        for url in new_urls:
+            try:
+                item = scrape_page(url, target, entries[url])
+            except utils.policy.HostUnavailable:
+                raise
+            except Exception as e:
+                if not page_failed(url, e, target):
+                    complete = False
+                    continue
+            else:
+                if item is not None:
+                    items.append(item)
+            scrapped.append(url)
+    finally:
+        # O que já foi processado é escrito e registrado mesmo quando o alvo é interrompido no meio
+        write_items(items, label)
+        utils.db.save_scrapped_many(scrapped)
+
+    # Com falhas temporárias o índice não é marcado como visto, para as páginas serem tentadas de novo
+    if complete:
+        utils.http_cache.remember(target['url'], response.headers, response.text)
+
+
+def scrape_page(url, target, entry=None):
+    """
+    Baixa uma página filha e filtra a notícia. Retorna o item do briefing, ainda com o
+    conteúdo completo no lugar do resumo, ou None se a página foi descartada.
+    Se o item do índice (entry) já traz o texto da notícia, a página não é baixada.
+    O resumo, a escrita e o registro da URL no banco ficam com quem chama (get_child_pages
+    faz os três em lote para o alvo).
+    """
+    # Log do tipo de scrapper e URL
+    print(f"[INFO] Scrapper Type: {get_type(target['type']).description} | URL: {url}")
+
+    label = target.get('label')
+    from_feed = feed_item(entry, target)
+    if from_feed is not None:
+        title, content = from_feed
+        utils.metrics.incr("fetch_avoided", target=label)
+    elif utils.stream.STREAM_PAGES:
+        # Lê a página em pedaços e para assim que título e conteúdo foram encontrados
+        with utils.metrics.timer("fetch", label):
+            title, content = utils.stream.fetch_and_extract(url, target)
+    else:
+        # Requisição HTTP
+        with utils.metrics.timer("fetch", label):
+            response = utils.policy.get(url, timeout=10)
+        response.raise_for_status()  # Garante que a resposta foi 200
+        utils.metrics.incr("bytes_fetched", len(response.content), target=label)
+        with utils.metrics.timer("encoding", label):
+            response.encoding = response.apparent_encoding  # Detecta e define a codificação correta
+
+        # HTML guardado para reprocessar sem rede (python main.py --reprocess)
+        utils.page_cache.put(url, response.text, utils.page_cache.target_key(target))
+        title, content = parse_page(response.text, target)
+    if from_feed is None:
+        utils.metrics.incr("pages_fetched", target=label)
+
+    # Verifica se o conteúdo contém as palavras-chave
+    has_keywords, hits = utils.keywords.find_keyword_hits(content)
+    if not has_keywords:
+        print(f"Página ignorada - não contém todas as palavras requeridas")
+        utils.metrics.incr("filtered_keywords", target=label)
+        return None
+
+    # Mesma notícia já publicada por outra fonte
+    duplicate = utils.db.register_story(url, content)
+    if duplicate is not None:
+        print(f"Página ignorada - mesma notícia que {duplicate}")
+        utils.metrics.incr("near_duplicates", target=label)
+        return None
+
+    return {"title": title, "url": url, "content": content, "source": label, "keywords": hits}
+
+
+def write_items(items, label=None):
+    """
+    Resume de uma vez as notícias de um alvo (o IDF é calculado sobre todas elas) e
+    grava cada uma no briefing, na ordem dos links.
+    """
+    if not items:
+        return
+    summaries = utils.db.summarize_many([item.pop("content") for item in items])
+    for item, summary in zip(items, summaries):
+        item["summary"] = summary
+        print(item['title'])
+        print("----------------------------------------------")
+
+        # Salvar no arquivo markdown
+        utils.md.save_markdown(item)
+        utils.metrics.incr("items_written", target=label)
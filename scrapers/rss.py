@@ -0,0 +1,53 @@
+# scrapers/rss.py
+# Scrapper do tipo feed (RSS 2.0 e Atom)
+
+import scrapers.engine
+import utils.feeds
+import utils.metrics
+
+
+@scrapers.engine.register("rss")
+class Feed(scrapers.engine.TargetType):
+    """
+    Itens de um feed RSS ou Atom. O feed é lido em pedaços e a leitura para assim
+    que "depth" itens recentes foram encontrados; itens mais antigos que
+    "max_age_hours" (FEED_MAX_AGE_HOURS) são descartados sem baixar nada.
+    Quando o item traz o texto da notícia, ela não é baixada (ver engine.feed_item).
+    """
+
+    description = "RSS/Atom"
+    requires_page = False
+    binary_index = True
+
+    def parse_entries(self, body, target):
+        entries = []
+        with utils.metrics.timer("parse", target.get('label')):
+            for element in utils.feeds.iter_elements(body, ("item", "entry")):
+                published = utils.feeds.parse_date(
+                    utils.feeds.child_text(element, "pubDate", "published", "updated", "date"))
+                if not utils.feeds.is_recent(published, target.get('max_age_hours')):
+                    continue
+                url = feed_link(element)
+                if not url:
+                    continue
+                text = utils.feeds.html_to_text(utils.feeds.child_text(element, "encoded", "content", "description", "summary"))
+                title = utils.feeds.html_to_text(utils.feeds.child_text(element, "title"))
+                entries.append(scrapers.engine.Entry(url, title, published, text))
+                if len(entries) >= target['depth']:
+                    break
+        return entries
+
+
+def feed_link(element):
+    """Link do item: texto de <link> no RSS, href do <link rel="alternate"> no Atom."""
+    fallback = ''
+    for node in element:
+        if utils.feeds.local_name(node.tag) != "link":
+            continue
+        href = node.get('href')
+        if href is None:
+            return (node.text or '').strip()
+        if node.get('rel', 'alternate') == 'alternate':
+            return href.strip()
+        fallback = fallback or href.strip()
+    return fallback or utils.feeds.child_text(element, "guid")
@@ -0,0 +1,36 @@
+# scrapers/sitemap.py
+# Scrapper do tipo sitemap (sitemaps XML e Google News sitemaps)
+
+import scrapers.engine
+import utils.feeds
+import utils.metrics
+
+
+@scrapers.engine.register("sitemap")
+class Sitemap(scrapers.engine.TargetType):
+    """
+    URLs de um sitemap (<urlset>). A data vem de <news:publication_date> ou
+    <lastmod> e URLs mais antigas que "max_age_hours" (FEED_MAX_AGE_HOURS) são
+    descartadas antes do download. O sitemap não traz o texto da notícia, então
+    as páginas são sempre baixadas e lidas com os seletores de "page".
+    """
+
+    description = "Sitemap"
+    binary_index = True
+
+    def parse_entries(self, body, target):
+        entries = []
+        with utils.metrics.timer("parse", target.get('label')):
+            for element in utils.feeds.iter_elements(body, ("url",)):
+                url = utils.feeds.child_text(element, "loc")
+                news = utils.feeds.child(element, "news")
+                published = utils.feeds.parse_date(
+                    utils.feeds.child_text(news, "publication_date") if news is not None else ''
+                ) or utils.feeds.parse_date(utils.feeds.child_text(element, "lastmod"))
+                if not url or not utils.feeds.is_recent(published, target.get('max_age_hours')):
+                    continue
+                title = utils.feeds.child_text(news, "title") if news is not None else None
+                entries.append(scrapers.engine.Entry(url, title or None, published))
+                if len(entries) >= target['depth']:
+                    break
+        return entries
@@ -0,0 +1,88 @@
+from unittest.mock import MagicMock
+import pytest
+import utils.http_cache
+import utils.metrics
+import utils.page_cache
+import utils.policy
+import utils.schedule
+
+
+def make_target(label='A', url='http://a.com/', uri=None, **extra):
+    """Alvo 'pcl' dos testes; uri padrão é a URL sem a barra final e extra sobrescreve os campos."""
+    return dict({
+        'label': label, 'type': 'pcl', 'url': url, 'parent_container': 'div.list',
+        'child_anchor': 'a', 'uri': url.rstrip('/') if uri is None else uri, 'depth': 10,
+        'page': {'title': 'h1', 'content': 'div.content'},
+    }, **extra)
+
+
+def make_response(body):
+    """Resposta 200 do requests (MagicMock) com o corpo em texto ou bytes."""
+    if isinstance(body, bytes):
+        content, text = body, body.decode('utf-8')
+    else:
+        content, text = body.encode('utf-8'), body
+    response = MagicMock()
+    response.text = text
+    response.content = content
+    response.status_code = 200
+    response.headers = {}
+    response.apparent_encoding = 'utf-8'
+    response.encoding = None
+    return response
+
+
+@pytest.fixture(autouse=True)
+def isolate_http_cache(mocker, tmp_path):
+    # Cada teste começa com o cache de páginas índice vazio e fora do diretório do projeto
+    mocker.patch("utils.http_cache.HTTP_CACHE_PATH", str(tmp_path / "http_cache.json"))
+    utils.http_cache.clear_http_cache()
+    yield
+    utils.http_cache.clear_http_cache()
+
+
+@pytest.fixture(autouse=True)
+def isolate_schedule(mocker, tmp_path):
+    # Horários das últimas coletas fora do diretório do projeto
+    mocker.patch("utils.schedule.SCHEDULE_PATH", str(tmp_path / "schedule.json"))
+    utils.schedule.clear_schedule()
+    yield
+    utils.schedule.clear_schedule()
+
+
+@pytest.fixture(autouse=True)
+def disable_near_duplicates(mocker):
+    # A detecção de quase duplicatas usa o MongoDB; os testes que precisam dela a reabilitam
+    mocker.patch("utils.db.NEAR_DUP_ENABLED", False)
+
+
+@pytest.fixture(autouse=True)
+def fast_fetch_policy(mocker):
+    # Sem limite de taxa nem espera entre tentativas; os testes da política usam valores próprios
+    mocker.patch("utils.policy.RATE_PER_HOST", 0)
+    mocker.patch("utils.policy.BACKOFF_BASE", 0)
+    utils.policy.reset_policy()
+    yield
+    utils.policy.reset_policy()
+
+
+@pytest.fixture(autouse=True)
+def isolate_metrics(mocker, tmp_path):
+    # Relatórios de métricas fora do diretório do projeto e registro zerado a cada teste
+    mocker.patch("utils.metrics.METRICS_DIR", str(tmp_path / "reports"))
+    utils.metrics.reset()
+
+
+@pytest.fixture(autouse=True)
+def isolate_page_cache(mocker, tmp_path):
+    # Páginas baixadas guardadas fora do diretório do projeto
+    mocker.patch("utils.page_cache.PAGE_CACHE_DIR", str(tmp_path / "page_cache"))
+    utils.page_cache.clear_page_cache()
+    yield
+    utils.page_cache.clear_page_cache()
+
+
+@pytest.fixture(autouse=True)
+def isolate_briefing_locks(mocker, tmp_path):
+    # Travas dos briefings fora do diretório do projeto
+    mocker.patch("utils.md.BRIEFING_LOCK_DIR", str(tmp_path / "locks"))
@@ -0,0 +1,112 @@
+import pytest
+import benchmarks.mongo
+import benchmarks.run
+import benchmarks.site
+import utils.db
+import utils.metrics
+import utils.storage
+from pymongo import UpdateOne
+
+
+@pytest.fixture(scope="module")
+def site():
+    with benchmarks.site.LocalSite() as local_site:
+        yield local_site
+
+
+@pytest.fixture
+def memory_mongo(mocker):
+    mocker.patch("utils.db._client", None)
+    mocker.patch("utils.db._indexes_ready", False)
+    mocker.patch("utils.db._signatures_ready", False)
+    mocker.patch("utils.db.SEEN_CACHE_ENABLED", False)
+    yield benchmarks.mongo.install()
+    utils.db.close_mongo_client()
+
+
+def test_memory_collection_upserts_and_queries(memory_mongo):
+    collection = memory_mongo["db"]["urls"]
+    collection.create_index("url", unique=True, name="url_unique")
+
+    assert collection.update_one({"url": "a"}, {"$setOnInsert": {"url": "a"}}, upsert=True).upserted_id
+    assert collection.update_one({"url": "a"}, {"$setOnInsert": {"url": "a"}}, upsert=True).upserted_id is None
+    result = collection.bulk_write([UpdateOne({"url": url}, {"$setOnInsert": {"url": url}}, upsert=True)
+                                    for url in ("a", "b")])
+
+    assert list(result.upserted_ids) == [1]
+    assert [doc["url"] for doc in collection.find({"url": {"$in": ["b", "c"]}}, {"url": 1, "_id": 0})] == ["b"]
+    assert "url_unique" in collection.index_information()
+
+
+def test_memory_mongo_backs_utils_db(memory_mongo, mocker):
+    mocker.patch("utils.db.NEAR_DUP_ENABLED", True)
+
+    assert utils.db.save_scrapped_many(["http://a.com/1", "http://a.com/2"]) == ["http://a.com/1", "http://a.com/2"]
+    assert utils.db.filter_new_urls(["http://a.com/1", "http://a.com/3"]) == ["http://a.com/3"]
+    assert utils.db.should_scrape("http://a.com/2") is False
+
+    story = " ".join(f"palavra{index}" for index in range(60))
+    assert utils.db.register_story("http://a.com/1", story) is None
+    assert utils.db.register_story("http://b.com/1", story) == "http://a.com/1"
+
+
+def test_targets_cover_requested_pages():
+    targets = benchmarks.site.make_targets("http://127.0.0.1:1", 120)
+
+    assert [target["type"] for target in targets] == ["pcl", "sal", "pcl"]
+    assert sum(target["depth"] for target in targets) == 120
+
+
+@pytest.mark.parametrize("mode, storage", [("serial", "memory"), ("concurrent", "memory"), ("serial", "sqlite")])
+def test_run_case_replays_fixtures(mocker, tmp_path, site, mode, storage):
+    # O caso troca os caminhos do estado local e o cliente do banco; o mocker os restaura
+    for name in ("_client", "_storage", "STORAGE_BACKEND", "_seen_cache", "SEEN_CACHE_PATH",
+                 "_indexes_ready", "_signatures_ready"):
+        mocker.patch(f"utils.db.{name}", getattr(utils.db, name))
+    mocker.patch("utils.storage.SQLITE_PATH", utils.storage.SQLITE_PATH)
+
+    result = benchmarks.run.run_case(mode, 10, site.base_url, str(tmp_path), storage=storage)
+
+    assert result["counters"]["pages_fetched"] == 9  # 8 notícias e o índice
+    assert result["counters"]["items_written"] == 8
+    assert result["counters"]["prefiltered"] == 2
+    assert result["pages_processed"] == 8
+    assert {"fetch", "parse", "db", "write"} <= set(result["stages"])
+    assert (tmp_path / "briefing.md").exists()
+
+
+@pytest.mark.parametrize("mode", ["serial", "concurrent"])
+def test_run_case_processes_sal_articles(mocker, tmp_path, site, mode):
+    for name in ("_client", "_storage", "STORAGE_BACKEND", "_seen_cache", "SEEN_CACHE_PATH",
+                 "_indexes_ready", "_signatures_ready"):
+        mocker.patch(f"utils.db.{name}", getattr(utils.db, name))
+
+    # 50 notícias do alvo pcl e 10 do alvo sal
+    result = benchmarks.run.run_case(mode, 60, site.base_url, str(tmp_path))
+
+    counters = utils.metrics.report()["counters"]
+    assert counters["pages_fetched"]["targets"]["bench-sal-1"] == 9  # 8 notícias e o índice
+    assert counters["prefiltered"]["targets"]["bench-sal-1"] == 2
+    assert counters["items_written"]["targets"]["bench-sal-1"] == 8
+    assert result["pages_processed"] == 38 + 8
+    assert result["pages_per_second"] == pytest.approx(result["pages_processed"] / result["seconds"], rel=0.01)
+
+
+def test_run_case_silences_parse_workers(mocker, tmp_path):
+    crawl = mocker.patch("utils.crawler.crawl")
+    mocker.patch("benchmarks.run.prepare_state")
+    mocker.patch("benchmarks.site.make_targets", return_value=[])
+
+    benchmarks.run.run_case("concurrent", 10, "http://127.0.0.1", str(tmp_path), parse_workers=2, verbose=False)
+    assert crawl.call_args.kwargs["initializer"] is benchmarks.run.silence_stdout
+
+    benchmarks.run.run_case("concurrent", 10, "http://127.0.0.1", str(tmp_path), parse_workers=2)
+    assert crawl.call_args.kwargs["initializer"] is None
+
+
+def test_find_regressions():
+    baseline = [{"mode": "serial", "pages": 10, "pages_per_second": 100.0, "peak_rss_mb": 50.0}]
+    current = [{"mode": "serial", "pages": 10, "pages_per_second": 70.0, "peak_rss_mb": 55.0}]
+
+    assert len(benchmarks.run.find_regressions(current, baseline, tolerance=0.2)) == 1
+    assert benchmarks.run.find_regressions(current, baseline, tolerance=0.4) == []
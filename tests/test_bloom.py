@@ -0,0 +1,50 @@
+from utils.bloom import BloomFilter
+
+
+def test_no_false_negatives():
+    bloom = BloomFilter(capacity=1000)
+    urls = [f"http://example.com/{i}" for i in range(1000)]
+    bloom.update(urls)
+    assert all(url in bloom for url in urls)
+    assert len(bloom) == 1000
+
+
+def test_false_positive_rate_within_bounds():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    bloom.update(f"http://example.com/{i}" for i in range(1000))
+    false_positives = sum(f"http://other.com/{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_memory_is_bounded_by_capacity():
+    bloom = BloomFilter(capacity=1000000, error_rate=0.01)
+    # ~9.6 bits por item para 1% de falsos positivos
+    assert len(bloom.bits) < 1300000
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "seen.bloom")
+    bloom = BloomFilter(capacity=100)
+    bloom.add("http://example.com/1")
+    bloom.save(path, saved_at=123.0)
+
+    loaded, saved_at = BloomFilter.load(path, capacity=100)
+    assert saved_at == 123.0
+    assert "http://example.com/1" in loaded
+    assert len(loaded) == 1
+
+
+def test_load_missing_or_incompatible(tmp_path):
+    path = str(tmp_path / "seen.bloom")
+    assert BloomFilter.load(path, capacity=100) == (None, None)
+
+    BloomFilter(capacity=100).save(path, saved_at=0.0)
+    assert BloomFilter.load(path, capacity=5000) == (None, None)
+
+
+def test_load_from_other_source(tmp_path):
+    path = str(tmp_path / "seen.bloom")
+    BloomFilter(capacity=100).save(path, saved_at=1.0, source="mongo:a")
+
+    assert BloomFilter.load(path, capacity=100, source="sqlite:b") == (None, None)
+    assert BloomFilter.load(path, capacity=100, source="mongo:a")[1] == 1.0
@@ -0,0 +1,81 @@
+import pytest
+from utils.briefing import BriefingStore, HtmlRenderer, Renderer, normalize_item, render
+from utils.md import MarkdownRenderer
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BriefingStore(str(tmp_path / "briefing.jsonl"))
+    store.append([
+        normalize_item({"title": "A <b>", "url": "http://example.com/a?x=1&y=2", "summary": "Resumo A", "source": "IGN"}),
+        normalize_item({"title": "B", "url": "http://example.com/b", "summary": "Resumo B", "keywords": {"ia": 1}}),
+    ])
+    return store
+
+
+def test_normalize_item_fills_optional_fields():
+    item = normalize_item({"title": "T", "url": "U", "summary": "S"})
+    assert item["source"] is None
+    assert item["keywords"] == {}
+    assert item["timestamp"]
+
+
+def test_store_streams_items(store):
+    assert [item["title"] for item in store] == ["A <b>", "B"]
+
+
+def test_store_missing_file(tmp_path):
+    assert list(BriefingStore(str(tmp_path / "missing.jsonl"))) == []
+
+
+def test_render_all_outputs_in_one_pass(store, tmp_path, mocker):
+    reads = mocker.spy(BriefingStore, "__iter__")
+    html_path = str(tmp_path / "briefing.html")
+    md_path = str(tmp_path / "briefing.md")
+
+    render(store, [HtmlRenderer(html_path), MarkdownRenderer(md_path)])
+
+    assert reads.call_count == 1
+    with open(html_path, encoding="utf-8") as f:
+        content = f.read()
+    assert "A &lt;b&gt;" in content
+    assert 'href="http://example.com/a?x=1&amp;y=2"' in content
+    assert "<small>(IGN)</small>" in content
+    assert "Palavras-chave: ia" in content
+    with open(md_path, encoding="utf-8") as f:
+        content = f.read()
+    assert content.index("**URL:** http://example.com/a?x=1&y=2") < content.index("**URL:** http://example.com/b")
+
+
+def test_html_append_keeps_document_closed(store, tmp_path, mocker):
+    path = str(tmp_path / "briefing.html")
+    renderer = HtmlRenderer(path)
+    render(store, [renderer])
+    reads = mocker.spy(BriefingStore, "__iter__")
+
+    assert renderer.append([normalize_item({"title": "C", "url": "http://example.com/c", "summary": "Resumo C"})])
+
+    reads.assert_not_called()
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    assert content.count("<article>") == 3
+    assert content.index("Resumo B") < content.index("Resumo C") < content.index("</body>")
+    assert content.endswith("</body>\n</html>\n")
+
+
+def test_append_missing_output(tmp_path):
+    assert HtmlRenderer(str(tmp_path / "missing.html")).append([]) is False
+
+
+def test_render_failure_keeps_previous_output(store, tmp_path):
+    class Broken(Renderer):
+        def item(self, f, item):
+            raise RuntimeError("falha")
+
+    path = tmp_path / "out.txt"
+    path.write_text("anterior")
+    with pytest.raises(RuntimeError):
+        render(store, [Broken(str(path))])
+
+    assert path.read_text() == "anterior"
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
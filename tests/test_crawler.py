@@ -0,0 +1,347 @@
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+import scrapers.engine
+import utils.crawler as crawler
+import utils.http_cache
+import utils.policy
+import utils.metrics
+from conftest import make_target
+
+INDEX_HTML = """
+<html><body><div class="list">
+{links}
+</div></body></html>
+"""
+
+PAGE_HTML = "<html><body><h1>{title}</h1><div class='content'>{content}</div></body></html>"
+
+
+@pytest.fixture
+def site(mocker):
+    pages = {
+        'http://a.com/': INDEX_HTML.format(links='<a href="/1">1</a><a href="/2">2</a>'),
+        'http://b.com/': INDEX_HTML.format(links='<a href="http://b.com/3">3</a><a href="http://a.com/2">x</a>'),
+    }
+    for path in ('a.com/1', 'a.com/2', 'b.com/3'):
+        pages[f'http://{path}'] = PAGE_HTML.format(title=path, content=f'conteudo {path} python')
+
+    async def handler(request):
+        # Páginas do primeiro alvo demoram mais para inverter a ordem de chegada
+        if request.url.host == 'a.com':
+            await asyncio.sleep(0.05)
+        return httpx.Response(200, html=pages[str(request.url)])
+
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: list(dict.fromkeys(urls)))
+    return httpx.MockTransport(handler)
+
+
+def test_crawl_keeps_serial_order(mocker, site):
+    mock_save_scrapped = mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+    targets = [make_target('A', 'http://a.com/', 'http://a.com'), make_target('B', 'http://b.com/', '')]
+
+    crawler.crawl(targets, max_workers=4, transport=site, parse_workers=0)
+
+    written = [call.args[0]['url'] for call in mock_save_md.call_args_list]
+    assert written == ['http://a.com/1', 'http://a.com/2', 'http://b.com/3']
+    assert mock_save_md.call_args_list[0].args[0]['keywords'] == {'python': 1}
+    recorded = [call.args[0] for call in mock_save_scrapped.call_args_list]
+    assert recorded == [['http://a.com/1', 'http://a.com/2'], ['http://b.com/3']]
+
+
+def test_crawl_skips_pages_without_keywords(mocker, site):
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.keywords.find_keyword_hits", return_value=(False, {}))
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+
+    crawler.crawl([make_target('A', 'http://a.com/', 'http://a.com')], transport=site, parse_workers=0)
+
+    mock_save_md.assert_not_called()
+
+
+def test_crawl_invalid_type():
+    with pytest.raises(ValueError, match="Opção inválida"):
+        crawler.crawl([{'type': 'xyz', 'url': 'http://a.com/'}], parse_workers=0)
+
+
+def test_crawl_skips_urls_recorded_by_another_run(mocker, site):
+    # Outro processo registrou http://a.com/1 entre a consulta e o upsert
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: [url for url in urls if url != 'http://a.com/1'])
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+
+    crawler.crawl([make_target('A', 'http://a.com/', 'http://a.com')], transport=site, parse_workers=0)
+
+    assert [call.args[0]['url'] for call in mock_save_md.call_args_list] == ['http://a.com/2']
+
+
+def test_crawl_skips_unchanged_index(mocker, site):
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+    parse_entries = mocker.spy(scrapers.engine, "parse_entries")
+    targets = [make_target('A', 'http://a.com/', 'http://a.com')]
+
+    crawler.crawl(targets, transport=site, parse_workers=0)
+    crawler.crawl(targets, transport=site, parse_workers=0)
+
+    # O segundo crawl recebe o mesmo índice e não parseia nem baixa as páginas filhas
+    assert parse_entries.call_count == 1
+    assert mock_save_md.call_count == 2
+
+
+def test_crawl_sends_conditional_request(mocker):
+    requests_seen = []
+
+    def handler(request):
+        requests_seen.append(request)
+        if request.headers.get('If-None-Match') == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, html=INDEX_HTML.format(links=''), headers={'ETag': '"v1"'})
+
+    mocker.patch("utils.db.filter_new_urls", return_value=[])
+    mocker.patch("utils.db.save_scrapped_many", return_value=[])
+    targets = [make_target('A', 'http://a.com/', 'http://a.com')]
+
+    crawler.crawl(targets, transport=httpx.MockTransport(handler), parse_workers=0)
+    crawler.crawl(targets, transport=httpx.MockTransport(handler), parse_workers=0)
+
+    assert requests_seen[1].headers['If-None-Match'] == '"v1"'
+
+
+def test_crawl_does_not_remember_index_when_a_page_fails(mocker):
+    def handler(request):
+        if request.url.path == '/':
+            return httpx.Response(200, html=INDEX_HTML.format(links='<a href="/1">1</a>'))
+        return httpx.Response(500)
+
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    targets = [make_target('A', 'http://a.com/', 'http://a.com')]
+
+    mock_mark = mocker.patch("utils.schedule.mark_crawled")
+
+    crawler.crawl(targets, transport=httpx.MockTransport(handler), parse_workers=0)
+
+    # O alvo termina, mas o índice continua "novo" para a página ser tentada de novo
+    mock_mark.assert_called_once()
+    assert utils.http_cache.request_headers('http://a.com/') == {}
+    assert utils.http_cache.is_unchanged('http://a.com/', 200, INDEX_HTML.format(links='<a href="/1">1</a>')) is False
+
+
+def test_crawl_skips_failing_pages(mocker):
+    links = '<a href="/1">1</a><a href="/2">2</a><a href="/3">3</a>'
+
+    def handler(request):
+        if request.url.path == '/':
+            return httpx.Response(200, html=INDEX_HTML.format(links=links))
+        if request.url.path == '/2':
+            return httpx.Response(404)
+        return httpx.Response(200, html=PAGE_HTML.format(title=request.url.path, content='conteudo python'))
+
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mock_save_scrapped = mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+
+    crawler.crawl([make_target('A', 'http://a.com/', 'http://a.com')], transport=httpx.MockTransport(handler),
+                  parse_workers=0)
+
+    assert [call.args[0]['url'] for call in mock_save_md.call_args_list] == ['http://a.com/1', 'http://a.com/3']
+    # O 404 é permanente: registrado para não ser tentado de novo
+    assert sorted(mock_save_scrapped.call_args.args[0]) == ['http://a.com/1', 'http://a.com/2', 'http://a.com/3']
+    assert utils.metrics.report()["counters"]["pages_failed"]["targets"] == {'A': 1}
+    # Falha permanente não impede que o índice seja marcado como visto
+    assert utils.http_cache.is_unchanged('http://a.com/', 200, INDEX_HTML.format(links=links)) is True
+
+
+def test_crawl_stops_target_when_host_unavailable(mocker):
+    def handler(request):
+        if request.url.path == '/':
+            return httpx.Response(200, html=INDEX_HTML.format(links='<a href="/1">1</a>'))
+        return httpx.Response(200, html=PAGE_HTML.format(title='1', content='conteudo python'))
+
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.crawler.extract_item", side_effect=utils.policy.HostUnavailable("a.com"))
+    mock_mark = mocker.patch("utils.schedule.mark_crawled")
+
+    crawler.crawl([make_target('A', 'http://a.com/', 'http://a.com')], transport=httpx.MockTransport(handler),
+                  parse_workers=0)
+
+    mock_mark.assert_not_called()
+    assert "pages_failed" not in utils.metrics.report()["counters"]
+
+
+def test_crawl_with_process_pool(mocker, site):
+    # Parse e filtro rodam em processos separados; banco e briefing ficam no processo principal
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+    targets = [make_target('A', 'http://a.com/', 'http://a.com'), make_target('B', 'http://b.com/', '')]
+
+    crawler.crawl(targets, transport=site, parse_workers=2)
+
+    written = [call.args[0]['url'] for call in mock_save_md.call_args_list]
+    assert written == ['http://a.com/1', 'http://a.com/2', 'http://b.com/3']
+
+
+def test_crawl_passes_initializer_to_parse_pool(mocker, site):
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+    make_parse_pool = mocker.spy(crawler, "make_parse_pool")
+
+    crawler.crawl([make_target('A', 'http://a.com/', 'http://a.com')], transport=site, parse_workers=1,
+                  initializer=utils.metrics.reset)
+
+    make_parse_pool.assert_called_once_with(1, utils.metrics.reset)
+    assert mock_save_md.call_count == 2
+
+
+def test_pipeline_buffer_limits_pages_in_flight(mocker):
+    active = {'now': 0, 'max': 0}
+    # O contador é alterado pelo event loop e pelas threads do parse
+    lock = threading.Lock()
+
+    async def handler(request):
+        if request.url.path == '/':
+            links = ''.join(f'<a href="/{i}">{i}</a>' for i in range(8))
+            return httpx.Response(200, html=INDEX_HTML.format(links=links))
+        with lock:
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, html=PAGE_HTML.format(title='t', content='python'))
+
+    def slow_extract(*args):
+        time.sleep(0.01)
+        with lock:
+            active['now'] -= 1
+        return None
+
+    mocker.patch("utils.crawler.extract_item", side_effect=slow_extract)
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+
+    crawler.crawl([make_target('A', 'http://a.com/', 'http://a.com')],
+                  max_workers=8, max_per_host=8, parse_workers=0, queue_size=2,
+                  transport=httpx.MockTransport(handler))
+
+    assert active['max'] == 2
+
+
+class FakeSignatures:
+    """Coleção de assinaturas em memória com a consulta por faixas de LSH."""
+
+    def __init__(self):
+        self.docs = []
+
+    def find(self, query, projection=None):
+        bands = set(query["bands"]["$in"])
+        return [doc for doc in self.docs if bands & set(doc["bands"])]
+
+    def update_one(self, query, update, upsert=False):
+        self.docs.append(update["$setOnInsert"])
+
+
+def test_crawl_collapses_near_duplicates(mocker):
+    story = ("A agência espacial confirmou o lançamento da nova sonda para Marte, "
+             "que vai estudar o clima do planeta durante os próximos cinco anos. "
+             "Os dados serão processados por um sistema escrito em python e divulgados "
+             "para pesquisadores de todo o mundo assim que chegarem à Terra.")
+    pages = {
+        'http://a.com/': INDEX_HTML.format(links='<a href="/1">1</a><a href="/2">2</a>'),
+        'http://a.com/1': PAGE_HTML.format(title='Sonda', content=story),
+        'http://a.com/2': PAGE_HTML.format(title='Outra', content='Resultado do campeonato de python'),
+        'http://b.com/': INDEX_HTML.format(links='<a href="http://b.com/3">3</a>'),
+        'http://b.com/3': PAGE_HTML.format(title='Sonda (B)', content=story.replace('nova sonda', 'sonda')),
+    }
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, html=pages[str(request.url)]))
+    mocker.patch("utils.db.NEAR_DUP_ENABLED", True)
+    mocker.patch("utils.db.get_signatures_collection", return_value=FakeSignatures())
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+    targets = [make_target('A', 'http://a.com/', 'http://a.com'), make_target('B', 'http://b.com/', '')]
+
+    crawler.crawl(targets, transport=transport, parse_workers=0)
+
+    written = [call.args[0]['url'] for call in mock_save_md.call_args_list]
+    assert written == ['http://a.com/1', 'http://a.com/2']
+
+
+def test_crawl_marks_targets_crawled(mocker, site):
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.md.save_markdown")
+    mock_mark = mocker.patch("utils.schedule.mark_crawled")
+    targets = [make_target('A', 'http://a.com/', 'http://a.com'), make_target('B', 'http://b.com/', '')]
+
+    crawler.crawl(targets, transport=site, parse_workers=0)
+
+    assert [call.args[0]['label'] for call in mock_mark.call_args_list] == ['A', 'B']
+
+
+def test_crawl_continues_after_failing_target(mocker, site):
+    def handler(request):
+        if request.url.host == 'down.com':
+            return httpx.Response(503)
+        return site.handler(request)
+
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+    targets = [make_target('Down', 'http://down.com/', ''), make_target('B', 'http://b.com/', '')]
+
+    crawler.crawl(targets, transport=httpx.MockTransport(handler), parse_workers=0)
+
+    written = [call.args[0]['url'] for call in mock_save_md.call_args_list]
+    assert written == ['http://b.com/3', 'http://a.com/2']
+
+
+def test_crawl_records_metrics(mocker, site):
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.md.save_markdown")
+    targets = [make_target('A', 'http://a.com/', 'http://a.com'), make_target('B', 'http://b.com/', '')]
+
+    crawler.crawl(targets, transport=site, parse_workers=2)
+
+    report = utils.metrics.report()
+    # a.com/2 é baixada uma vez, pelo alvo B, cujo índice chega primeiro
+    assert report["counters"]["pages_fetched"]["total"] == 5
+    assert report["counters"]["pages_fetched"]["targets"] == {'A': 2, 'B': 3}
+    assert report["counters"]["items_written"]["targets"] == {'A': 2, 'B': 1}
+    # Medições feitas nos processos de parse voltam para o registro principal
+    assert report["stages"]["parse"]["targets"]["A"]["count"] == 2
+    assert report["stages"]["fetch"]["count"] == 5
+
+
+def test_crawl_fetches_shared_url_once(mocker, site):
+    fetched = []
+    handler = site.handler
+
+    async def counting(request):
+        fetched.append(str(request.url))
+        return await handler(request)
+
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+    targets = [make_target('A', 'http://a.com/', 'http://a.com'), make_target('B', 'http://b.com/', '')]
+
+    crawler.crawl(targets, transport=httpx.MockTransport(counting), parse_workers=0)
+
+    assert fetched.count('http://a.com/2') == 1
+    items = [call.args[0] for call in mock_save_md.call_args_list]
+    # Escrita no primeiro alvo da configuração que lista a URL
+    assert [(item['url'], item['source']) for item in items] == [
+        ('http://a.com/1', 'A'), ('http://a.com/2', 'A'), ('http://b.com/3', 'B')]
+
+
+def test_release_keeps_pages_shared_with_other_targets():
+    async def run():
+        own, shared = (asyncio.create_task(asyncio.sleep(1)) for _ in range(2))
+        scheduled = {'http://a.com/1': [own, 1], 'http://a.com/2': [shared, 2]}
+        crawler._release([('http://a.com/1', own), ('http://a.com/2', shared)], scheduled)
+        await asyncio.sleep(0)
+        result = (own.cancelled(), shared.cancelled(), list(scheduled))
+        shared.cancel()
+        return result
+
+    assert asyncio.run(run()) == (True, False, ['http://a.com/2'])
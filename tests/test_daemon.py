@@ -0,0 +1,82 @@
+import os
+import signal
+import httpx
+import utils.daemon as daemon
+import utils.schedule
+
+PAGES = {
+    'http://a.com/': "<div class='list'><a href='/1'>1</a></div>",
+    'http://a.com/1': "<h1>Título</h1><div class='content'>conteudo python</div>",
+}
+
+TARGET = {
+    'label': 'A',
+    'type': 'pcl',
+    'url': 'http://a.com/',
+    'parent_container': 'div.list',
+    'child_anchor': 'a',
+    'uri': 'http://a.com',
+    'depth': 10,
+    'page': {'title': 'h1', 'content': 'div.content'}
+}
+
+
+def transport(requests):
+    def handler(request):
+        requests.append(str(request.url))
+        return httpx.Response(200, html=PAGES[str(request.url)])
+    return httpx.MockTransport(handler)
+
+
+def test_seconds_until_next_cycle():
+    slow = dict(TARGET, interval=10)
+    assert daemon.seconds_until_next_cycle([TARGET], now=1000, max_wait=3600) == 3600
+
+    utils.schedule.mark_crawled(slow, now=1000)
+    assert daemon.seconds_until_next_cycle([slow], now=1060, max_wait=3600) == 540
+    assert daemon.seconds_until_next_cycle([dict(slow, active=False)], now=1060, max_wait=3600) == 3600
+
+
+def test_daemon_runs_cycles_until_sigterm(mocker):
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_seen_cache")
+    mock_close = mocker.patch("utils.db.close_storage")
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+    mocker.patch("utils.daemon.DAEMON_INTERVAL", 0)
+    mocker.patch("utils.http_cache.HTTP_CACHE_ENABLED", False)
+    clients = mocker.spy(httpx, "AsyncClient")
+    cycles = []
+
+    def load_targets():
+        cycles.append(1)
+        if len(cycles) == 2:
+            # O ciclo em andamento termina antes de o daemon sair
+            os.kill(os.getpid(), signal.SIGTERM)
+        return [TARGET]
+
+    requests = []
+    daemon.run(load_targets, parse_workers=0, transport=transport(requests))
+
+    assert len(cycles) == 2
+    assert requests == ['http://a.com/', 'http://a.com/1'] * 2
+    assert mock_save_md.call_count == 2
+    assert clients.call_count == 1  # mesmo cliente HTTP em todos os ciclos
+    mock_close.assert_called_once()
+
+
+def test_daemon_survives_failed_cycle(mocker):
+    mocker.patch("utils.db.save_seen_cache")
+    mocker.patch("utils.db.close_storage")
+    mocker.patch("utils.daemon.DAEMON_INTERVAL", 0)
+    cycles = []
+
+    def load_targets():
+        cycles.append(1)
+        if len(cycles) == 2:
+            os.kill(os.getpid(), signal.SIGTERM)
+        return [{'type': 'xyz', 'url': 'http://a.com/'}]
+
+    daemon.run(load_targets, parse_workers=0, transport=transport([]))
+
+    assert len(cycles) == 2
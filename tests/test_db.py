@@ -130,4 +130,211 @@ def test_save_scrapped_creates_directory(test_file):
     
     # Cleanup
     os.remove(custom_file)
-    os.rmdir(os.path.dirname(custom_file)) 
\ No newline at end of file
+    os.rmdir(os.path.dirname(custom_file)) 
+
+@pytest.fixture
+def mongo(mocker):
+    # Garante um cliente novo (mockado) a cada teste
+    import utils.db
+    utils.db._client = None
+    utils.db._indexes_ready = False
+    utils.db._signatures_ready = False
+    utils.db._seen_cache = None
+    mocker.patch("utils.db.SEEN_CACHE_ENABLED", False)
+    client_class = mocker.patch("utils.db.MongoClient")
+    yield client_class
+    utils.db._client = None
+    utils.db._indexes_ready = False
+    utils.db._signatures_ready = False
+    utils.db._seen_cache = None
+
+def test_get_mongo_client_is_reused(mongo):
+    """Test that the MongoClient is created only once per process"""
+    from utils.db import get_mongo_client
+    assert get_mongo_client() is get_mongo_client()
+    mongo.assert_called_once()
+
+def test_close_mongo_client(mongo):
+    """Test that close_mongo_client closes the client and allows a new one"""
+    from utils.db import get_mongo_client, close_mongo_client
+    client = get_mongo_client()
+    close_mongo_client()
+    client.close.assert_called_once()
+    get_mongo_client()
+    assert mongo.call_count == 2
+
+def test_filter_new_urls_single_query(mongo):
+    """Test that filter_new_urls checks every URL with one $in query and keeps order"""
+    from utils.db import filter_new_urls
+    collection = mongo.return_value.__getitem__.return_value.__getitem__.return_value
+    collection.find.return_value = [{"url": "http://example.com/2"}]
+
+    urls = ["http://example.com/1", "http://example.com/2", "http://example.com/3", "http://example.com/1"]
+    result = filter_new_urls(urls)
+
+    assert result == ["http://example.com/1", "http://example.com/3"]
+    collection.find.assert_called_once()
+    query = collection.find.call_args.args[0]
+    assert query == {"url": {"$in": ["http://example.com/1", "http://example.com/2", "http://example.com/3"]}}
+
+def test_filter_new_urls_empty(mongo):
+    """Test that filter_new_urls does not query the database for an empty list"""
+    from utils.db import filter_new_urls
+    assert filter_new_urls([]) == []
+    mongo.assert_not_called()
+
+def test_save_scrapped_many(mongo):
+    """Test that save_scrapped_many upserts all URLs with one bulk_write and returns the new ones"""
+    from utils.db import save_scrapped_many
+    collection = mongo.return_value.__getitem__.return_value.__getitem__.return_value
+    collection.bulk_write.return_value.upserted_ids = {1: "id"}
+
+    result = save_scrapped_many(["http://example.com/1", "http://example.com/2"])
+
+    collection.bulk_write.assert_called_once()
+    operations = collection.bulk_write.call_args.args[0]
+    assert [op._filter["url"] for op in operations] == ["http://example.com/1", "http://example.com/2"]
+    assert result == ["http://example.com/2"]
+
+def test_save_scrapped_upsert(mongo):
+    """Test that save_scrapped records the URL with an atomic upsert"""
+    from utils.db import save_scrapped
+    collection = mongo.return_value.__getitem__.return_value.__getitem__.return_value
+    collection.update_one.return_value.upserted_id = None
+
+    assert save_scrapped("http://example.com/1") is False
+    args, kwargs = collection.update_one.call_args
+    assert args[0] == {"url": "http://example.com/1"}
+    assert "$setOnInsert" in args[1]
+    assert kwargs["upsert"] is True
+
+def test_indexes_created_once(mongo):
+    """Test that the unique url index is created on first use only"""
+    from utils.db import should_scrape, URL_INDEX
+    collection = mongo.return_value.__getitem__.return_value.__getitem__.return_value
+    collection.index_information.return_value = {}
+
+    should_scrape("http://example.com/1")
+    should_scrape("http://example.com/2")
+
+    collection.create_index.assert_called_once_with("url", unique=True, name=URL_INDEX)
+
+def test_ensure_indexes_ttl(mocker):
+    """Test that ensure_indexes creates, updates and drops the TTL index"""
+    from utils.db import ensure_indexes, TTL_INDEX
+    collection = mocker.MagicMock()
+
+    collection.index_information.return_value = {}
+    ensure_indexes(collection, retention_days=30)
+    collection.create_index.assert_any_call("timestamp", name=TTL_INDEX, expireAfterSeconds=30 * 86400)
+
+    collection.index_information.return_value = {TTL_INDEX: {"expireAfterSeconds": 86400}}
+    ensure_indexes(collection, retention_days=30)
+    collection.database.command.assert_called_once()
+
+    ensure_indexes(collection, retention_days=0)
+    collection.drop_index.assert_called_once_with(TTL_INDEX)
+
+def test_ensure_indexes_removes_duplicates(mocker):
+    """Test that old duplicates are removed before creating the unique index"""
+    from pymongo.errors import DuplicateKeyError
+    from utils.db import ensure_indexes
+    collection = mocker.MagicMock()
+    collection.create_index.side_effect = [DuplicateKeyError("dup"), None]
+    collection.aggregate.return_value = [{"_id": "http://example.com/1", "ids": [1, 2, 3], "count": 3}]
+    collection.index_information.return_value = {}
+
+    ensure_indexes(collection, retention_days=0)
+
+    collection.delete_many.assert_called_once_with({"_id": {"$in": [2, 3]}})
+
+
+@pytest.fixture
+def seen_cache(mongo, mocker, tmp_path):
+    mocker.patch("utils.db.SEEN_CACHE_ENABLED", True)
+    mocker.patch("utils.db.SEEN_CACHE_PATH", str(tmp_path / "seen.bloom"))
+    mocker.patch("utils.db.SEEN_CACHE_CAPACITY", 1000)
+    collection = mongo.return_value.__getitem__.return_value.__getitem__.return_value
+    collection.find.return_value = [{"url": "http://example.com/old"}]
+    return collection
+
+def test_seen_cache_skips_database_for_new_urls(seen_cache):
+    """Test that a Bloom filter negative does not query the database"""
+    from utils.db import should_scrape
+    assert should_scrape("http://example.com/new") is True
+    # Apenas a consulta de aquecimento do cache
+    seen_cache.find.assert_called_once()
+    seen_cache.find_one.assert_not_called()
+
+def test_seen_cache_confirms_positives(seen_cache):
+    """Test that a Bloom filter positive is confirmed in the database"""
+    from utils.db import should_scrape
+    seen_cache.find_one.return_value = {"url": "http://example.com/old"}
+    assert should_scrape("http://example.com/old") is False
+    seen_cache.find_one.assert_called_once()
+
+def test_seen_cache_filter_new_urls(seen_cache):
+    """Test that filter_new_urls only sends probable positives to the database"""
+    from utils.db import filter_new_urls
+    result = filter_new_urls(["http://example.com/new", "http://example.com/old"])
+    assert result == ["http://example.com/new"]
+    query = seen_cache.find.call_args.args[0]
+    assert query == {"url": {"$in": ["http://example.com/old"]}}
+
+def test_seen_cache_persisted_and_warmed_incrementally(seen_cache, tmp_path):
+    """Test that a saved cache is reloaded and only newer URLs are read from the database"""
+    import utils.db
+    utils.db.get_seen_cache()
+    utils.db.save_seen_cache()
+    assert (tmp_path / "seen.bloom").exists()
+
+    utils.db._seen_cache = None
+    seen_cache.find.return_value = []
+    cache = utils.db.get_seen_cache()
+
+    assert "http://example.com/old" in cache
+    query = seen_cache.find.call_args.args[0]
+    assert "$gte" in query["timestamp"]
+
+
+STORY = ("A empresa anunciou nesta terça-feira um novo modelo de inteligência artificial "
+         "capaz de gerar vídeos a partir de texto, com lançamento previsto para o próximo mês "
+         "em todos os países onde o serviço já está disponível.")
+
+def test_register_story_new(mongo, mocker):
+    """Test that a story without similar signatures is recorded with its LSH bands"""
+    import utils.minhash
+    from utils.db import register_story, BANDS_INDEX
+    mocker.patch("utils.db.NEAR_DUP_ENABLED", True)
+    collection = mongo.return_value.__getitem__.return_value.__getitem__.return_value
+    collection.index_information.return_value = {}
+    collection.find.return_value = []
+
+    assert register_story("http://a.com/1", STORY) is None
+
+    query = collection.find.call_args.args[0]
+    assert query == {"bands": {"$in": utils.minhash.band_keys(utils.minhash.signature(STORY))}}
+    collection.create_index.assert_any_call("bands", name=BANDS_INDEX)
+    args, kwargs = collection.update_one.call_args
+    assert args[0] == {"url": "http://a.com/1"}
+    assert len(args[1]["$setOnInsert"]["bands"]) == utils.minhash.BANDS
+    assert kwargs["upsert"] is True
+
+def test_register_story_near_duplicate(mongo, mocker):
+    """Test that a near-identical story from another source is reported and not recorded"""
+    import utils.minhash
+    from utils.db import register_story
+    mocker.patch("utils.db.NEAR_DUP_ENABLED", True)
+    collection = mongo.return_value.__getitem__.return_value.__getitem__.return_value
+    collection.index_information.return_value = {}
+    stored = utils.minhash.to_bytes(utils.minhash.signature(STORY))
+    collection.find.return_value = [{"url": "http://a.com/1", "signature": stored}]
+
+    assert register_story("http://b.com/9", STORY.replace("terça-feira", "terça")) == "http://a.com/1"
+    collection.update_one.assert_not_called()
+
+def test_register_story_disabled(mongo):
+    """Test that near-duplicate detection does not touch the database when disabled"""
+    from utils.db import register_story
+    assert register_story("http://a.com/1", STORY) is None
+    mongo.assert_not_called()
@@ -0,0 +1,54 @@
+import json
+import pytest
+import scrapers.engine as engine
+from conftest import make_response
+
+
+@pytest.fixture
+def json_type(mocker):
+    # Tipo novo só com a extração das URLs; busca, filtro e escrita vêm do motor
+    mocker.patch.dict(engine.TYPES)
+
+    @engine.register("json-test")
+    class JsonList(engine.TargetType):
+        description = "JSON"
+        fields = ("items_key",)
+
+        def parse_child_urls(self, body, target):
+            return [item["url"] for item in json.loads(body)[target["items_key"]]][:target["depth"]]
+
+    return JsonList
+
+
+def test_plugin_type_uses_engine_pipeline(mocker, json_type):
+    target = {
+        "label": "J", "type": "json-test", "url": "http://api.com/news", "items_key": "news", "depth": 5,
+        "page": {"title": "h1", "content": "div.content"},
+    }
+    index = make_response(json.dumps({"news": [{"url": "http://api.com/1"}]}))
+    page = make_response("<h1>Título</h1><div class='content'>conteudo python</div>")
+    mocker.patch("requests.get", side_effect=[index, page])
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+
+    engine.validate([target])
+    engine.get_child_pages(target)
+
+    item = mock_save_md.call_args.args[0]
+    assert (item["title"], item["url"], item["source"]) == ("Título", "http://api.com/1", "J")
+
+
+def test_validate_unknown_type():
+    with pytest.raises(ValueError, match="Opção inválida: xyz"):
+        engine.validate([{"type": "xyz", "url": "http://a.com/"}])
+
+
+def test_validate_missing_fields(json_type):
+    target = {"label": "J", "type": "json-test", "url": "http://api.com/news", "depth": 5, "page": {}}
+    with pytest.raises(ValueError, match="sem items_key"):
+        engine.validate([target])
+
+
+def test_builtin_types_registered():
+    assert {"pcl", "sal", "rss", "sitemap"} <= set(engine.TYPES)
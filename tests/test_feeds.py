@@ -0,0 +1,157 @@
+import datetime
+import email.utils
+import httpx
+import pytest
+import scrapers.engine as engine
+import utils.crawler as crawler
+import utils.feeds
+import utils.metrics
+from conftest import make_response
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+LONG_TEXT = "python " + "texto completo da notícia " * 30
+
+
+def rss_date(hours_ago):
+    return email.utils.format_datetime(NOW - datetime.timedelta(hours=hours_ago))
+
+
+def iso_date(hours_ago):
+    return (NOW - datetime.timedelta(hours=hours_ago)).isoformat()
+
+
+def make_rss(*items):
+    body = ''.join(
+        f'<item><title>{title}</title><link>{link}</link><pubDate>{rss_date(age)}</pubDate>'
+        f'<description>{text}</description></item>'
+        for title, link, age, text in items
+    )
+    return ('<?xml version="1.0" encoding="utf-8"?><rss version="2.0" '
+            'xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel><title>Feed</title>'
+            f'{body}</channel></rss>').encode('utf-8')
+
+
+ATOM = f"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Atom</title>
+<entry><title>Um</title><link rel="self" href="http://a.com/self/1"/><link rel="alternate" href="http://a.com/1"/>
+<updated>{iso_date(1)}</updated><summary type="html">&lt;p&gt;Resumo &amp;amp; mais&lt;/p&gt;</summary></entry>
+<entry><title>Dois</title><link href="http://a.com/2"/><published>{iso_date(100)}</published></entry>
+</feed>""".encode('utf-8')
+
+SITEMAP = f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">
+<url><loc>http://s.com/1</loc><news:news><news:publication_date>{iso_date(2)}</news:publication_date>
+<news:title>Notícia 1</news:title></news:news></url>
+<url><loc>http://s.com/old</loc><lastmod>{iso_date(200)}</lastmod></url>
+<url><loc>http://s.com/2</loc><lastmod>{iso_date(3)}</lastmod></url>
+</urlset>""".encode('utf-8')
+
+
+def rss_target(**extra):
+    return dict({'label': 'F', 'type': 'rss', 'url': 'http://f.com/feed', 'depth': 10}, **extra)
+
+
+def test_rss_filters_by_date_and_depth():
+    body = make_rss(('Novo', 'http://f.com/1', 1, 'a'), ('Velho', 'http://f.com/2', 72, 'b'),
+                    ('Outro', 'http://f.com/3', 2, 'c'), ('Mais um', 'http://f.com/4', 3, 'd'))
+
+    entries = engine.parse_entries(body, rss_target(depth=2))
+
+    assert [(entry.url, entry.title, entry.text) for entry in entries] == [
+        ('http://f.com/1', 'Novo', 'a'), ('http://f.com/3', 'Outro', 'c')]
+    assert entries[0].published.tzinfo is not None
+
+
+def test_rss_stops_parsing_after_depth(mocker):
+    # O resto do feed nem chega ao parser: aqui ele é XML inválido
+    body = make_rss(('Novo', 'http://f.com/1', 1, 'a')).replace(b'</channel></rss>', b'<item><<<')
+    mocker.patch("utils.feeds.FEED_CHUNK_SIZE", 64)
+
+    assert [entry.url for entry in engine.parse_entries(body, rss_target(depth=1))] == ['http://f.com/1']
+
+
+def test_atom_entries():
+    entries = engine.parse_entries(ATOM, rss_target())
+
+    assert [(entry.url, entry.title, entry.text) for entry in entries] == [('http://a.com/1', 'Um', 'Resumo & mais')]
+
+
+def test_max_age_from_target():
+    assert len(engine.parse_entries(ATOM, rss_target(max_age_hours=0))) == 2
+
+
+def test_sitemap_entries():
+    target = {'type': 'sitemap', 'url': 'http://s.com/sitemap.xml', 'depth': 10}
+
+    entries = engine.parse_entries(SITEMAP, target)
+
+    assert [(entry.url, entry.title) for entry in entries] == [('http://s.com/1', 'Notícia 1'), ('http://s.com/2', None)]
+
+
+def test_validate_page_optional_for_feeds():
+    engine.validate([rss_target()])
+    with pytest.raises(ValueError, match="sem page"):
+        engine.validate([{'type': 'sitemap', 'url': 'http://s.com/sitemap.xml', 'depth': 10}])
+
+
+def test_serial_uses_feed_text_without_fetching(mocker):
+    body = make_rss(('Com texto', 'http://f.com/1', 1, LONG_TEXT), ('Curto', 'http://f.com/2', 1, 'python'))
+    article = make_response(b"<h1>Curto</h1><div class='content'>conteudo python</div>")
+    article.apparent_encoding = 'utf-8'
+    mock_get = mocker.patch("requests.get", side_effect=[make_response(body), article])
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+
+    engine.get_child_pages(rss_target(page={'title': 'h1', 'content': 'div.content'}))
+
+    # Só o feed e a notícia de texto curto são baixados
+    assert [call.args[0] for call in mock_get.call_args_list] == ['http://f.com/feed', 'http://f.com/2']
+    assert [call.args[0]['title'] for call in mock_save_md.call_args_list] == ['Com texto', 'Curto']
+    assert utils.metrics.report()['counters']['fetch_avoided']['targets'] == {'F': 1}
+
+
+def test_feed_text_filtered_by_keywords(mocker):
+    body = make_rss(('Sem palavra', 'http://f.com/1', 1, 'nada relevante'))
+    mock_get = mocker.patch("requests.get", return_value=make_response(body))
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mock_save_scrapped = mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+
+    engine.get_child_pages(rss_target(prefilter=False))
+
+    assert mock_get.call_count == 1
+    mock_save_scrapped.assert_called_once_with(['http://f.com/1'])
+    mock_save_md.assert_not_called()
+
+
+def test_crawl_uses_feed_text(mocker):
+    pages = {
+        'http://f.com/feed': make_rss(('Com texto', 'http://f.com/1', 1, LONG_TEXT), ('Curto', 'http://f.com/2', 1, 'x')),
+        'http://f.com/2': b"<h1>Curto</h1><div class='content'>conteudo python</div>",
+    }
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(200, content=pages[str(request.url)])
+
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+
+    target = rss_target(page={'title': 'h1', 'content': 'div.content'})
+    crawler.crawl([target], max_workers=2, transport=httpx.MockTransport(handler), parse_workers=0)
+
+    assert requested == ['http://f.com/feed', 'http://f.com/2']
+    assert [call.args[0]['url'] for call in mock_save_md.call_args_list] == ['http://f.com/1', 'http://f.com/2']
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Tue, 10 Jun 2025 04:00:00 GMT", datetime.datetime(2025, 6, 10, 4, tzinfo=datetime.timezone.utc)),
+    ("2025-06-10T04:00:00Z", datetime.datetime(2025, 6, 10, 4, tzinfo=datetime.timezone.utc)),
+    ("2025-06-10", datetime.datetime(2025, 6, 10, tzinfo=datetime.timezone.utc)),
+    ("ontem", None),
+])
+def test_parse_date(value, expected):
+    assert utils.feeds.parse_date(value) == expected
@@ -0,0 +1,58 @@
+import asyncio
+import httpx
+import pytest
+from utils.fetch import AsyncFetcher
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_get_returns_decoded_text():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, html="<h1>inteligência</h1>"))
+
+    async def scenario():
+        async with AsyncFetcher(transport=transport) as fetcher:
+            return await fetcher.get("http://a.com/")
+
+    assert run(scenario()) == "<h1>inteligência</h1>"
+
+
+def test_get_detects_encoding_without_charset():
+    body = "<p>educação e inovação na programação</p>".encode("utf-8")
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+
+    async def scenario():
+        async with AsyncFetcher(transport=transport) as fetcher:
+            return await fetcher.get("http://a.com/")
+
+    assert "educação" in run(scenario())
+
+
+def test_get_raises_on_http_error():
+    transport = httpx.MockTransport(lambda request: httpx.Response(500))
+
+    async def scenario():
+        async with AsyncFetcher(transport=transport) as fetcher:
+            await fetcher.get("http://a.com/")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(scenario())
+
+
+def test_per_host_limit():
+    active = {'now': 0, 'max': 0}
+
+    async def handler(request):
+        active['now'] += 1
+        active['max'] = max(active['max'], active['now'])
+        await asyncio.sleep(0.01)
+        active['now'] -= 1
+        return httpx.Response(200, text="")
+
+    async def scenario():
+        async with AsyncFetcher(max_workers=10, max_per_host=2, transport=httpx.MockTransport(handler)) as fetcher:
+            await asyncio.gather(*(fetcher.get(f"http://a.com/{i}") for i in range(6)))
+
+    run(scenario())
+    assert active['max'] == 2
@@ -0,0 +1,106 @@
+import pytest
+from bs4 import BeautifulSoup
+import scrapers.engine
+import utils.html
+
+INDEX_HTML = """
+<html><head><title>Index</title></head><body>
+<nav><a href="/menu">Menu</a></nav>
+<div class="tbl main"><article><div class="t"><a href="/1">Um</a></div></article>
+<article><div class="t"><a href="/2">Dois</a></div></article></div>
+<h3 class="headline"><a href="/3">Três</a></h3>
+</body></html>
+"""
+
+PAGE_HTML = """
+<html><body><header><h1 id="id_title">Título da notícia</h1></header>
+<div id="id_text"><p>Primeiro parágrafo.</p><p>Segundo.</p></div>
+<footer><p>Rodapé</p></footer></body></html>
+"""
+
+PCL_TARGET = {
+    'parent_container': 'div.tbl',
+    'child_anchor': 'article div.t a',
+    'uri': 'http://example.com',
+    'depth': 10,
+    'page': {'title': 'h1#id_title', 'content': 'div#id_text p'}
+}
+
+SAL_TARGET = {
+    'anchor_selector': 'h3.headline a',
+    'uri': 'http://example.com',
+    'depth': 10,
+    'page': {'title': 'h1', 'content': 'div#id_text'}
+}
+
+PARSERS = ['html.parser', 'lxml', 'selectolax']
+
+
+@pytest.fixture(params=PARSERS)
+def parser(request):
+    if request.param == 'lxml' and not utils.html.LXML_AVAILABLE:
+        pytest.skip("lxml não instalado")
+    if request.param == 'selectolax' and not utils.html.SELECTOLAX_AVAILABLE:
+        pytest.skip("selectolax não instalado")
+    return request.param
+
+
+def test_pcl_child_urls(parser):
+    target = dict(PCL_TARGET, parser=parser)
+    assert scrapers.engine.get_type('pcl').parse_child_urls(INDEX_HTML, target) == ['http://example.com/1', 'http://example.com/2']
+
+
+def test_sal_child_urls(parser):
+    target = dict(SAL_TARGET, parser=parser)
+    assert scrapers.engine.get_type('sal').parse_child_urls(INDEX_HTML, target) == ['http://example.com/3']
+
+
+def test_parse_page(parser):
+    target = dict(PCL_TARGET, parser=parser)
+    assert scrapers.engine.get_type('pcl').parse_page(PAGE_HTML, target) == ('Título da notícia', 'Primeiro parágrafo.')
+    target = dict(SAL_TARGET, parser=parser)
+    assert scrapers.engine.get_type('sal').parse_page(PAGE_HTML, target) == ('Título da notícia', 'Primeiro parágrafo. Segundo.')
+
+
+def test_parse_page_separates_paragraphs(parser):
+    # Sem separador os parágrafos ficariam colados e o resumo não acharia o fim das frases
+    html = '<html><body><h1>Título</h1><div class="c"><p>Primeira frase.</p><p>Segunda frase.</p><p>Terceira.</p></div></body></html>'
+    target = dict(SAL_TARGET, parser=parser, page={'title': 'h1', 'content': 'div.c'})
+    assert scrapers.engine.get_type('sal').parse_page(html, target) == ('Título', 'Primeira frase. Segunda frase. Terceira.')
+
+
+def test_parse_page_missing_element(parser):
+    target = dict(PCL_TARGET, parser=parser, page={'title': 'h2', 'content': 'div#id_text p'})
+    with pytest.raises(AttributeError):
+        scrapers.engine.get_type('pcl').parse_page(PAGE_HTML, target)
+
+
+def test_strainer_limits_parsed_tree():
+    soup = BeautifulSoup(PAGE_HTML, 'html.parser', parse_only=utils.html.strainer_for('h1#id_title', 'div#id_text p'))
+    assert [tag.name for tag in soup.find_all(recursive=False)] == ['h1', 'div']
+    assert soup.css.select('footer p') == []
+
+
+def test_strainer_matches_multi_valued_class():
+    soup = BeautifulSoup(INDEX_HTML, 'html.parser', parse_only=utils.html.strainer_for('div.tbl'))
+    assert len(soup.css.select('div.tbl article')) == 2
+
+
+@pytest.mark.parametrize("selector", ["div.a, p", "a[href]", "li:nth-child(2) a", "* a", "h2 + div a", "h2 ~ div"])
+def test_no_strainer_for_complex_selectors(selector):
+    assert utils.html.strainer_for(selector) is None
+
+
+def test_sibling_selector_finds_links_with_strainer():
+    html = '<h2>Notícias</h2><div><a href="/1">Um</a></div>'
+    strainer = utils.html.strainer_for('h2 + div a')
+    soup = BeautifulSoup(html, 'html.parser', parse_only=strainer)
+    assert [tag['href'] for tag in soup.css.select('h2 + div a')] == ['/1']
+
+
+def test_get_parser_fallback(mocker):
+    mocker.patch("utils.html.LXML_AVAILABLE", False)
+    mocker.patch("utils.html.SELECTOLAX_AVAILABLE", False)
+    assert utils.html.get_parser({'parser': 'lxml'}) == 'html.parser'
+    assert utils.html.get_parser({'parser': 'selectolax'}) == 'html.parser'
+    assert utils.html.get_parser({'parser': 'html.parser'}) == 'html.parser'
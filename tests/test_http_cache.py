@@ -0,0 +1,43 @@
+import json
+import utils.http_cache as http_cache
+
+URL = "http://example.com/index"
+
+
+def test_no_headers_for_unknown_url():
+    assert http_cache.request_headers(URL) == {}
+    assert http_cache.is_unchanged(URL, 200, "<html></html>") is False
+
+
+def test_conditional_headers_after_remember():
+    http_cache.remember(URL, {"ETag": '"abc"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}, "<html></html>")
+    assert http_cache.request_headers(URL) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+    }
+
+
+def test_unchanged_on_304_or_same_body():
+    assert http_cache.is_unchanged(URL, 304) is True
+
+    http_cache.remember(URL, {}, "<html>v1</html>")
+    assert http_cache.is_unchanged(URL, 200, "<html>v1</html>") is True
+    assert http_cache.is_unchanged(URL, 200, "<html>v2</html>") is False
+
+
+def test_save_and_reload():
+    http_cache.remember(URL, {"ETag": '"abc"'}, "<html></html>")
+    http_cache.save_http_cache()
+
+    with open(http_cache.HTTP_CACHE_PATH, encoding="utf-8") as f:
+        assert json.load(f)[URL]["etag"] == '"abc"'
+
+    http_cache.clear_http_cache()
+    assert http_cache.request_headers(URL) == {"If-None-Match": '"abc"'}
+
+
+def test_disabled(mocker):
+    mocker.patch("utils.http_cache.HTTP_CACHE_ENABLED", False)
+    http_cache.remember(URL, {"ETag": '"abc"'}, "<html></html>")
+    assert http_cache.request_headers(URL) == {}
+    assert http_cache.is_unchanged(URL, 304) is False
@@ -1,7 +1,7 @@
 import os
 import unittest
 from unittest.mock import patch, mock_open
-from utils.keywords import load_required_keywords, check_content_has_keywords
+from utils.keywords import load_required_keywords, check_content_has_keywords, get_matcher, clear_matcher_cache, KeywordMatcher, find_keyword_hits, AhoCorasick, normalize_text
 
 
 class TestLoadRequiredKeywords(unittest.TestCase):
@@ -40,6 +40,10 @@ class TestLoadRequiredKeywords(unittest.TestCase):
 
 class TestCheckContentHasKeywords(unittest.TestCase):
 
+    def setUp(self):
+        # Garante que o matcher do arquivo será recarregado com os mocks do teste
+        clear_matcher_cache()
+
     @patch('utils.keywords.load_required_keywords')
     def test_no_required_keywords(self, mock_load_keywords):
         # Simula que não há palavras-chave carregadas
@@ -77,5 +81,79 @@ class TestCheckContentHasKeywords(unittest.TestCase):
         self.assertEqual(result, (False, required_words))
 
 
+class TestKeywordMatcher(unittest.TestCase):
+
+    def setUp(self):
+        clear_matcher_cache()
+
+    def tearDown(self):
+        clear_matcher_cache()
+
+    def test_matcher_whole_words(self):
+        matcher = KeywordMatcher(["ia", "python"])
+        self.assertTrue(matcher.search("Novidades de IA no mercado"))
+        self.assertFalse(matcher.search("Uma média diária"))
+        self.assertTrue(KeywordMatcher([]).search("qualquer coisa"))
+
+    @patch('utils.keywords._keywords_mtime')
+    @patch('utils.keywords.load_required_keywords')
+    def test_matcher_built_once(self, mock_load_keywords, mock_mtime):
+        # O arquivo só é lido uma vez enquanto o mtime não muda
+        mock_load_keywords.return_value = ["keyword1"]
+        mock_mtime.return_value = 1.0
+        for _ in range(3):
+            check_content_has_keywords("content with keyword1")
+        self.assertEqual(mock_load_keywords.call_count, 1)
+        self.assertIs(get_matcher(), get_matcher())
+
+    @patch('utils.keywords._keywords_mtime')
+    @patch('utils.keywords.load_required_keywords')
+    def test_matcher_rebuilt_when_file_changes(self, mock_load_keywords, mock_mtime):
+        mock_load_keywords.return_value = ["keyword1"]
+        mock_mtime.return_value = 1.0
+        self.assertEqual(check_content_has_keywords("content with keyword2"), (False, ["keyword1"]))
+
+        mock_load_keywords.return_value = ["keyword2"]
+        mock_mtime.return_value = 2.0
+        self.assertEqual(check_content_has_keywords("content with keyword2"), (True, ["keyword2"]))
+        self.assertEqual(mock_load_keywords.call_count, 2)
+
+
+class TestAhoCorasick(unittest.TestCase):
+
+    def test_finds_overlapping_words(self):
+        automaton = AhoCorasick(["he", "she", "his", "hers"])
+        found = sorted((start, end, automaton.words[index]) for start, end, index in automaton.iter("ushers"))
+        self.assertEqual(found, [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")])
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("Inteligência Artificial"), "inteligencia artificial")
+        self.assertEqual(normalize_text("Educação"), "educacao")
+
+
+class TestFindKeywordHits(unittest.TestCase):
+
+    def test_hit_counts(self):
+        content = "IA e inteligência artificial: a IA generativa usa inteligencia estatística."
+        has_keywords, hits = find_keyword_hits(content, ["ia", "inteligência", "python"])
+        self.assertTrue(has_keywords)
+        self.assertEqual(hits, {"ia": 2, "inteligência": 2})
+
+    def test_accent_insensitive(self):
+        self.assertEqual(check_content_has_keywords("educacao e inovacao", ["educação"]), (True, ["educação"]))
+        self.assertEqual(check_content_has_keywords("Educação Básica", ["educacao"]), (True, ["educacao"]))
+
+    def test_whole_words_only(self):
+        self.assertEqual(find_keyword_hits("diária e mídia social", ["ia"]), (False, {}))
+        self.assertEqual(find_keyword_hits("keyword_1 keyword1", ["keyword"]), (False, {}))
+
+    def test_no_keywords(self):
+        self.assertEqual(find_keyword_hits("qualquer coisa", []), (True, {}))
+
+    def test_keywords_with_same_normalized_form(self):
+        _, hits = find_keyword_hits("inteligencia", ["inteligência", "inteligencia"])
+        self.assertEqual(hits, {"inteligência": 1, "inteligencia": 1})
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
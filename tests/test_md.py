@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+import pytest
+import utils.md
+from utils.md import BriefingWriter, save_markdown, open_briefing, close_briefing
+
+
+def item(i):
+    return {"title": f"Título  {i}", "url": f"http://example.com/{i}", "summary": f"Resumo\n{i}"}
+
+
+@pytest.fixture
+def briefing(tmp_path):
+    yield str(tmp_path / "briefing.md")
+    close_briefing()
+
+
+def test_save_markdown_without_writer(briefing):
+    save_markdown(item(1), briefing)
+    save_markdown(item(2), briefing)
+
+    with open(briefing, encoding='utf-8') as f:
+        content = f.read()
+    assert content.count("# Briefing Diário") == 1
+    assert "## Título 1\n**URL:** http://example.com/1\n\n**Resumo:** Resumo 1\n\n---\n" in content
+    assert "## Título 2" in content
+
+
+def test_writer_buffers_until_flush(briefing):
+    writer = BriefingWriter(briefing)
+    writer.add(item(1))
+    assert not os.path.exists(briefing)
+
+    writer.close()
+    with open(briefing, encoding='utf-8') as f:
+        content = f.read()
+    assert content.startswith("# Briefing Diário")
+    assert "## Título 1" in content
+    # Nenhum arquivo temporário nem trava sobra no diretório
+    assert [name for name in os.listdir(os.path.dirname(briefing)) if name.endswith(('.tmp', '.lock'))] == []
+
+
+def test_writer_appends_to_existing_briefing(briefing):
+    # Duas execuções no mesmo dia acumulam no mesmo briefing
+    with BriefingWriter(briefing) as writer:
+        writer.add(item(1))
+    with BriefingWriter(briefing) as writer:
+        writer.add(item(2))
+
+    with open(briefing, encoding='utf-8') as f:
+        content = f.read()
+    assert content.count("# Briefing Diário") == 1
+    assert content.index("## Título 1") < content.index("## Título 2")
+
+
+def test_writer_generates_all_formats(briefing):
+    with BriefingWriter(briefing, formats=["md", "html"]) as writer:
+        writer.add(dict(item(1), source="IGN", keywords={"ia": 2}))
+
+    base = os.path.splitext(briefing)[0]
+    with open(f"{base}.jsonl", encoding='utf-8') as f:
+        stored = json.loads(f.readline())
+    assert stored["source"] == "IGN"
+    assert stored["keywords"] == {"ia": 2}
+    assert stored["timestamp"]
+    with open(f"{base}.html", encoding='utf-8') as f:
+        assert '<a href="http://example.com/1">' in f.read()
+
+
+def test_writer_only_requested_formats(briefing):
+    with BriefingWriter(briefing, formats=["md"]) as writer:
+        writer.add(item(1))
+
+    base = os.path.splitext(briefing)[0]
+    assert os.path.exists(briefing)
+    assert os.path.exists(f"{base}.jsonl")
+    assert not os.path.exists(f"{base}.html")
+
+
+def test_writer_flushes_when_buffer_is_full(briefing):
+    writer = BriefingWriter(briefing, flush_every=2)
+    writer.add(item(1))
+    writer.add(item(2))
+    assert os.path.exists(briefing)
+    writer.close()
+
+
+def test_save_markdown_uses_active_writer(briefing):
+    open_briefing(briefing)
+    save_markdown(item(1))
+    assert not os.path.exists(briefing)
+
+    close_briefing()
+    with open(briefing, encoding='utf-8') as f:
+        assert "## Título 1" in f.read()
+    assert utils.md._active_writer is None
+
+
+def test_concurrent_writers_do_not_lose_entries(briefing):
+    writers = [BriefingWriter(briefing, flush_every=1) for _ in range(4)]
+
+    def work(writer, offset):
+        for i in range(25):
+            writer.add(item(offset + i))
+
+    threads = [threading.Thread(target=work, args=(writer, n * 100)) for n, writer in enumerate(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(briefing, encoding='utf-8') as f:
+        content = f.read()
+    assert content.count("## Título") == 100
+    assert content.count("# Briefing Diário") == 1
+
+
+def test_writer_imports_legacy_markdown_briefing(briefing):
+    # Briefing do dia gravado antes do .jsonl existir
+    save_markdown(item(1), briefing)
+    save_markdown(item(2), briefing)
+
+    with BriefingWriter(briefing, formats=["md", "html"]) as writer:
+        writer.add(item(3))
+
+    with open(briefing, encoding='utf-8') as f:
+        content = f.read()
+    assert content.count("# Briefing Diário") == 1
+    assert content.index("## Título 1") < content.index("## Título 2") < content.index("## Título 3")
+    base = os.path.splitext(briefing)[0]
+    with open(f"{base}.jsonl", encoding='utf-8') as f:
+        assert [json.loads(line)["url"] for line in f] == [f"http://example.com/{i}" for i in (1, 2, 3)]
+    with open(f"{base}.html", encoding='utf-8') as f:
+        assert f.read().count("<article>") == 3
+
+
+def test_writer_flush_does_not_rerender_existing_outputs(briefing, mocker):
+    with BriefingWriter(briefing, formats=["md", "html"]) as writer:
+        writer.add(item(1))
+    reads = mocker.spy(utils.md.BriefingStore, "__iter__")
+
+    with BriefingWriter(briefing, formats=["md", "html"]) as writer:
+        writer.add(item(2))
+
+    reads.assert_not_called()
+    base = os.path.splitext(briefing)[0]
+    with open(f"{base}.html", encoding='utf-8') as f:
+        assert f.read().count("<article>") == 2
+
+
+def test_writer_append_failure_keeps_previous_outputs(briefing, mocker):
+    with BriefingWriter(briefing, formats=["md"]) as writer:
+        writer.add(item(1))
+    with open(briefing, encoding='utf-8') as f:
+        before = f.read()
+
+    mocker.patch.object(utils.md.MarkdownRenderer, "item", side_effect=RuntimeError("falha"))
+    writer = BriefingWriter(briefing, formats=["md"])
+    writer.add(item(2))
+    with pytest.raises(RuntimeError):
+        writer.flush()
+
+    # A saída é trocada inteira ou não é trocada
+    with open(briefing, encoding='utf-8') as f:
+        assert f.read() == before
+    assert [name for name in os.listdir(os.path.dirname(briefing)) if name.endswith('.tmp')] == []
+
+
+def test_writer_new_format_rendered_from_store(briefing):
+    with BriefingWriter(briefing, formats=["md"]) as writer:
+        writer.add(item(1))
+    with BriefingWriter(briefing, formats=["md", "html"]) as writer:
+        writer.add(item(2))
+
+    with open(f"{os.path.splitext(briefing)[0]}.html", encoding='utf-8') as f:
+        assert f.read().count("<article>") == 2
+
+
+def test_writer_rejects_unknown_format(briefing):
+    with pytest.raises(ValueError, match="Opção inválida: pdf"):
+        BriefingWriter(briefing, formats=["md", "pdf"])
+    BriefingWriter(briefing, formats=["jsonl"]).close()
@@ -0,0 +1,86 @@
+import json
+import os
+import utils.metrics as metrics
+
+
+def test_histogram_buckets_and_stats():
+    histogram = metrics.Histogram()
+    for value in (0.002, 0.002, 0.3, 100.0):
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.min == 0.002
+    assert histogram.max == 100.0
+    assert histogram.buckets[metrics.BUCKETS.index(0.005)] == 2
+    assert histogram.buckets[metrics.BUCKETS.index(0.5)] == 1
+    assert histogram.buckets[-1] == 1  # +Inf
+
+
+def test_incr_counts_total_and_target():
+    metrics.incr("pages_fetched", target="A")
+    metrics.incr("pages_fetched", 2, target="B")
+    metrics.incr("pages_fetched")
+
+    counters = metrics.report()["counters"]["pages_fetched"]
+    assert counters == {"total": 4, "targets": {"A": 1, "B": 2}}
+
+
+def test_timer_and_timed_record_stage():
+    @metrics.timed("parse")
+    def parse():
+        return "ok"
+
+    assert parse() == "ok"
+    with metrics.timer("fetch", "A"):
+        pass
+
+    stages = metrics.report()["stages"]
+    assert stages["parse"]["count"] == 1
+    assert stages["fetch"]["count"] == 1
+    assert stages["fetch"]["targets"]["A"]["count"] == 1
+
+
+def test_run_collected_returns_worker_measurements():
+    def work(value):
+        metrics.incr("items", target="A")
+        return value * 2
+
+    result, snapshot = metrics.run_collected(work, 21)
+
+    assert result == 42
+    # A medição fica no registro do worker até ser mesclada
+    assert metrics.report()["counters"] == {}
+    metrics.merge(snapshot)
+    assert metrics.report()["counters"]["items"] == {"total": 1, "targets": {"A": 1}}
+
+
+def test_prometheus_text_format():
+    metrics.incr("items_written", 3, target='Fonte "A"')
+    metrics.observe("fetch", 0.2)
+
+    text = metrics.prometheus_text()
+
+    assert "# TYPE briefing_items_written_total counter" in text
+    assert 'briefing_items_written_total{target="Fonte \\"A\\""} 3' in text
+    assert "briefing_items_written_total 3" in text
+    assert 'briefing_stage_seconds_bucket{stage="fetch",le="0.25"} 1' in text
+    assert 'briefing_stage_seconds_bucket{stage="fetch",le="+Inf"} 1' in text
+    assert 'briefing_stage_seconds_count{stage="fetch"} 1' in text
+
+
+def test_write_reports(tmp_path):
+    metrics.incr("pages_fetched", target="A")
+
+    path = metrics.write_reports(str(tmp_path))
+
+    assert path.endswith("-run.json")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["counters"]["pages_fetched"]["total"] == 1
+    assert os.path.exists(tmp_path / "metrics.prom")
+
+
+def test_write_reports_disabled(mocker, tmp_path):
+    mocker.patch("utils.metrics.METRICS_ENABLED", False)
+
+    assert metrics.write_reports(str(tmp_path)) is None
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,43 @@
+import numpy as np
+import utils.minhash as minhash
+
+TEXT = ("O governo anunciou hoje um pacote de investimentos em pesquisa de inteligência "
+        "artificial, com foco em universidades públicas e centros de pesquisa regionais, "
+        "que deve ser votado no congresso até o fim do ano.")
+
+
+def test_signature_is_deterministic():
+    first = minhash.signature(TEXT)
+    assert first.dtype == np.uint32
+    assert len(first) == minhash.NUM_PERM
+    assert np.array_equal(first, minhash.signature(TEXT))
+
+
+def test_similarity_ignores_case_and_accents():
+    assert minhash.similarity(minhash.signature(TEXT), minhash.signature(TEXT.upper())) == 1.0
+    sig = minhash.signature("Inteligência Artificial avança")
+    assert minhash.similarity(sig, minhash.signature("inteligencia artificial avanca")) == 1.0
+
+
+def test_near_duplicates_share_a_band():
+    edited = TEXT.replace("hoje", "nesta segunda-feira")
+    first, second = minhash.signature(TEXT), minhash.signature(edited)
+    assert minhash.similarity(first, second) > 0.6
+    assert set(minhash.band_keys(first)) & set(minhash.band_keys(second))
+
+
+def test_different_texts_are_not_similar():
+    other = minhash.signature("O time venceu a partida por três a zero e segue líder do campeonato nacional.")
+    first = minhash.signature(TEXT)
+    assert minhash.similarity(first, other) < 0.2
+    assert not set(minhash.band_keys(first)) & set(minhash.band_keys(other))
+
+
+def test_bytes_round_trip():
+    sig = minhash.signature(TEXT)
+    assert np.array_equal(minhash.from_bytes(minhash.to_bytes(sig)), sig)
+
+
+def test_empty_text():
+    assert minhash.shingles("") == set()
+    assert len(minhash.signature("")) == minhash.NUM_PERM
@@ -0,0 +1,166 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import scrapers.engine as engine
+import utils.page_cache as page_cache
+import utils.reprocess
+from conftest import make_response, make_target
+
+PAGE_HTML = "<html><body><h1>{title}</h1><div class='content'>{content}</div><p class='resumo'>{teaser}</p></body></html>"
+
+
+def test_put_and_get_roundtrip():
+    html = "<html><body>" + "notícia " * 1000 + "</body></html>"
+    digest = page_cache.put("http://a.com/1", html, "A")
+
+    assert page_cache.get("http://a.com/1") == html
+    assert page_cache.get("http://a.com/2") is None
+    path = page_cache.path_for("http://a.com/1")
+    assert os.path.basename(path).startswith(digest)
+    # Comprimido no disco
+    assert os.path.getsize(path) < len(html.encode("utf-8")) / 10
+
+
+def test_same_content_stored_once():
+    page_cache.put("http://a.com/1", "<p>igual</p>", "A")
+    page_cache.put("http://a.com/1?utm=x", "<p>igual</p>", "A")
+
+    assert page_cache.path_for("http://a.com/1") == page_cache.path_for("http://a.com/1?utm=x")
+    assert len(page_cache.entries()) == 2
+
+
+def test_concurrent_puts_of_same_content():
+    html = "<p>" + "mesma notícia " * 1000 + "</p>"
+    barrier = threading.Barrier(8)
+
+    def put(number):
+        barrier.wait()
+        return page_cache.put(f"http://a.com/{number}", html, "A")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        digests = set(executor.map(put, range(8)))
+
+    assert len(digests) == 1
+    assert page_cache.get("http://a.com/0") == html
+    assert not [name for name in os.listdir(os.path.dirname(page_cache.path_for("http://a.com/0")))
+                if name.endswith(".tmp")]
+
+
+def test_index_persisted():
+    page_cache.put("http://a.com/1", "<p>um</p>", "A")
+    page_cache.save_page_cache()
+    page_cache.clear_page_cache()
+
+    assert page_cache.get("http://a.com/1") == "<p>um</p>"
+    assert [(url, entry["target"]) for url, entry in page_cache.entries()] == [("http://a.com/1", "A")]
+
+
+def test_lru_eviction(mocker):
+    pages = {f"http://a.com/{number}": os.urandom(3000).hex() for number in range(4)}
+    page_size = len(page_cache.compress(pages["http://a.com/0"])[1])
+    mocker.patch("utils.page_cache.PAGE_CACHE_MAX_MB", page_size * 3.5 / 2 ** 20)
+    mocker.patch("utils.page_cache.time.time", side_effect=range(100))
+
+    for url in list(pages)[:3]:
+        page_cache.put(url, pages[url], "A")
+    # A primeira página foi lida de novo: a menos usada passa a ser a segunda
+    assert page_cache.get("http://a.com/0") == pages["http://a.com/0"]
+    page_cache.put("http://a.com/3", pages["http://a.com/3"], "A")
+
+    assert page_cache.get("http://a.com/1") is None
+    assert page_cache.get("http://a.com/0") == pages["http://a.com/0"]
+    assert page_cache.get("http://a.com/3") == pages["http://a.com/3"]
+    assert page_cache.size() <= page_cache.PAGE_CACHE_MAX_MB * 2 ** 20
+
+
+def test_disabled(mocker):
+    mocker.patch("utils.page_cache.PAGE_CACHE_ENABLED", False)
+    assert page_cache.put("http://a.com/1", "<p>um</p>", "A") is None
+    assert page_cache.get("http://a.com/1") is None
+
+
+def test_engine_caches_fetched_pages(mocker):
+    index = make_response('<div class="list"><a href="/1">1</a></div>')
+    page = make_response(PAGE_HTML.format(title='Um', content='conteudo python', teaser=''))
+    mocker.patch("requests.get", side_effect=[index, page])
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.md.save_markdown")
+
+    engine.get_child_pages(make_target())
+
+    assert page_cache.get("http://a.com/1") == page.text
+    assert page_cache.get("http://a.com/") is None
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_reprocess_with_new_selectors(mocker, tmp_path, workers):
+    page_cache.put("http://a.com/1", PAGE_HTML.format(title='Um', content='sem nada', teaser='resumo sobre python'), "A")
+    page_cache.put("http://a.com/2", PAGE_HTML.format(title='Dois', content='nada', teaser='outro assunto'), "A")
+    page_cache.put("http://b.com/1", PAGE_HTML.format(title='B', content='python', teaser='python'), "B")
+    requests_get = mocker.patch("requests.get")
+    filter_new_urls = mocker.patch("utils.db.filter_new_urls")
+    briefing = tmp_path / "reprocess.md"
+    if workers:
+        # Os workers (spawn) leem os arquivos pelo caminho; o índice fica no processo principal
+        mocker.patch("utils.reprocess.REPROCESS_WORKERS", workers)
+
+    # Conteúdo agora vem de p.resumo; o alvo B saiu da configuração
+    utils.reprocess.run([make_target(page={'title': 'h1', 'content': 'p.resumo'})], workers, str(briefing))
+
+    text = briefing.read_text(encoding='utf-8')
+    assert "## Um" in text and "http://a.com/1" in text
+    assert "## Dois" not in text and "## B" not in text
+    requests_get.assert_not_called()
+    filter_new_urls.assert_not_called()
+
+
+def test_reprocess_skips_pages_without_selectors(tmp_path):
+    page_cache.put("http://a.com/1", "<html><body><p>outro layout</p></body></html>", "A")
+
+    utils.reprocess.run([make_target()], 0, str(tmp_path / "reprocess.md"))
+
+    # Nenhuma notícia: o briefing nem chega a ser criado
+    assert not (tmp_path / "reprocess.md").exists()
+
+
+@pytest.mark.parametrize("damage", ["truncate", "delete", "without_zstandard"])
+def test_reprocess_skips_unreadable_objects(mocker, tmp_path, damage):
+    page_cache.put("http://a.com/1", PAGE_HTML.format(title='Um', content='python', teaser=''), "A")
+    page_cache.put("http://a.com/2", PAGE_HTML.format(title='Dois', content='python', teaser=''), "A")
+    path = page_cache.path_for("http://a.com/1")
+    if damage == "truncate":
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) // 2)
+    elif damage == "delete":
+        os.remove(path)
+    else:
+        if not path.endswith(".zst"):
+            pytest.skip("zstandard não instalado")
+        # Cache gravado com zstd e lido em um ambiente sem o pacote
+        mocker.patch("utils.page_cache.ZSTD_AVAILABLE", False)
+    briefing = tmp_path / "reprocess.md"
+
+    utils.reprocess.run([make_target()], 0, str(briefing))
+
+    text = briefing.read_text(encoding='utf-8')
+    assert "## Dois" in text and "## Um" not in text
+
+
+def test_crawl_caches_fetched_pages(mocker):
+    import httpx
+    import utils.crawler
+    pages = {
+        'http://a.com/': '<div class="list"><a href="/1">1</a></div>',
+        'http://a.com/1': PAGE_HTML.format(title='Um', content='conteudo python', teaser=''),
+    }
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, html=pages[str(request.url)]))
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.md.save_markdown")
+
+    utils.crawler.crawl([make_target()], transport=transport, parse_workers=0)
+
+    assert page_cache.get("http://a.com/1") == pages['http://a.com/1']
+    assert [entry["target"] for url, entry in page_cache.entries()] == ["A"]
@@ -1,10 +1,16 @@
 import pytest
 from unittest.mock import MagicMock
-import scrapers.pcl as pcl
+import requests
+import scrapers.engine as engine
+import utils.http_cache
+import utils.metrics
+import utils.policy
+from conftest import make_response
 
 @pytest.fixture
 def target():
     return {
+        'type': 'pcl',
         'url': 'http://example.com/parent',
         'parent_container': '.parent',
         'child_anchor': 'a.child',
@@ -16,135 +22,85 @@ def target():
         }
     }
 
-def make_bs4_element(href, title_text, content_text):
-    # Simulate a bs4.element.Tag with .get_text and attribute access
-    anchor = MagicMock()
-    anchor.__getitem__.side_effect = lambda k: href if k == 'href' else None
-    title = MagicMock()
-    title.get_text.return_value = title_text
-    content = MagicMock()
-    content.get_text.return_value = content_text
-    return anchor, title, content
+def make_index_html(*hrefs):
+    # Página índice com os links dentro do container pai
+    links = ''.join(f'<a class="child" href="{href}">{href}</a>' for href in hrefs)
+    return f'<html><body><a class="child" href="/fora">x</a><div class="parent">{links}</div></body></html>'
+
+def make_page_html(title_text, content_text):
+    return f'<html><body><h1 class="title">{title_text}</h1><div class="content">{content_text}</div></body></html>'
 
 def test_scrape_all_new_pages_with_keywords(mocker, target):
     # Mock parent page response
-    parent_html = "<html></html>"
-    parent_resp = MagicMock()
-    parent_resp.text = parent_html
-    parent_resp.status_code = 200
-    parent_resp.raise_for_status = MagicMock()
-    parent_resp.apparent_encoding = 'utf-8'
-    parent_resp.encoding = None
-
-    # Mock child page response
-    child_html = "<html></html>"
-    child_resp = MagicMock()
-    child_resp.text = child_html
-    child_resp.status_code = 200
-    child_resp.raise_for_status = MagicMock()
-    child_resp.apparent_encoding = 'utf-8'
-    child_resp.encoding = None
+    parent_resp = make_response(make_index_html('/child1', '/child2'))
+
+    # Mock child page responses
+    child_resp = make_response(make_page_html('Title 1', 'Content with keyword'))
+    child_resp2 = make_response(make_page_html('Title 2', 'Another content with keyword'))
 
     # Patch requests.get to return parent, then child responses
-    mock_get = mocker.patch("requests.get", side_effect=[parent_resp, child_resp, child_resp])
-
-    # Patch BeautifulSoup and its .css.select
-    anchor1, title1, content1 = make_bs4_element('/child1', 'Title 1', 'Content with keyword')
-    anchor2, title2, content2 = make_bs4_element('/child2', 'Title 2', 'Another content with keyword')
-    soup_parent = MagicMock()
-    soup_parent.css.select.return_value = [anchor1, anchor2]
-    soup_child = MagicMock()
-    soup_child.css.select_one.side_effect = [title1, content1]  # for first child
-    soup_child2 = MagicMock()
-    soup_child2.css.select_one.side_effect = [title2, content2]  # for second child
-
-    mock_bs4 = mocker.patch("scrapers.pcl.BeautifulSoup", side_effect=[soup_parent, soup_child, soup_child2])
-
-    # Patch should_scrape to always return True
-    mocker.patch("utils.db.should_scrape", return_value=True)
-    # Patch save_scrapped
-    mock_save_scrapped = mocker.patch("utils.db.save_scrapped")
-    # Patch summarize
-    mocker.patch("utils.db.summarize", side_effect=lambda x: x[:300])
-    # Patch check_content_has_keywords to always return (True, [...])
-    mocker.patch("utils.keywords.check_content_has_keywords", return_value=(True, ['keyword']))
+    mock_get = mocker.patch("requests.get", side_effect=[parent_resp, child_resp, child_resp2])
+
+    # Patch filter_new_urls to treat every URL as new
+    mock_filter_new_urls = mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    # Patch save_scrapped_many
+    mock_save_scrapped = mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    # Patch summarize_many
+    mock_summarize = mocker.patch("utils.db.summarize_many", side_effect=lambda texts: [x[:300] for x in texts])
+    # Patch find_keyword_hits to always find the keyword
+    mocker.patch("utils.keywords.find_keyword_hits", return_value=(True, {'keyword': 1}))
     # Patch save_markdown
     mock_save_md = mocker.patch("utils.md.save_markdown")
 
-    pcl.get_child_pages(target)
+    engine.get_child_pages(target)
 
     # Should call requests.get for parent and each child
     assert mock_get.call_count == 3
-    # Should save scrapped for each child
-    assert mock_save_scrapped.call_count == 2
+    assert [call.args[0] for call in mock_get.call_args_list[1:]] == ['http://example.com/child1', 'http://example.com/child2']
+    # One lookup and one batch write for the whole index
+    mock_filter_new_urls.assert_called_once_with(['http://example.com/child1', 'http://example.com/child2'])
+    mock_save_scrapped.assert_called_once_with(['http://example.com/child1', 'http://example.com/child2'])
     # Should save markdown for each child
     assert mock_save_md.call_count == 2
-    # Should call summarize for each child content
-    # Should call check_content_has_keywords for each child content
+    assert mock_save_md.call_args_list[0].args[0]['title'] == 'Title 1'
+    assert mock_save_md.call_args_list[1].args[0]['summary'] == 'Another content with keyword'
+    # The keywords found go to the briefing, as in the concurrent mode
+    assert mock_save_md.call_args_list[0].args[0]['keywords'] == {'keyword': 1}
+    # All pages of the target are summarized together
+    mock_summarize.assert_called_once_with(['Content with keyword', 'Another content with keyword'])
 
 def test_skip_already_scrapped_urls(mocker, target):
     # Mock parent page response
-    parent_resp = MagicMock()
-    parent_resp.text = "<html></html>"
-    parent_resp.status_code = 200
-    parent_resp.raise_for_status = MagicMock()
-    parent_resp.apparent_encoding = 'utf-8'
-    parent_resp.encoding = None
-
+    parent_resp = make_response(make_index_html('/child1', '/child2'))
     mocker.patch("requests.get", return_value=parent_resp)
 
-    anchor1, _, _ = make_bs4_element('/child1', 'Title 1', 'Content')
-    anchor2, _, _ = make_bs4_element('/child2', 'Title 2', 'Content')
-    soup_parent = MagicMock()
-    soup_parent.css.select.return_value = [anchor1, anchor2]
-    mocker.patch("scrapers.pcl.BeautifulSoup", return_value=soup_parent)
-
-    # Patch should_scrape to always return False (already scrapped)
-    mock_should_scrape = mocker.patch("utils.db.should_scrape", return_value=False)
-    mock_save_scrapped = mocker.patch("utils.db.save_scrapped")
+    # Patch filter_new_urls to return nothing (already scrapped)
+    mock_filter_new_urls = mocker.patch("utils.db.filter_new_urls", return_value=[])
+    mock_save_scrapped = mocker.patch("utils.db.save_scrapped_many", return_value=[])
     mock_save_md = mocker.patch("utils.md.save_markdown")
 
-    pcl.get_child_pages(target)
+    engine.get_child_pages(target)
 
-    # Should call should_scrape for each child
-    assert mock_should_scrape.call_count == 2
-    # Should NOT call save_scrapped or save_markdown
-    mock_save_scrapped.assert_not_called()
+    # Should check every child with a single query
+    assert mock_filter_new_urls.call_count == 1
+    # Should NOT record any URL nor call save_markdown
+    mock_save_scrapped.assert_called_once_with([])
     mock_save_md.assert_not_called()
 
 def test_ignore_pages_without_required_keywords(mocker, target):
     # Mock parent and child page responses
-    parent_resp = MagicMock()
-    parent_resp.text = "<html></html>"
-    parent_resp.status_code = 200
-    parent_resp.raise_for_status = MagicMock()
-    parent_resp.apparent_encoding = 'utf-8'
-    parent_resp.encoding = None
-
-    child_resp = MagicMock()
-    child_resp.text = "<html></html>"
-    child_resp.status_code = 200
-    child_resp.raise_for_status = MagicMock()
-    child_resp.apparent_encoding = 'utf-8'
-    child_resp.encoding = None
-
+    parent_resp = make_response(make_index_html('/child1'))
+    child_resp = make_response(make_page_html('Title 1', 'Content without keywords'))
     mocker.patch("requests.get", side_effect=[parent_resp, child_resp])
 
-    anchor, title, content = make_bs4_element('/child1', 'Title 1', 'Content without keywords')
-    soup_parent = MagicMock()
-    soup_parent.css.select.return_value = [anchor]
-    soup_child = MagicMock()
-    soup_child.css.select_one.side_effect = [title, content]
-    mocker.patch("scrapers.pcl.BeautifulSoup", side_effect=[soup_parent, soup_child])
-
-    mocker.patch("utils.db.should_scrape", return_value=True)
-    mocker.patch("utils.db.save_scrapped")
-    mocker.patch("utils.db.summarize")
-    # Patch check_content_has_keywords to return False
-    mocker.patch("utils.keywords.check_content_has_keywords", return_value=(False, ['keyword']))
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.summarize_many")
+    # Patch find_keyword_hits to find nothing
+    mocker.patch("utils.keywords.find_keyword_hits", return_value=(False, {}))
     mock_save_md = mocker.patch("utils.md.save_markdown")
 
-    pcl.get_child_pages(target)
+    engine.get_child_pages(target)
 
     # Should NOT call save_markdown since keywords not found
     mock_save_md.assert_not_called()
@@ -153,97 +109,118 @@ def test_handle_http_request_failure(mocker, target):
     # Simulate requests.get raising an exception for parent page
     mocker.patch("requests.get", side_effect=Exception("Network error"))
     with pytest.raises(Exception, match="Network error"):
-        pcl.get_child_pages(target)
+        engine.get_child_pages(target)
 
     # Simulate requests.get raising an exception for child page
-    parent_resp = MagicMock()
-    parent_resp.text = "<html></html>"
-    parent_resp.status_code = 200
-    parent_resp.raise_for_status = MagicMock()
-    parent_resp.apparent_encoding = 'utf-8'
-    parent_resp.encoding = None
-
-    anchor, _, _ = make_bs4_element('/child1', 'Title', 'Content')
-    soup_parent = MagicMock()
-    soup_parent.css.select.return_value = [anchor]
-    mocker.patch("scrapers.pcl.BeautifulSoup", return_value=soup_parent)
-    mocker.patch("utils.db.should_scrape", return_value=True)
+    parent_resp = make_response(make_index_html('/child1', '/child2'))
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mock_save_scrapped = mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.keywords.find_keyword_hits", return_value=(False, {}))
 
-    # Now requests.get will succeed for parent, fail for child
-    mocker.patch("requests.get", side_effect=[parent_resp, Exception("Child page error")])
+    # Now requests.get will succeed for parent and the first child, fail for the second child
+    mocker.patch("requests.get", side_effect=[parent_resp, make_response(make_page_html('T', 'C')),
+                                               Exception("Child page error")])
 
-    with pytest.raises(Exception, match="Child page error"):
-        pcl.get_child_pages(target)
+    # A temporary failure skips the page without recording it (it is retried on the next run)
+    engine.get_child_pages(target)
+    mock_save_scrapped.assert_called_once_with(['http://example.com/child1'])
+    assert utils.http_cache.request_headers(target['url']) == {}
 
 def test_handle_missing_html_elements(mocker, target):
-    # Mock parent and child page responses
-    parent_resp = MagicMock()
-    parent_resp.text = "<html></html>"
-    parent_resp.status_code = 200
-    parent_resp.raise_for_status = MagicMock()
-    parent_resp.apparent_encoding = 'utf-8'
-    parent_resp.encoding = None
-
-    child_resp = MagicMock()
-    child_resp.text = "<html></html>"
-    child_resp.status_code = 200
-    child_resp.raise_for_status = MagicMock()
-    child_resp.apparent_encoding = 'utf-8'
-    child_resp.encoding = None
-
+    # Mock parent and child page responses; the child page has neither title nor content
+    parent_resp = make_response(make_index_html('/child1'))
+    child_resp = make_response('<html><body><p>Sem título</p></body></html>')
     mocker.patch("requests.get", side_effect=[parent_resp, child_resp])
 
-    anchor, _, _ = make_bs4_element('/child1', None, None)
-    soup_parent = MagicMock()
-    soup_parent.css.select.return_value = [anchor]
-    soup_child = MagicMock()
-    # Simulate select_one returning None for title and content
-    soup_child.css.select_one.side_effect = [None, None]
-    mocker.patch("scrapers.pcl.BeautifulSoup", side_effect=[soup_parent, soup_child])
-
-    mocker.patch("utils.db.should_scrape", return_value=True)
-    mocker.patch("utils.db.save_scrapped")
-    mocker.patch("utils.db.summarize")
-    mocker.patch("utils.keywords.check_content_has_keywords")
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.summarize_many")
+    mocker.patch("utils.keywords.find_keyword_hits")
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+
+    mock_save_scrapped = mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+
+    # The page is skipped and recorded: the selectors would miss it on every run
+    engine.get_child_pages(target)
+    mock_save_md.assert_not_called()
+    mock_save_scrapped.assert_called_once_with(['http://example.com/child1'])
+
+def test_failing_child_does_not_stop_target(mocker, target):
+    target['depth'] = 3
+    parent_resp = make_response(make_index_html('/1', '/2', '/3'))
+    not_found = make_response('')
+    not_found.status_code = 404
+    not_found.raise_for_status.side_effect = requests.exceptions.HTTPError("404", response=not_found)
+    mock_get = mocker.patch("requests.get", side_effect=[
+        parent_resp, make_response(make_page_html('Um', 'python')), not_found, make_response(make_page_html('Três', 'python'))])
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mock_save_scrapped = mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
     mock_save_md = mocker.patch("utils.md.save_markdown")
 
-    # Should raise AttributeError when trying to call get_text on None
-    with pytest.raises(AttributeError):
-        pcl.get_child_pages(target)
+    engine.get_child_pages(target)
+
+    assert mock_get.call_count == 4
+    assert [call.args[0]['title'] for call in mock_save_md.call_args_list] == ['Um', 'Três']
+    mock_save_scrapped.assert_called_once_with(
+        ['http://example.com/1', 'http://example.com/2', 'http://example.com/3'])
+    assert utils.metrics.report()['counters']['pages_failed']['total'] == 1
+
+def test_host_unavailable_stops_target(mocker, target):
+    parent_resp = make_response(make_index_html('/1', '/2'))
+    mocker.patch("requests.get", side_effect=[parent_resp, utils.policy.HostUnavailable("example.com")])
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mock_save_scrapped = mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+
+    with pytest.raises(utils.policy.HostUnavailable):
+        engine.get_child_pages(target)
+    mock_save_scrapped.assert_called_once_with([])
 
 def test_handle_empty_required_keywords(mocker, target):
     # Mock parent and child page responses
-    parent_resp = MagicMock()
-    parent_resp.text = "<html></html>"
-    parent_resp.status_code = 200
-    parent_resp.raise_for_status = MagicMock()
-    parent_resp.apparent_encoding = 'utf-8'
-    parent_resp.encoding = None
-
-    child_resp = MagicMock()
-    child_resp.text = "<html></html>"
-    child_resp.status_code = 200
-    child_resp.raise_for_status = MagicMock()
-    child_resp.apparent_encoding = 'utf-8'
-    child_resp.encoding = None
-
+    parent_resp = make_response(make_index_html('/child1'))
+    child_resp = make_response(make_page_html('Title', 'Content'))
     mocker.patch("requests.get", side_effect=[parent_resp, child_resp])
 
-    anchor, title, content = make_bs4_element('/child1', 'Title', 'Content')
-    soup_parent = MagicMock()
-    soup_parent.css.select.return_value = [anchor]
-    soup_child = MagicMock()
-    soup_child.css.select_one.side_effect = [title, content]
-    mocker.patch("scrapers.pcl.BeautifulSoup", side_effect=[soup_parent, soup_child])
-
-    mocker.patch("utils.db.should_scrape", return_value=True)
-    mocker.patch("utils.db.save_scrapped")
-    mocker.patch("utils.db.summarize", side_effect=lambda x: x[:300])
-    # Patch check_content_has_keywords to simulate empty required_words (should return True, [])
-    mocker.patch("utils.keywords.check_content_has_keywords", return_value=(True, []))
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.summarize_many", side_effect=lambda texts: [x[:300] for x in texts])
+    # Patch find_keyword_hits to simulate empty required_words (should return True, {})
+    mocker.patch("utils.keywords.find_keyword_hits", return_value=(True, {}))
     mock_save_md = mocker.patch("utils.md.save_markdown")
 
-    pcl.get_child_pages(target)
+    engine.get_child_pages(target)
 
     # Should still save markdown even if required_words is empty
-    mock_save_md.assert_called_once()
\ No newline at end of file
+    mock_save_md.assert_called_once()
+
+def test_skip_unchanged_index_page(mocker, target):
+    # Primeira execução: índice novo, sem páginas filhas
+    parent_resp = make_response(make_index_html())
+    parent_resp.headers = {'ETag': '"v1"'}
+
+    not_modified = MagicMock()
+    not_modified.status_code = 304
+
+    mock_get = mocker.patch("requests.get", side_effect=[parent_resp, not_modified])
+    parse_entries = mocker.spy(engine, "parse_entries")
+
+    engine.get_child_pages(target)
+    engine.get_child_pages(target)
+
+    # Segunda requisição é condicional e o índice não é parseado de novo
+    assert mock_get.call_args_list[1].kwargs['headers'] == {'If-None-Match': '"v1"'}
+    assert parse_entries.call_count == 1
+
+def test_selectors_compiled_once_per_target(mocker, target):
+    index_html = make_index_html('/child1')
+    page_html = make_page_html('Title', 'Content')
+    compile_selector = mocker.spy(engine.utils.html, "compile_selector")
+    engine.compile_index.cache_clear()
+    engine.compile_page.cache_clear()
+
+    for _ in range(3):
+        assert engine.parse_child_urls(index_html, target) == ['http://example.com/child1']
+        assert engine.parse_page(page_html, target) == ('Title', 'Content')
+
+    # Seletor do índice, do container, do título e do conteúdo: uma vez cada, não uma vez por página
+    assert compile_selector.call_count == 4
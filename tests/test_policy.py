@@ -0,0 +1,164 @@
+import asyncio
+import httpx
+import pytest
+import requests
+import utils.policy as policy
+from utils.fetch import AsyncFetcher
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_limits():
+    clock = Clock()
+    bucket = policy.TokenBucket(rate=2, burst=2, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    clock.now += 10
+    assert bucket.reserve() == 0
+
+
+def test_token_bucket_pause():
+    clock = Clock()
+    bucket = policy.TokenBucket(rate=0, burst=1, clock=clock)
+    bucket.pause(30)
+    assert bucket.reserve() == 30
+
+
+def test_circuit_breaker_opens_and_recovers():
+    clock = Clock()
+    breaker = policy.CircuitBreaker(threshold=2, cooldown=60, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now += 60
+    assert breaker.allow()  # requisição de teste liberada
+    breaker.record_success()
+    assert breaker.failures == 0
+
+
+def test_circuit_breaker_half_open_admits_single_probe():
+    clock = Clock()
+    breaker = policy.CircuitBreaker(threshold=1, cooldown=60, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 60
+    assert breaker.allow()
+    # Enquanto o teste não tem resultado, as demais requisições continuam recusadas
+    assert not breaker.allow()
+    assert not breaker.allow()
+
+    # Teste falhou: abre de novo por mais um cooldown
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now += 59
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_circuit_breaker_probe_without_result_expires():
+    clock = Clock()
+    breaker = policy.CircuitBreaker(threshold=1, cooldown=60, clock=clock)
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.allow()
+
+    clock.now += 60
+    assert breaker.allow()
+
+
+def test_retry_after():
+    assert policy.retry_after({"Retry-After": "7"}) == 7
+    assert policy.retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert policy.retry_after({"Retry-After": "amanhã"}) is None
+    assert policy.retry_after({}) is None
+
+
+def test_after_response():
+    fetch_policy = policy.FetchPolicy(max_retries=2, backoff_base=1, breaker_threshold=10)
+    assert fetch_policy.after_response("a.com", 0, 200) is None
+    assert fetch_policy.after_response("a.com", 0, 404) is None
+    assert 0 <= fetch_policy.after_response("a.com", 0, 503) <= 1
+    assert 0 <= fetch_policy.after_response("a.com", 1, error=TimeoutError()) <= 2
+    assert fetch_policy.after_response("a.com", 2, 503) is None
+    assert fetch_policy.after_response("a.com", 0, 429, {"Retry-After": "5"}) >= 5
+    assert fetch_policy.after_response("a.com", 0, 429, {"Retry-After": "9999"}) is None
+
+
+def test_breaker_skips_host():
+    fetch_policy = policy.FetchPolicy(breaker_threshold=1)
+    fetch_policy.after_response("a.com", 0, 500)
+    with pytest.raises(policy.HostUnavailable):
+        fetch_policy.before_request("a.com")
+    assert fetch_policy.before_request("b.com") == 0
+
+
+def test_get_retries_transient_errors(mocker):
+    ok = mocker.MagicMock(status_code=200)
+    unavailable = mocker.MagicMock(status_code=503, headers={})
+    mock_get = mocker.patch("requests.get", side_effect=[requests.exceptions.Timeout(), unavailable, ok])
+
+    assert policy.get("http://a.com/", timeout=10) is ok
+    assert mock_get.call_count == 3
+    unavailable.close.assert_called_once()
+
+
+def test_get_gives_up_after_max_retries(mocker):
+    mocker.patch("utils.policy.MAX_RETRIES", 1)
+    mock_get = mocker.patch("requests.get", side_effect=requests.exceptions.ConnectionError("down"))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        policy.get("http://a.com/", timeout=10)
+    assert mock_get.call_count == 2
+
+
+def test_async_fetch_honors_retry_after(mocker):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, text="ok")
+
+    sleep = mocker.spy(asyncio, "sleep")
+
+    async def scenario():
+        async with AsyncFetcher(transport=httpx.MockTransport(handler)) as fetcher:
+            return await fetcher.get("http://a.com/")
+
+    assert asyncio.run(scenario()) == "ok"
+    assert len(calls) == 2
+    assert sleep.call_count >= 1
+
+
+def test_async_fetch_breaker_stops_requests():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    async def scenario():
+        fetch_policy = policy.FetchPolicy(max_retries=5, breaker_threshold=2)
+        async with AsyncFetcher(transport=httpx.MockTransport(handler), policy=fetch_policy) as fetcher:
+            with pytest.raises(httpx.HTTPStatusError):
+                await fetcher.get("http://a.com/1")
+            with pytest.raises(policy.HostUnavailable):
+                await fetcher.get("http://a.com/2")
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
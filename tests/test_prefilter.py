@@ -0,0 +1,84 @@
+import pytest
+import scrapers.engine as engine
+import utils.html
+import utils.metrics
+from conftest import make_response, make_target
+
+INDEX_HTML = """
+<html><body><div class="list">
+<article><h2><a href="/tech/python-3-14-lancado">Python 3.14 é lançado com novo JIT</a></h2><p>Versão traz melhorias</p></article>
+<article><h2><a href="/esporte/final-do-campeonato">Time vence a final do campeonato estadual</a></h2><p>Jogo decidido nos pênaltis</p></article>
+<article><h2><a href="/tech/chip-novo" title="Fabricante apresenta chip voltado para inteligência artificial">Novo chip</a></h2></article>
+<article><h2><a href="/mercado/alta-das-bolsas">Bolsas sobem</a></h2><p>Analistas citam avanço da inteligência artificial nas empresas</p></article>
+<article><h2><a href="/p/12345"><img src="capa.jpg"></a></h2></article>
+</div></body></html>
+"""
+
+PAGE_HTML = "<html><body><h1>Título</h1><div class='content'>conteudo python</div></body></html>"
+
+TARGET = make_target('P', 'http://p.com/', child_anchor='h2 a')
+
+PARSERS = ['html.parser', 'lxml', 'selectolax']
+
+
+@pytest.fixture(params=PARSERS)
+def parser(request):
+    if request.param == 'lxml' and not utils.html.LXML_AVAILABLE:
+        pytest.skip("lxml não instalado")
+    if request.param == 'selectolax' and not utils.html.SELECTOLAX_AVAILABLE:
+        pytest.skip("selectolax não instalado")
+    return request.param
+
+
+def test_index_entries_carry_link_text_and_teaser(parser):
+    entries = engine.parse_entries(INDEX_HTML, dict(TARGET, parser=parser))
+
+    assert entries[0].title == 'Python 3.14 é lançado com novo JIT'
+    assert entries[0].teaser == 'Python 3.14 é lançado com novo JIT Versão traz melhorias'
+    assert entries[2].title == 'Novo chip Fabricante apresenta chip voltado para inteligência artificial'
+    assert entries[4].title is None
+
+
+def test_prefilter_keeps_matches_and_undecided(parser):
+    entries = engine.parse_entries(INDEX_HTML, dict(TARGET, parser=parser))
+
+    kept = engine.prefilter(entries, TARGET)
+
+    # Palavra-chave no link, no title, na chamada; o último link não tem sinais para decidir
+    assert [entry.url for entry in kept] == [
+        'http://p.com/tech/python-3-14-lancado', 'http://p.com/tech/chip-novo',
+        'http://p.com/mercado/alta-das-bolsas', 'http://p.com/p/12345']
+    assert utils.metrics.report()['counters']['prefiltered']['targets'] == {'P': 1}
+
+
+def test_prefilter_uses_url_slug():
+    entries = [engine.Entry('http://p.com/2025/ia-generativa-chega-as-escolas.html', 'Veja o que muda')]
+    assert engine.prefilter(entries, TARGET) == entries
+
+
+def test_prefilter_disabled_by_target():
+    entries = engine.parse_entries(INDEX_HTML, TARGET)
+    assert engine.prefilter(entries, dict(TARGET, prefilter=False)) == entries
+
+
+def test_prefiltered_links_not_fetched_nor_recorded(mocker):
+    mock_get = mocker.patch("requests.get", side_effect=lambda url, **kwargs: make_response(
+        INDEX_HTML if url == 'http://p.com/' else PAGE_HTML))
+    mock_filter_new_urls = mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mock_save_scrapped = mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mocker.patch("utils.md.save_markdown")
+
+    engine.get_child_pages(TARGET)
+
+    fetched = [call.args[0] for call in mock_get.call_args_list]
+    assert 'http://p.com/esporte/final-do-campeonato' not in fetched
+    assert len(fetched) == 5
+    # Uma única consulta ao banco com os 4 links que passaram pelo pré-filtro
+    assert mock_filter_new_urls.call_count == 1
+    assert len(mock_filter_new_urls.call_args.args[0]) == 4
+    assert 'http://p.com/esporte/final-do-campeonato' not in mock_save_scrapped.call_args.args[0]
+
+
+def test_url_words():
+    assert engine.url_words('https://g1.globo.com/economia/noticia/2025/04/25/banco-central-eleva-juros.ghtml') == \
+        'economia noticia banco central eleva juros'
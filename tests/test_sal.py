@@ -1,5 +1,6 @@
 import pytest
 
+import scrapers.engine
 import scrapers.sal
 import utils.db
 
@@ -12,54 +13,58 @@ def target():
     return {"uri": "http://example.com", "other": "data"}
 
 def test_should_scrape_triggers_scrape_for_new_url(mocker, url, target):
-    mock_should_scrape = mocker.patch("utils.db.should_scrape", return_value=True)
-    mock_scrape_page = mocker.patch("scrapers.sal.scrape_page")
-    # Simulate the code block
-    if utils.db.should_scrape(url):
-        scrapers.sal.scrape_page(url, target)
-    mock_should_scrape.assert_called_once_with(url)
+    mock_filter_new_urls = mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mock_scrape_page = mocker.patch("scrapers.engine.scrape_page")
+    # Simulate the code block of get_child_pages
+    for new_url in utils.db.filter_new_urls([url]):
+        scrapers.engine.scrape_page(new_url, target)
+    mock_filter_new_urls.assert_called_once_with([url])
     mock_scrape_page.assert_called_once_with(url, target)
 
 def test_should_scrape_skips_existing_url(mocker, url, target):
-    mock_should_scrape = mocker.patch("utils.db.should_scrape", return_value=False)
-    mock_scrape_page = mocker.patch("scrapers.sal.scrape_page")
-    if utils.db.should_scrape(url):
-        scrapers.sal.scrape_page(url, target)
-    mock_should_scrape.assert_called_once_with(url)
+    mock_filter_new_urls = mocker.patch("utils.db.filter_new_urls", return_value=[])
+    mock_scrape_page = mocker.patch("scrapers.engine.scrape_page")
+    for new_url in utils.db.filter_new_urls([url]):
+        scrapers.engine.scrape_page(new_url, target)
+    mock_filter_new_urls.assert_called_once_with([url])
     mock_scrape_page.assert_not_called()
 
 def test_should_scrape_triggers_when_file_missing(mocker, url, target):
-    # Simulate should_scrape returns True when file is missing
-    mock_should_scrape = mocker.patch("utils.db.should_scrape", return_value=True)
-    mock_scrape_page = mocker.patch("scrapers.sal.scrape_page")
-    if utils.db.should_scrape(url):
-        scrapers.sal.scrape_page(url, target)
-    mock_should_scrape.assert_called_once_with(url)
+    # Simulate filter_new_urls keeps the URL when file is missing
+    mock_filter_new_urls = mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mock_scrape_page = mocker.patch("scrapers.engine.scrape_page")
+    for new_url in utils.db.filter_new_urls([url]):
+        scrapers.engine.scrape_page(new_url, target)
+    mock_filter_new_urls.assert_called_once_with([url])
     mock_scrape_page.assert_called_once_with(url, target)
 
 def test_should_scrape_with_empty_record_file(mocker, url, target):
-    # Simulate should_scrape returns True when record file is empty
-    mock_should_scrape = mocker.patch("utils.db.should_scrape", return_value=True)
-    mock_scrape_page = mocker.patch("scrapers.sal.scrape_page")
-    if utils.db.should_scrape(url):
-        scrapers.sal.scrape_page(url, target)
-    mock_should_scrape.assert_called_once_with(url)
+    # Simulate filter_new_urls keeps the URL when record file is empty
+    mock_filter_new_urls = mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mock_scrape_page = mocker.patch("scrapers.engine.scrape_page")
+    for new_url in utils.db.filter_new_urls([url]):
+        scrapers.engine.scrape_page(new_url, target)
+    mock_filter_new_urls.assert_called_once_with([url])
     mock_scrape_page.assert_called_once_with(url, target)
 
 def test_should_scrape_with_partial_match_in_record_file(mocker, url, target):
-    # Simulate should_scrape returns False if a substring in record file matches url
-    mock_should_scrape = mocker.patch("utils.db.should_scrape", return_value=False)
-    mock_scrape_page = mocker.patch("scrapers.sal.scrape_page")
-    if utils.db.should_scrape(url):
-        scrapers.sal.scrape_page(url, target)
-    mock_should_scrape.assert_called_once_with(url)
+    # Simulate filter_new_urls drops the URL if a substring in record file matches url
+    mock_filter_new_urls = mocker.patch("utils.db.filter_new_urls", return_value=[])
+    mock_scrape_page = mocker.patch("scrapers.engine.scrape_page")
+    for new_url in utils.db.filter_new_urls([url]):
+        scrapers.engine.scrape_page(new_url, target)
+    mock_filter_new_urls.assert_called_once_with([url])
     mock_scrape_page.assert_not_called()
 
 def test_should_scrape_with_malformed_record_file(mocker, url, target):
-    # Simulate should_scrape handles malformed file and returns True (allows scraping)
-    mock_should_scrape = mocker.patch("utils.db.should_scrape", return_value=True)
-    mock_scrape_page = mocker.patch("scrapers.sal.scrape_page")
-    if utils.db.should_scrape(url):
-        scrapers.sal.scrape_page(url, target)
-    mock_should_scrape.assert_called_once_with(url)
-    mock_scrape_page.assert_called_once_with(url, target)
\ No newline at end of file
+    # Simulate filter_new_urls handles malformed file and keeps the URL (allows scraping)
+    mock_filter_new_urls = mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mock_scrape_page = mocker.patch("scrapers.engine.scrape_page")
+    for new_url in utils.db.filter_new_urls([url]):
+        scrapers.engine.scrape_page(new_url, target)
+    mock_filter_new_urls.assert_called_once_with([url])
+    mock_scrape_page.assert_called_once_with(url, target)
+
+def test_sal_registered_in_engine():
+    assert isinstance(scrapers.engine.get_type("sal"), scrapers.sal.SelectorAnchorList)
+    assert scrapers.engine.get_type("sal").index_selector({"anchor_selector": "h3 a"}) == "h3 a"
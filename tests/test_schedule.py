@@ -0,0 +1,48 @@
+import json
+import utils.schedule as schedule
+
+
+def make_target(url, **kwargs):
+    return {'label': url, 'type': 'pcl', 'url': url, **kwargs}
+
+
+def test_inactive_target_is_skipped():
+    targets = [make_target('http://a.com/', active=False), make_target('http://b.com/', active=True)]
+    assert schedule.due_targets(targets) == [targets[1]]
+
+
+def test_target_without_interval_is_always_due():
+    target = make_target('http://a.com/')
+    schedule.mark_crawled(target, now=1000)
+    assert schedule.is_due(target, now=1000)
+
+
+def test_target_waits_for_its_interval():
+    target = make_target('http://a.com/', interval=60)
+    assert schedule.is_due(target, now=0)
+
+    schedule.mark_crawled(target, now=1000)
+    assert not schedule.is_due(target, now=1000 + 59 * 60)
+    assert schedule.is_due(target, now=1000 + 60 * 60)
+    assert schedule.next_run(target) == 1000 + 3600
+
+
+def test_due_targets_keeps_order(mocker):
+    mocker.patch("utils.schedule.DEFAULT_INTERVAL", 30)
+    slow, fast, new = make_target('http://a.com/', interval=240), make_target('http://b.com/'), make_target('http://c.com/')
+    schedule.mark_crawled(slow, now=0)
+    schedule.mark_crawled(fast, now=0)
+
+    assert schedule.due_targets([slow, fast, new], now=31 * 60) == [fast, new]
+
+
+def test_schedule_persisted():
+    target = make_target('http://a.com/', interval=10)
+    schedule.mark_crawled(target, now=500)
+    schedule.save_schedule()
+
+    with open(schedule.SCHEDULE_PATH, encoding="utf-8") as f:
+        assert json.load(f) == {'http://a.com/': 500}
+
+    schedule.clear_schedule()
+    assert not schedule.is_due(target, now=600)
@@ -0,0 +1,112 @@
+import datetime
+import pytest
+import utils.db
+import utils.minhash
+import utils.storage
+
+STORY = ("A empresa anunciou nesta terça-feira um novo modelo de inteligência artificial "
+         "capaz de gerar vídeos a partir de texto, com lançamento previsto para o próximo mês "
+         "em todos os países onde o serviço já está disponível.")
+
+
+@pytest.fixture
+def sqlite(mocker, tmp_path):
+    # utils.db com o backend SQLite em um arquivo temporário, sem MongoDB
+    mocker.patch("utils.db.STORAGE_BACKEND", "sqlite")
+    mocker.patch("utils.db._storage", None)
+    mocker.patch("utils.db._seen_cache", None)
+    mocker.patch("utils.db.SEEN_CACHE_ENABLED", False)
+    mocker.patch("utils.storage.SQLITE_PATH", str(tmp_path / "scrapper.sqlite3"))
+    mongo = mocker.patch("utils.db.MongoClient")
+    yield mongo
+    utils.db.close_storage()
+
+
+def test_sqlite_backend_records_urls(sqlite):
+    assert utils.db.should_scrape("http://a.com/1") is True
+    assert utils.db.save_scrapped("http://a.com/1") is True
+    assert utils.db.save_scrapped("http://a.com/1") is False
+    assert utils.db.should_scrape("http://a.com/1") is False
+
+    assert utils.db.save_scrapped_many(["http://a.com/2", "http://a.com/1", "http://a.com/3"]) == \
+        ["http://a.com/2", "http://a.com/3"]
+    assert utils.db.filter_new_urls(["http://a.com/4", "http://a.com/3", "http://a.com/4"]) == ["http://a.com/4"]
+    sqlite.assert_not_called()
+
+
+def test_sqlite_backend_persists_between_runs(sqlite):
+    utils.db.save_scrapped_many(["http://a.com/1"])
+    utils.db.close_storage()
+
+    assert utils.db.should_scrape("http://a.com/1") is False
+    assert isinstance(utils.db.get_storage(), utils.storage.SqliteStorage)
+
+
+def test_sqlite_backend_batches_large_lookups(sqlite):
+    urls = [f"http://a.com/{number}" for number in range(2500)]
+    assert utils.db.save_scrapped_many(urls[:2000]) == urls[:2000]
+    assert utils.db.filter_new_urls(urls) == urls[2000:]
+
+
+def test_sqlite_backend_warms_seen_cache(sqlite, mocker, tmp_path):
+    mocker.patch("utils.db.SEEN_CACHE_ENABLED", True)
+    mocker.patch("utils.db.SEEN_CACHE_PATH", str(tmp_path / "seen.bloom"))
+    mocker.patch("utils.db.SEEN_CACHE_CAPACITY", 1000)
+    utils.db.get_storage().insert_urls(["http://a.com/old"], datetime.datetime.utcnow())
+
+    assert "http://a.com/old" in utils.db.get_seen_cache()
+    assert utils.db.should_scrape("http://a.com/new") is True
+
+
+def test_seen_cache_snapshot_discarded_after_backend_switch(sqlite, mocker, tmp_path):
+    mocker.patch("utils.db.SEEN_CACHE_ENABLED", True)
+    mocker.patch("utils.db.SEEN_CACHE_PATH", str(tmp_path / "seen.bloom"))
+    mocker.patch("utils.db.SEEN_CACHE_CAPACITY", 1000)
+    old = datetime.datetime.utcnow() - datetime.timedelta(days=2)
+    other = utils.storage.SqliteStorage(str(tmp_path / "other.sqlite3"))
+    other.insert_urls(["http://a.com/other"], old)
+    other.close()
+
+    utils.db.get_storage().insert_urls(["http://a.com/1"], old)
+    utils.db.get_seen_cache()
+    utils.db.save_seen_cache()
+
+    # Outro banco: as URLs antigas dele precisam entrar no filtro, não só as posteriores ao snapshot
+    utils.db.close_storage()
+    mocker.patch("utils.db._seen_cache", None)
+    mocker.patch("utils.storage.SQLITE_PATH", str(tmp_path / "other.sqlite3"))
+    seen_cache = utils.db.get_seen_cache()
+    assert "http://a.com/other" in seen_cache
+    assert "http://a.com/1" not in seen_cache
+
+
+def test_sqlite_backend_near_duplicates(sqlite, mocker):
+    mocker.patch("utils.db.NEAR_DUP_ENABLED", True)
+
+    assert utils.db.register_story("http://a.com/1", STORY) is None
+    assert utils.db.register_story("http://b.com/9", STORY.replace("terça-feira", "terça")) == "http://a.com/1"
+    assert utils.db.register_story("http://c.com/2", "Outra notícia sobre o campeonato de futebol do fim de semana") is None
+
+
+def test_sqlite_retention(tmp_path):
+    storage = utils.storage.SqliteStorage(str(tmp_path / "db.sqlite3"), retention_days=0)
+    old = datetime.datetime.utcnow() - datetime.timedelta(days=40)
+    storage.insert_urls(["http://a.com/old"], old)
+    storage.insert_story("http://a.com/old", ["0:ab"], b"sig", old)
+    storage.insert_urls(["http://a.com/new"], datetime.datetime.utcnow())
+    storage.purge(30)
+
+    assert storage.find_urls(["http://a.com/old", "http://a.com/new"]) == {"http://a.com/new"}
+    assert storage.find_stories(["0:ab"]) == []
+    storage.close()
+
+
+def test_sqlite_uses_wal(tmp_path):
+    storage = utils.storage.SqliteStorage(str(tmp_path / "db.sqlite3"))
+    assert storage._connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    storage.close()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Opção inválida: redis"):
+        utils.storage.open_storage("redis")
@@ -0,0 +1,144 @@
+import httpx
+import pytest
+import utils.crawler as crawler
+import utils.stream as stream
+
+TARGET = {
+    'label': 'A',
+    'type': 'pcl',
+    'url': 'http://a.com/',
+    'parent_container': 'div.list',
+    'child_anchor': 'a',
+    'uri': 'http://a.com',
+    'depth': 10,
+    'page': {'title': 'h1', 'content': 'div.content p'}
+}
+
+HEAD = b"<html><head><meta charset='iso-8859-1'></head><body><h1>T\xedtulo</h1>"
+ARTICLE = b"<div class='content'><p>Not\xedcia sobre python</p><p>segundo</p>"
+FILLER = b"<div class='comments'>" + b"<p>comentario</p>" * 10000 + b"</div>"
+
+
+def chunked(data, size=1024):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_charset_from_headers():
+    assert stream.charset_from_headers("text/html; charset=ISO-8859-1") == "ISO-8859-1"
+    assert stream.charset_from_headers("text/html") is None
+    assert stream.charset_from_headers(None) is None
+
+
+def test_body_uses_meta_charset():
+    body = stream.StreamingBody(first_check=64)
+    body.feed(HEAD + ARTICLE + b" " * 4096)
+    assert "Título" in body.text
+    assert body.encoding == "iso-8859-1"
+
+
+def test_body_header_charset_wins():
+    body = stream.StreamingBody("text/html; charset=utf-8")
+    body.feed("<p>ação</p>".encode("utf-8"))
+    assert body.text == "<p>ação</p>"
+
+
+def test_body_respects_byte_budget():
+    body = stream.StreamingBody(max_bytes=100)
+    assert body.feed(b"a" * 60) is False
+    assert body.feed(b"a" * 60) is True
+    assert body.exhausted
+    assert len(body.raw) == 100
+
+
+def test_extract_prefix_waits_for_closed_content():
+    html = (HEAD + b"<div class='content'><p>Not\xedcia sobre").decode("latin-1")
+    assert stream.extract_prefix(html, TARGET) is None
+    html = (HEAD + ARTICLE).decode("latin-1")
+    assert stream.extract_prefix(html, TARGET) == ("Título", "Notícia sobre python")
+
+
+@pytest.mark.parametrize("parser", ["html.parser", "lxml"])
+def test_extract_prefix_closed_container(parser):
+    target = dict(TARGET, parser=parser, page={'title': 'h1', 'content': 'article.sng-cnt'})
+    html = "<h1>T</h1><article class='sng-cnt'><p>curta</p><div>fim</div>"
+    assert stream.extract_prefix(html, target) is None
+    assert stream.extract_prefix(html + "</article><footer><p>rodap", target) == ("T", "curta fim")
+
+
+def test_extract_prefix_enough_content():
+    html = "<h1>T</h1><div class='content'><p>" + "x" * 50
+    assert stream.extract_prefix(html, TARGET) is None
+    assert stream.extract_prefix(html, TARGET, min_content=10) == ("T", "x" * 50)
+
+
+def test_extract_prefix_final_missing_element():
+    with pytest.raises(AttributeError):
+        stream.extract_prefix("<h1>T</h1>", TARGET, final=True)
+
+
+def test_fetch_and_extract_stops_early(mocker):
+    chunks = chunked(HEAD + ARTICLE + FILLER)
+    consumed = []
+
+    def iter_content(size):
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    response = mocker.MagicMock()
+    response.__enter__.return_value = response
+    response.headers = {'Content-Type': 'text/html'}
+    response.iter_content.side_effect = iter_content
+    mocker.patch("requests.get", return_value=response)
+    mocker.patch("utils.stream.STREAM_FIRST_CHECK", 1024)
+
+    assert stream.fetch_and_extract("http://a.com/1", TARGET) == ("Título", "Notícia sobre python")
+    assert len(consumed) < len(chunks)
+
+
+def test_fetch_and_extract_short_article_stops_before_budget(mocker):
+    target = dict(TARGET, page={'title': 'h1', 'content': 'article.sng-cnt'})
+    article = b"<article class='sng-cnt'><p>Not\xedcia curta</p></article>"
+    footer = b"<footer>" + b"<p>links</p>" * 10000 + b"</footer>"
+    chunks = chunked(HEAD + article + footer)
+    consumed = []
+
+    def iter_content(size):
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    response = mocker.MagicMock()
+    response.__enter__.return_value = response
+    response.headers = {'Content-Type': 'text/html'}
+    response.iter_content.side_effect = iter_content
+    mocker.patch("requests.get", return_value=response)
+    mocker.patch("utils.stream.STREAM_FIRST_CHECK", 1024)
+
+    assert stream.fetch_and_extract("http://a.com/1", target, max_bytes=len(HEAD + article + footer)) == \
+        ("Título", "Notícia curta")
+    assert len(consumed) <= 2
+
+
+def test_crawl_stream_stops_early(mocker):
+    consumed = []
+
+    async def body():
+        for chunk in chunked(HEAD + ARTICLE + FILLER, stream.STREAM_CHUNK_SIZE):
+            consumed.append(chunk)
+            yield chunk
+
+    def handler(request):
+        if request.url.path == '/':
+            return httpx.Response(200, html="<div class='list'><a href='/1'>1</a></div>")
+        return httpx.Response(200, headers={'content-type': 'text/html'}, content=body())
+
+    mocker.patch("utils.db.filter_new_urls", side_effect=lambda urls: urls)
+    mocker.patch("utils.db.save_scrapped_many", side_effect=lambda urls: urls)
+    mock_save_md = mocker.patch("utils.md.save_markdown")
+
+    crawler.crawl([TARGET], transport=httpx.MockTransport(handler), parse_workers=0, stream=True)
+
+    item = mock_save_md.call_args.args[0]
+    assert (item['title'], item['summary']) == ("Título", "Notícia sobre python")
+    assert len(consumed) < len(chunked(HEAD + ARTICLE + FILLER, stream.STREAM_CHUNK_SIZE))
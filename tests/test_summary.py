@@ -0,0 +1,58 @@
+import numpy as np
+import utils.summary as summary
+
+ARTICLE = (
+    "O evento reuniu empresas de vários países. "
+    "A nova versão do Python traz melhorias de desempenho para inteligência artificial. "
+    "O almoço foi servido às 13h. "
+    "Segundo os organizadores, a próxima edição será em março."
+)
+
+
+def test_split_sentences():
+    assert summary.split_sentences("Primeira frase. Segunda frase! e continua? Terceira.") == [
+        "Primeira frase.", "Segunda frase! e continua?", "Terceira."
+    ]
+
+
+def test_truncate_keeps_whole_words():
+    assert summary.truncate("uma frase bem longa", 12) == "uma frase"
+    assert summary.truncate("a" * 20, 10) == "a" * 10
+    assert summary.truncate("curta", 10) == "curta"
+
+
+def test_summarize_short_text_unchanged():
+    assert summary.summarize("Texto curto.", keywords=[]) == "Texto curto."
+
+
+def test_summarize_prefers_keyword_sentences():
+    result = summary.summarize(ARTICLE, keywords=["python"], budget=100)
+    assert result == "A nova versão do Python traz melhorias de desempenho para inteligência artificial."
+
+
+def test_summarize_keeps_text_order_within_budget():
+    result = summary.summarize(ARTICLE, keywords=["python", "edição"], budget=200)
+    assert len(result) <= 200
+    assert result.index("Python") < result.index("edição")
+
+
+def test_summarize_many_uses_corpus_idf():
+    # "evento" aparece em todos os documentos e perde peso para o termo raro
+    texts = [
+        "O evento começou cedo. Foi anunciado um novo processador quântico.",
+        "O evento começou cedo. Choveu durante a tarde toda.",
+        "O evento começou cedo. Houve fila na entrada principal.",
+    ]
+    results = summary.summarize_many(texts, keywords=[], budget=50)
+    assert results[0] == "Foi anunciado um novo processador quântico."
+    assert len(results) == 3
+
+
+def test_score_sentences_shapes():
+    scores = summary.score_sentences([["Uma frase.", "Outra frase."], [], ["Só uma."]], keywords=[])
+    assert [len(doc) for doc in scores] == [2, 0, 1]
+    assert all(isinstance(doc, np.ndarray) for doc in scores)
+
+
+def test_summarize_empty():
+    assert summary.summarize_many(["", "   "], keywords=[]) == ["", ""]
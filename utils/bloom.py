@@ -0,0 +1,103 @@
+# utils/bloom.py
+# Filtro de Bloom para o cache local de URLs já vistas
+
+import hashlib
+import math
+import os
+import struct
+import threading
+
+# Cabeçalho do arquivo: assinatura, bits, funções de hash, itens, data do snapshot e
+# hash da origem das URLs (o banco de onde o filtro foi aquecido)
+_HEADER = struct.Struct("<4sQIQd16s")
+_MAGIC = b"BLM2"
+
+
+class BloomFilter:
+    """
+    Conjunto probabilístico com memória fixa.
+
+    'url in filtro' nunca dá falso negativo: se retorna False a URL certamente
+    não foi adicionada. Se retorna True a URL provavelmente foi adicionada, com
+    taxa de falsos positivos próxima de error_rate enquanto count <= capacity.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, key):
+        # Double hashing: k posições a partir de dois hashes de 64 bits
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        positions = self._positions(key)
+        with self._lock:
+            for position in positions:
+                self.bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self):
+        return self.count
+
+    @staticmethod
+    def _source_digest(source):
+        return hashlib.blake2b(source.encode("utf-8"), digest_size=16).digest()
+
+    def save(self, path, saved_at, source=""):
+        """
+        Grava o filtro em disco (gravação atômica via arquivo temporário).
+        source identifica a origem das URLs; load() descarta um snapshot de outra origem.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            with self._lock:
+                f.write(_HEADER.pack(_MAGIC, self.size, self.hashes, self.count, saved_at,
+                                     self._source_digest(source)))
+                f.write(self.bits)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, capacity, error_rate=0.01, source=""):
+        """
+        Carrega um filtro salvo com save().
+        Retorna (filtro, saved_at), ou (None, None) se o arquivo não existe ou foi
+        gerado com outra capacidade/taxa de erro ou outra origem (source).
+        """
+        if not os.path.exists(path):
+            return None, None
+
+        bloom = cls(capacity, error_rate)
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None, None
+            magic, size, hashes, count, saved_at, digest = _HEADER.unpack(header)
+            if magic != _MAGIC or size != bloom.size or hashes != bloom.hashes:
+                return None, None
+            if digest != cls._source_digest(source):
+                return None, None
+            bits = f.read()
+
+        if len(bits) != len(bloom.bits):
+            return None, None
+        bloom.bits = bytearray(bits)
+        bloom.count = count
+        return bloom, saved_at
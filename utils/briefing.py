@@ -0,0 +1,170 @@
+# utils/briefing.py
+# Armazenamento estruturado do briefing (JSON Lines) e renderizadores de saída
+
+import html
+import io
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import datetime
+
+# Campos de cada item do briefing
+FIELDS = ("title", "url", "summary", "source", "timestamp", "keywords")
+
+_HTML_END = "</body>\n</html>\n"
+
+
+def normalize_item(dados):
+    """Completa o item com os campos opcionais (fonte, horário e palavras-chave)."""
+    item = {field: dados.get(field) for field in FIELDS}
+    item["timestamp"] = item["timestamp"] or datetime.now().isoformat(timespec="seconds")
+    item["keywords"] = item["keywords"] or {}
+    return item
+
+
+class BriefingStore:
+    """
+    Itens do briefing em JSON Lines: um objeto JSON por linha, só com acréscimos.
+    É o formato lido diretamente pelos dashboards; Markdown e HTML são gerados a partir dele.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, items):
+        """Acrescenta os itens com uma única escrita, garantindo que chegaram ao disco."""
+        lines = "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __iter__(self):
+        """Lê os itens um a um, sem carregar o arquivo inteiro."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+@contextmanager
+def _replacing(path):
+    """
+    Copia a saída para um arquivo temporário no mesmo diretório e, se o bloco terminar
+    sem erro, troca a original por ele (os.replace): quem lê a saída nunca vê uma
+    escrita pela metade, e uma falha no meio deixa a original intacta.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.copyfile(path, temp_path)
+    try:
+        yield temp_path
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+
+
+class Renderer:
+    """
+    Base dos renderizadores: begin() uma vez, item() para cada item e end() no final.
+    append() acrescenta itens a uma saída já gerada, sem reler o armazenamento.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def begin(self, f):
+        pass
+
+    def item(self, f, item):
+        raise NotImplementedError
+
+    def end(self, f):
+        pass
+
+    def append(self, items):
+        """
+        Acrescenta os itens ao fim de uma cópia da saída existente (saídas sem fechamento
+        em end()), que então substitui a original. Retorna False se a saída ainda não
+        existe (ou não pode ser estendida) e precisa ser gerada inteira por render().
+        """
+        if not os.path.exists(self.path):
+            return False
+        with _replacing(self.path) as temp_path:
+            with open(temp_path, "a", encoding="utf-8") as f:
+                for item in items:
+                    self.item(f, item)
+        return True
+
+
+class HtmlRenderer(Renderer):
+    def begin(self, f):
+        f.write("<!DOCTYPE html>\n<html lang=\"pt-BR\">\n<head>\n<meta charset=\"utf-8\">\n")
+        f.write("<title>Briefing Diário</title>\n</head>\n<body>\n<h1>Briefing Diário</h1>\n")
+        f.write(f"<p><em>Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}</em></p>\n")
+
+    def item(self, f, item):
+        source = f" <small>({html.escape(item['source'])})</small>" if item.get("source") else ""
+        f.write("<article>\n")
+        f.write(f"<h2><a href=\"{html.escape(item['url'])}\">{html.escape(item['title'])}</a>{source}</h2>\n")
+        f.write(f"<p>{html.escape(item['summary'])}</p>\n")
+        if item.get("keywords"):
+            keywords = ", ".join(html.escape(keyword) for keyword in item["keywords"])
+            f.write(f"<p><small>Palavras-chave: {keywords}</small></p>\n")
+        f.write("</article>\n<hr>\n")
+
+    def end(self, f):
+        f.write(_HTML_END)
+
+    def append(self, items):
+        # Os itens entram antes do fechamento de </body>, que é reescrito depois deles
+        if not os.path.exists(self.path):
+            return False
+        end = _HTML_END.encode("utf-8")
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(size - len(end), 0))
+            if f.read() != end:
+                return False
+        text = io.StringIO()
+        for item in items:
+            self.item(text, item)
+        with _replacing(self.path) as temp_path:
+            with open(temp_path, "r+b") as f:
+                f.seek(size - len(end))
+                f.write(text.getvalue().encode("utf-8") + end)
+                f.truncate()
+        return True
+
+
+def render(store, renderers):
+    """
+    Gera todas as saídas em uma única passada pelo armazenamento.
+    Cada saída é escrita em um arquivo temporário e renomeada no final.
+    """
+    files = []
+    try:
+        for renderer in renderers:
+            f = open(f"{renderer.path}.{os.getpid()}.tmp", "w", encoding="utf-8")
+            files.append(f)
+            renderer.begin(f)
+
+        for item in store:
+            for renderer, f in zip(renderers, files):
+                renderer.item(f, item)
+
+        for renderer, f in zip(renderers, files):
+            renderer.end(f)
+    except BaseException:
+        for f in files:
+            f.close()
+            os.remove(f.name)
+        raise
+
+    for renderer, f in zip(renderers, files):
+        f.close()
+        os.replace(f.name, renderer.path)
@@ -0,0 +1,367 @@
+# utils/crawler.py
+# Modo de crawl concorrente: todos os alvos em um único event loop, com limite global e por host
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import scrapers.engine
+import utils.db
+import utils.fetch
+import utils.http_cache
+import utils.keywords
+import utils.md
+import utils.metrics
+import utils.minhash
+import utils.page_cache
+import utils.policy
+import utils.schedule
+import utils.stream
+
+# Processos da etapa de parse/extração (0 executa em threads, no mesmo processo)
+PARSE_WORKERS = int(os.environ.get("CRAWL_PARSE_WORKERS", os.cpu_count() or 1))
+# Páginas baixadas aguardando parse (limita a memória ocupada pelo HTML em trânsito)
+PARSE_QUEUE_SIZE = int(os.environ.get("CRAWL_PARSE_QUEUE", 32))
+
+
+def make_parse_pool(workers, initializer=None):
+    """
+    Pool de processos da etapa de parse/extração, ou None com workers=0 (o trabalho fica
+    em threads no mesmo processo). Os processos são criados com spawn: não herdam as
+    threads nem as conexões abertas do processo principal. initializer, se informado,
+    roda uma vez em cada processo ao iniciar.
+    """
+    if workers <= 0:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=initializer)
+
+
+def extract_entries(body, target):
+    """Etapas de parse e pré-filtro do índice (executadas no pool de processos)."""
+    return scrapers.engine.prefilter(scrapers.engine.parse_entries(body, target), target)
+
+
+def extract_item(html, target, url):
+    """
+    Etapas de parse/extração e filtro de uma página filha (executadas no pool de processos).
+    Retorna o item do briefing ou None se a página não contém as palavras-chave.
+    """
+    title, content = scrapers.engine.parse_page(html, target)
+    return build_item(title, content, target, url)
+
+
+def build_item(title, content, target, url):
+    """Etapa de filtro: monta o item do briefing ou retorna None se faltam palavras-chave."""
+    has_keywords, hits = utils.keywords.find_keyword_hits(content)
+    if not has_keywords:
+        utils.metrics.incr("filtered_keywords", target=target.get('label'))
+        return None
+
+    # O resumo é feito depois, em lote para todas as páginas do alvo (summarize_items)
+    item = {"title": title, "url": url, "content": content,
+            "source": target.get('label'), "keywords": hits}
+    if utils.db.NEAR_DUP_ENABLED:
+        item["signature"] = utils.minhash.to_bytes(utils.minhash.signature(content))
+    return item
+
+
+def drop_near_duplicates(items):
+    """
+    Remove as notícias quase idênticas a outra já publicada (nesta execução ou em
+    anteriores), mantendo a primeira na ordem dos alvos e dos links.
+    """
+    kept = []
+    for url, item in items:
+        if item is not None:
+            duplicate = utils.db.register_story(url, item["content"], item.pop("signature", None))
+            if duplicate is not None:
+                print(f"Página ignorada - mesma notícia que {duplicate}")
+                utils.metrics.incr("near_duplicates", target=item.get('source'))
+                continue
+        kept.append((url, item))
+    return kept
+
+
+def summarize_items(items):
+    """Troca o conteúdo de cada item pelo resumo, pontuando todas as páginas juntas."""
+    kept = [item for url, item in items if item is not None and "content" in item]
+    if not kept:
+        return
+    summaries = utils.db.summarize_many([item.pop("content") for item in kept])
+    for item, summary in zip(kept, summaries):
+        item["summary"] = summary
+
+
+class Pipeline:
+    """
+    Etapas do crawl concorrente:
+    download (event loop) -> parse/extração e filtro (pool de processos) -> persistência (em ordem).
+
+    Entre o download e o parse há um buffer limitado: uma página só começa a ser
+    baixada quando há vaga, e a vaga só é liberada quando o parse termina.
+    Com stream=True as páginas filhas são lidas em pedaços e o download para assim
+    que título e conteúdo foram encontrados (ver utils.stream).
+    """
+
+    def __init__(self, fetcher, executor=None, queue_size=PARSE_QUEUE_SIZE, stream=utils.stream.STREAM_PAGES):
+        self.fetcher = fetcher
+        self.executor = executor
+        self.stream = stream
+        self._buffer = asyncio.Semaphore(queue_size)
+
+    async def _run_cpu(self, func, *args):
+        # Sem executor o trabalho vai para o pool de threads padrão do event loop.
+        # As medições feitas no worker voltam junto com o resultado.
+        result, snapshot = await asyncio.get_running_loop().run_in_executor(
+            self.executor, utils.metrics.run_collected, func, *args)
+        utils.metrics.merge(snapshot)
+        return result
+
+    async def index(self, target):
+        """
+        Baixa a página índice do alvo e retorna a resposta e os itens (Entry) com URL nova,
+        na ordem do índice. A resposta é None se o índice não mudou desde a última execução.
+        """
+        label = target.get('label')
+        headers = utils.http_cache.request_headers(target['url'])
+        with utils.metrics.timer("fetch", label):
+            response = await self.fetcher.fetch(target['url'], headers=headers)
+        if utils.http_cache.is_unchanged(target['url'], response.status_code, response.text):
+            print(f"[INFO] Página índice sem alterações | URL: {target['url']}")
+            utils.metrics.incr("index_unchanged", target=label)
+            return None, []
+        utils.metrics.incr("pages_fetched", target=label)
+        utils.metrics.incr("bytes_fetched", len(response.content), target=label)
+
+        entries = {}
+        for entry in await self._run_cpu(extract_entries, scrapers.engine.index_body(response, target), target):
+            entries.setdefault(entry.url, entry)
+        new_urls = await asyncio.to_thread(utils.db.filter_new_urls, list(entries))
+        utils.metrics.incr("skipped_dedup", len(entries) - len(new_urls), target=label)
+        return response, [entries[url] for url in new_urls]
+
+    async def page(self, url, target, entry=None):
+        """
+        Baixa e processa uma página filha, respeitando o buffer entre as etapas.
+        Se o item do índice (entry) já traz o texto da notícia, a página não é baixada.
+        """
+        async with self._buffer:
+            print(f"[INFO] Crawl concorrente | {target.get('label', target['type'])} | URL: {url}")
+            label = target.get('label')
+            from_feed = scrapers.engine.feed_item(entry, target)
+            if from_feed is not None:
+                utils.metrics.incr("fetch_avoided", target=label)
+                return await self._run_cpu(build_item, *from_feed, target, url)
+            if self.stream:
+                with utils.metrics.timer("fetch", label):
+                    title, content = await self._stream_page(url, target)
+                utils.metrics.incr("pages_fetched", target=label)
+                return await self._run_cpu(build_item, title, content, target, url)
+
+            with utils.metrics.timer("fetch", label):
+                response = await self.fetcher.fetch(url)
+                html = response.text
+            utils.metrics.incr("pages_fetched", target=label)
+            utils.metrics.incr("bytes_fetched", len(response.content), target=label)
+            # HTML guardado para reprocessar sem rede (python main.py --reprocess)
+            await asyncio.to_thread(utils.page_cache.put, url, html, utils.page_cache.target_key(target))
+            return await self._run_cpu(extract_item, html, target, url)
+
+    async def _stream_page(self, url, target):
+        """Lê a página em pedaços até extrair título e conteúdo ou esgotar o limite de bytes."""
+        async with self.fetcher.stream(url) as response:
+            body = utils.stream.StreamingBody(response.headers.get('content-type'))
+            try:
+                async for chunk in response.aiter_bytes(utils.stream.STREAM_CHUNK_SIZE):
+                    if body.feed(chunk):
+                        result = await self._run_cpu(utils.stream.extract_prefix, body.text, target)
+                        if result is not None:
+                            return result
+                    if body.exhausted:
+                        break
+            finally:
+                utils.metrics.incr("bytes_fetched", len(body.raw), target=target.get('label'))
+
+        return await self._run_cpu(utils.stream.extract_prefix, body.text, target, True)
+
+
+async def crawl_target(target, pipeline, scheduled=None):
+    """
+    Busca a página índice do alvo e agenda o download das páginas filhas.
+    Retorna a resposta do índice (None se ele não mudou desde a última execução)
+    e a lista de (url, task) na ordem em que os links aparecem no índice.
+
+    scheduled (url -> [task, alvos que aguardam a task]) é compartilhado pelos alvos
+    da execução: uma URL que aparece em mais de um alvo é baixada e processada uma vez.
+    """
+    if scheduled is None:
+        scheduled = {}
+    response, entries = await pipeline.index(target)
+    pages = []
+    for entry in entries:
+        if entry.url not in scheduled:
+            scheduled[entry.url] = [asyncio.create_task(pipeline.page(entry.url, target, entry)), 0]
+        scheduled[entry.url][1] += 1
+        pages.append((entry.url, scheduled[entry.url][0]))
+    return response, pages
+
+
+def _release(pages, scheduled):
+    # Cancela os downloads que nenhum outro alvo aguarda; os demais continuam para eles
+    for url, page in pages:
+        shared = scheduled.get(url)
+        if shared is None or shared[0] is not page:
+            page.cancel()
+            continue
+        shared[1] -= 1
+        if shared[1] <= 0:
+            page.cancel()
+            # Um alvo cujo índice ainda não terminou agenda a URL de novo
+            del scheduled[url]
+
+
+def write_items(items, recorded):
+    """
+    Escreve no briefing os itens de um alvo, ignorando as páginas sem palavras-chave
+    e as URLs que outro processo registrou primeiro.
+    """
+    for url, item in items:
+        if url not in recorded:
+            continue
+        if item is None:
+            print(f"Página ignorada - não contém todas as palavras requeridas")
+            continue
+
+        print(item['title'])
+        print("----------------------------------------------")
+        utils.md.save_markdown(item)
+        utils.metrics.incr("items_written", target=item.get('source'))
+
+
+def _cancel(jobs):
+    # Cancela os downloads ainda em andamento (no modo daemon o event loop continua vivo)
+    for job in jobs:
+        if not job.done():
+            job.cancel()
+        elif not job.cancelled() and job.exception() is None:
+            for url, page in job.result()[1]:
+                page.cancel()
+
+
+async def _collect(targets, jobs, scheduled=None):
+    """
+    Aguarda os alvos na ordem da configuração, registrando e escrevendo as páginas de cada um.
+    Um alvo com erro (mesmo após as novas tentativas) é registrado no log e não interrompe os demais.
+    """
+    seen = set()
+    if scheduled is None:
+        scheduled = {}
+
+    for target, job in zip(targets, jobs):
+        try:
+            await _finish_target(target, job, seen, scheduled)
+        except Exception as e:
+            print(f"[ERROR] Alvo ignorado | {target.get('label', target['type'])} | {e}")
+
+
+async def _finish_target(target, job, seen, scheduled):
+    """
+    Aguarda as páginas de um alvo, na ordem do índice, e grava as que deram certo.
+    Uma página baixada para outro alvo é escrita com o "label" deste, o primeiro da configuração que a lista.
+    Uma página com erro é pulada (scrapers.engine.page_failed); o alvo só é interrompido
+    se o circuito do host abrir (HostUnavailable).
+    """
+    index, pages = await job
+    items = []
+    failed = []
+    complete = True
+    try:
+        for position, (url, page) in enumerate(pages):
+            if url in seen:
+                continue
+            seen.add(url)
+
+            try:
+                item = await page
+            except Exception as e:
+                if isinstance(e, utils.policy.HostUnavailable):
+                    _release(pages[position:], scheduled)
+                    raise
+                if scrapers.engine.page_failed(url, e, target):
+                    failed.append(url)
+                else:
+                    complete = False
+                continue
+            except BaseException:
+                _release(pages[position:], scheduled)
+                raise
+            if item is not None and item.get('source') != target.get('label'):
+                item = dict(item, source=target.get('label'))
+            items.append((url, item))
+    finally:
+        # Um único upsert em lote por alvo; o que já foi registrado também é escrito
+        # no briefing mesmo quando uma página falha no meio
+        # As falhas permanentes também são registradas, para não serem tentadas a cada execução
+        recorded = set(await asyncio.to_thread(utils.db.save_scrapped_many, [url for url, item in items] + failed))
+        items = await asyncio.to_thread(drop_near_duplicates, [(url, item) for url, item in items if url in recorded])
+        await asyncio.to_thread(summarize_items, items)
+        await asyncio.to_thread(write_items, items, recorded)
+
+    # Só marca o índice como processado se nenhuma página filha teve falha temporária
+    if index is not None and complete:
+        utils.http_cache.remember(target['url'], index.headers, index.text)
+    utils.schedule.mark_crawled(target)
+
+
+async def crawl_async(targets, pipeline):
+    """Versão assíncrona de crawl(), usando um Pipeline já montado."""
+    scrapers.engine.validate(targets)
+
+    scheduled = {}
+    jobs = [
+        asyncio.create_task(crawl_target(target, pipeline, scheduled))
+        for target in targets
+    ]
+    try:
+        await _collect(targets, jobs, scheduled)
+    except BaseException:
+        _cancel(jobs)
+        raise
+
+
+def crawl(targets, max_workers=utils.fetch.MAX_WORKERS, max_per_host=utils.fetch.MAX_PER_HOST,
+          http2=utils.fetch.HTTP2, parse_workers=PARSE_WORKERS, queue_size=PARSE_QUEUE_SIZE, transport=None,
+          stream=utils.stream.STREAM_PAGES, initializer=None):
+    """
+    Executa o crawl de todos os alvos de forma concorrente.
+
+    As páginas são baixadas em paralelo e parseadas em um pool de processos, mas o
+    registro no banco e a escrita do briefing acontecem na ordem dos alvos e dos
+    links, como no modo serial. Uma URL que aparece em mais de um alvo é baixada e
+    registrada apenas uma vez.
+
+    Args:
+        targets (list): Lista de alvos de configs/urls.json
+        max_workers (int): Número máximo de requisições simultâneas no total
+        max_per_host (int): Número máximo de requisições simultâneas por host
+        http2 (bool): Habilita HTTP/2 quando o pacote 'h2' está instalado
+        parse_workers (int): Processos para parse/extração (0 usa threads no mesmo processo)
+        queue_size (int): Páginas baixadas que podem aguardar o parse ao mesmo tempo
+        transport (httpx.AsyncBaseTransport, optional): Transporte alternativo (usado nos testes)
+        stream (bool): Lê as páginas filhas em streaming, parando assim que o conteúdo foi encontrado
+        initializer (callable, optional): Executado em cada processo de parse ao iniciar
+            (deve ser uma função de módulo, para o spawn)
+    """
+    executor = make_parse_pool(parse_workers, initializer)
+
+    async def run():
+        async with utils.fetch.AsyncFetcher(max_workers, max_per_host, http2, transport=transport) as fetcher:
+            await crawl_async(targets, Pipeline(fetcher, executor, queue_size, stream))
+
+    try:
+        asyncio.run(run())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,113 @@
+# utils/daemon.py
+# Modo daemon: ciclos de crawl agendados em um único processo, mantendo o estado aquecido
+
+import asyncio
+import os
+import signal
+import time
+
+import utils.crawler
+import utils.db
+import utils.fetch
+import utils.http_cache
+import utils.md
+import utils.metrics
+import utils.page_cache
+import utils.schedule
+
+# Tempo máximo entre dois ciclos, em segundos
+DAEMON_INTERVAL = int(os.environ.get("DAEMON_INTERVAL", 3600))
+
+
+def seconds_until_next_cycle(targets, now=None, max_wait=None):
+    """
+    Segundos até o próximo ciclo: o primeiro alvo com intervalo próprio que volta a
+    ficar disponível, limitado a max_wait (DAEMON_INTERVAL).
+    """
+    now = time.time() if now is None else now
+    max_wait = DAEMON_INTERVAL if max_wait is None else max_wait
+
+    wake = now + max_wait
+    for target in targets:
+        if not target.get('active', True) or utils.schedule.interval(target) == 0:
+            continue
+        next_run = utils.schedule.next_run(target)
+        if next_run > now:
+            wake = min(wake, next_run)
+    return wake - now
+
+
+async def run_cycle(targets, pipeline):
+    """
+    Um ciclo de crawl com o Pipeline (e portanto o cliente HTTP e o pool de parse) do daemon.
+    O briefing é aberto a cada ciclo, para seguir a troca de dia, e o estado local é
+    gravado no final; o cliente MongoDB continua aberto para o próximo ciclo.
+    Cada ciclo gera o seu próprio relatório de métricas.
+    """
+    utils.md.open_briefing()
+    utils.metrics.reset()
+    try:
+        await utils.crawler.crawl_async(utils.schedule.due_targets(targets), pipeline)
+    finally:
+        utils.md.close_briefing()
+        utils.db.save_seen_cache()
+        utils.http_cache.save_http_cache()
+        utils.page_cache.save_page_cache()
+        utils.schedule.save_schedule()
+        utils.metrics.write_reports()
+
+
+async def run_async(load_targets, stop, pipeline):
+    """Executa ciclos até que o evento stop seja sinalizado; erros de um ciclo não param o daemon."""
+    targets = []
+    while not stop.is_set():
+        try:
+            targets = load_targets()
+            await run_cycle(targets, pipeline)
+        except Exception as e:
+            print(f"[ERROR] Ciclo de crawl falhou: {e}")
+
+        wait = seconds_until_next_cycle(targets)
+        print(f"[INFO] Próximo ciclo em {wait:.0f}s")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+
+
+def run(load_targets, max_workers=utils.fetch.MAX_WORKERS, max_per_host=utils.fetch.MAX_PER_HOST,
+        http2=utils.fetch.HTTP2, parse_workers=utils.crawler.PARSE_WORKERS,
+        queue_size=utils.crawler.PARSE_QUEUE_SIZE, transport=None):
+    """
+    Roda o crawl continuamente até receber SIGTERM ou SIGINT.
+
+    O cliente HTTP (com as conexões keep-alive), o pool de processos de parse, o
+    cliente MongoDB, o matcher de palavras-chave e o filtro de URLs já vistas são
+    criados uma única vez e reaproveitados por todos os ciclos. Ao receber o sinal,
+    o ciclo em andamento termina normalmente antes de o daemon sair.
+
+    Args:
+        load_targets (callable): Retorna a lista de alvos (relida a cada ciclo)
+    """
+    executor = utils.crawler.make_parse_pool(parse_workers)
+
+    async def main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows ou fora da thread principal
+
+        async with utils.fetch.AsyncFetcher(max_workers, max_per_host, http2, transport=transport) as fetcher:
+            pipeline = utils.crawler.Pipeline(fetcher, executor, queue_size)
+            await run_async(load_targets, stop, pipeline)
+        print("[INFO] Daemon encerrado")
+
+    try:
+        asyncio.run(main())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        utils.db.close_storage()
@@ -0,0 +1,93 @@
+# utils/feeds.py
+# Leitura incremental de feeds RSS/Atom e sitemaps XML
+
+import datetime
+import email.utils
+import html
+import os
+import re
+import xml.etree.ElementTree as ET
+
+# Itens publicados há mais que isso são ignorados antes de qualquer download (0 desabilita)
+FEED_MAX_AGE_HOURS = float(os.environ.get("FEED_MAX_AGE_HOURS", 48))
+# Texto mínimo do item do feed para dispensar o download da notícia
+FEED_MIN_TEXT = int(os.environ.get("FEED_MIN_TEXT", 500))
+# Tamanho dos pedaços entregues ao parser XML
+FEED_CHUNK_SIZE = 16 * 1024
+
+_TAG = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def local_name(tag):
+    """Nome do elemento sem o namespace ("{http://www.w3.org/2005/Atom}entry" -> "entry")."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_elements(body, names, chunk_size=None):
+    """
+    Percorre o XML em pedaços e devolve cada elemento cujo nome (sem namespace) está
+    em names assim que ele fecha. Quem consome pode parar a qualquer momento: o resto
+    do documento não é parseado. Os elementos devolvidos são limpos em seguida, então
+    a memória não cresce com o tamanho do feed.
+    """
+    chunk_size = chunk_size or FEED_CHUNK_SIZE
+    parser = ET.XMLPullParser(events=("end",))
+    for start in range(0, len(body), chunk_size):
+        parser.feed(body[start:start + chunk_size])
+        for _, element in parser.read_events():
+            if local_name(element.tag) in names:
+                yield element
+                element.clear()
+
+
+def child(element, *names):
+    """Primeiro filho com um dos nomes (sem namespace), na ordem de preferência de names."""
+    found = {}
+    for node in element:
+        name = local_name(node.tag)
+        if name in names and name not in found:
+            found[name] = node
+    for name in names:
+        if name in found:
+            return found[name]
+    return None
+
+
+def child_text(element, *names):
+    node = child(element, *names)
+    return (node.text or '').strip() if node is not None else ''
+
+
+def parse_date(value):
+    """
+    Converte datas de RSS (RFC 822), Atom e sitemaps (ISO 8601) em datetime com fuso.
+    Datas sem fuso são consideradas UTC; retorna None se a data não puder ser lida.
+    """
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        date = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    return date
+
+
+def html_to_text(value):
+    """Texto de um resumo/conteúdo do feed, que costuma vir como HTML escapado."""
+    return _WHITESPACE.sub(' ', html.unescape(_TAG.sub(' ', html.unescape(value or '')))).strip()
+
+
+def is_recent(published, max_age_hours=None, now=None):
+    """True se o item é recente o bastante (itens sem data são mantidos)."""
+    max_age_hours = FEED_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+    if published is None or max_age_hours <= 0:
+        return True
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return now - published <= datetime.timedelta(hours=max_age_hours)
@@ -0,0 +1,159 @@
+# utils/fetch.py
+# Motor de download assíncrono compartilhado pelos scrapers
+
+import asyncio
+import contextlib
+import os
+import time
+from urllib.parse import urlparse
+
+import charset_normalizer
+import httpx
+
+import utils.metrics
+import utils.policy
+
+try:
+    import h2  # noqa: F401 - dependência opcional para HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Limites de concorrência (podem ser ajustados por variável de ambiente)
+MAX_WORKERS = int(os.environ.get("CRAWL_MAX_WORKERS", 8))
+MAX_PER_HOST = int(os.environ.get("CRAWL_MAX_PER_HOST", 2))
+HTTP2 = os.environ.get("CRAWL_HTTP2", "0") == "1"
+TIMEOUT = 10
+
+# Eventos da extensão 'trace' do httpx medidos como etapas próprias
+TRACE_STAGES = {"connection.connect_tcp": "connect", "connection.start_tls": "tls"}
+
+
+@utils.metrics.timed("encoding")
+def detect_encoding(content):
+    """Detecta a codificação quando o servidor não informa o charset."""
+    match = charset_normalizer.from_bytes(content).best()
+    return match.encoding if match else "utf-8"
+
+
+def connection_trace():
+    """Callback de trace do httpx que registra o tempo de conexão TCP e do handshake TLS."""
+    started = {}
+
+    async def trace(event_name, info):
+        prefix, _, phase = event_name.rpartition(".")
+        stage = TRACE_STAGES.get(prefix)
+        if stage is None:
+            return
+        if phase == "started":
+            started[stage] = time.perf_counter()
+        elif stage in started:  # complete ou failed
+            utils.metrics.observe(stage, time.perf_counter() - started.pop(stage))
+
+    return trace
+
+
+class AsyncFetcher:
+    """
+    Cliente HTTP assíncrono com pool de conexões por host e keep-alive.
+
+    Todas as páginas (índices e filhas) de todos os alvos passam pelo mesmo
+    cliente, reaproveitando as conexões TLS abertas para cada host.
+    Deve ser usado como gerenciador de contexto assíncrono:
+
+        async with AsyncFetcher() as fetcher:
+            html = await fetcher.get(url)
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_per_host=MAX_PER_HOST, http2=HTTP2,
+                 timeout=TIMEOUT, transport=None, policy=None):
+        if http2 and not HTTP2_AVAILABLE:
+            print("[WARN] Pacote 'h2' não instalado - usando HTTP/1.1")
+            http2 = False
+
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.http2 = http2
+        self.timeout = timeout
+        self.transport = transport
+        self.policy = policy or utils.policy.FetchPolicy()
+        self.client = None
+        self._slots = None
+        self._hosts = {}
+
+    async def __aenter__(self):
+        limits = httpx.Limits(max_connections=self.max_workers,
+                              max_keepalive_connections=self.max_workers)
+        self.client = httpx.AsyncClient(http2=self.http2, limits=limits, timeout=self.timeout,
+                                        follow_redirects=True, default_encoding=detect_encoding,
+                                        transport=self.transport)
+        self._slots = asyncio.Semaphore(self.max_workers)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    def _host_slots(self, url):
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.max_per_host)
+        return self._hosts[host]
+
+    async def _send(self, url, send):
+        """
+        Executa send() seguindo a política do host: limite de taxa, novas tentativas
+        com backoff (respeitando Retry-After) e circuit breaker (HostUnavailable).
+        """
+        host = urlparse(url).netloc
+        attempt = 0
+        while True:
+            await asyncio.sleep(self.policy.before_request(host))
+            try:
+                async with self._slots, self._host_slots(url):
+                    response = await send()
+            except httpx.TransportError as e:  # timeouts e erros de conexão
+                delay = self.policy.after_response(host, attempt, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self.policy.after_response(host, attempt, response.status_code, response.headers)
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def fetch(self, url, headers=None):
+        """
+        Baixa uma página e retorna a resposta httpx.
+        Aceita 304 (Not Modified) para requisições condicionais; outros erros geram exceção.
+        """
+        response = await self._send(url, lambda: self.client.get(
+            url, headers=headers, extensions={"trace": connection_trace()}))
+        if response.status_code != 304:
+            response.raise_for_status()  # Garante que a resposta foi 200
+        return response
+
+    async def get(self, url):
+        """Baixa uma página e retorna o HTML decodificado."""
+        response = await self.fetch(url)
+        return response.text
+
+    @contextlib.asynccontextmanager
+    async def stream(self, url):
+        """
+        Abre a resposta sem ler o corpo, para consumi-lo em pedaços (aiter_bytes).
+        Sair do bloco antes do fim do corpo fecha a conexão.
+        """
+        async def send():
+            response = await self.client.send(self.client.build_request("GET", url), stream=True)
+            if response.status_code in utils.policy.RETRY_STATUSES:
+                await response.aclose()
+            return response
+
+        response = await self._send(url, send)
+        try:
+            response.raise_for_status()  # Garante que a resposta foi 200
+            yield response
+        finally:
+            await response.aclose()
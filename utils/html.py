@@ -0,0 +1,166 @@
+# utils/html.py
+# Backends de parsing HTML e parsing limitado aos trechos usados pelos seletores
+
+import functools
+import os
+import re
+
+import soupsieve
+from bs4 import SoupStrainer
+
+try:
+    import lxml  # noqa: F401 - backend opcional, bem mais rápido que html.parser
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# Parser usado quando o alvo não define "parser" em configs/urls.json
+DEFAULT_PARSER = os.environ.get("HTML_PARSER", "lxml" if LXML_AVAILABLE else "html.parser")
+
+# Primeiro seletor composto: tag, #id e .classes (sem atributos nem pseudo-classes)
+_COMBINATOR = re.compile(r'\s*[\s>+~]\s*')
+_COMPOUND = re.compile(r'^(?P<name>[a-zA-Z][\w-]*)?(?P<rest>(?:[#.][\w-]+)*)$')
+
+
+def get_parser(target):
+    """
+    Retorna o backend de parsing do alvo ("html.parser", "lxml" ou "selectolax").
+    Se o backend escolhido não estiver instalado, cai para lxml e depois html.parser.
+    """
+    parser = target.get('parser', DEFAULT_PARSER)
+    if parser == 'selectolax' and not SELECTOLAX_AVAILABLE:
+        print("[WARN] Pacote 'selectolax' não instalado - usando lxml")
+        parser = 'lxml'
+    if parser == 'lxml' and not LXML_AVAILABLE:
+        print("[WARN] Pacote 'lxml' não instalado - usando html.parser")
+        parser = 'html.parser'
+    return parser
+
+
+def _compound_rule(selector):
+    """
+    Converte o primeiro seletor composto em (tag, id, classes), ou None se não for simples.
+    Com combinadores de irmãos (+, ~) parte da cadeia fica fora do primeiro elemento, então
+    o seletor também não é limitado.
+    """
+    if ',' in selector or '+' in selector or '~' in selector:
+        return None
+    first = _COMBINATOR.split(selector.strip(), 1)[0]
+    match = _COMPOUND.match(first)
+    if match is None or not first:
+        return None
+
+    rest = match.group('rest')
+    ids = re.findall(r'#([\w-]+)', rest)
+    classes = set(re.findall(r'\.([\w-]+)', rest))
+    return match.group('name'), (ids[0] if ids else None), classes
+
+
+class SelectorStrainer(SoupStrainer):
+    """
+    SoupStrainer que só cria os elementos de nível mais alto que casam com o primeiro
+    seletor composto de algum dos seletores. Os seletores completos continuam
+    funcionando, pois todo o resto da cadeia está dentro desses elementos.
+    """
+
+    def __init__(self, rules):
+        super().__init__()
+        self.rules = rules
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        attrs = attrs or {}
+        classes = attrs.get('class') or ''
+        if isinstance(classes, str):
+            classes = classes.split()
+        for rule_name, rule_id, rule_classes in self.rules:
+            if rule_name and rule_name != name:
+                continue
+            if rule_id and attrs.get('id') != rule_id:
+                continue
+            if not rule_classes.issubset(classes):
+                continue
+            return True
+        return False
+
+    def allow_string_creation(self, string):
+        return False
+
+
+def strainer_for(*selectors):
+    """
+    Retorna um SoupStrainer que limita o parsing aos trechos usados pelos seletores,
+    ou None (parsing completo) se algum seletor não puder ser limitado com segurança.
+    """
+    rules = [_compound_rule(selector) for selector in selectors]
+    if not rules or any(rule is None for rule in rules):
+        return None
+    return SelectorStrainer(rules)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_selector(selector):
+    """
+    Seletor CSS compilado pelo soupsieve uma única vez por processo.
+    pattern.select(soup) / pattern.select_one(soup) evitam interpretar o texto do seletor a cada página.
+    """
+    return soupsieve.compile(selector)
+
+
+def link_text(tag):
+    """Texto do link e o atributo title, quando existe (BeautifulSoup)."""
+    return ' '.join(filter(None, (tag.get_text(' ', strip=True), (tag.get('title') or '').strip())))
+
+
+def item_text(tag, pattern):
+    """
+    Texto do item da lista que contém o link: o ancestral logo abaixo do elemento
+    que casa com o seletor compilado pattern (BeautifulSoup). Vazio se ele não for encontrado.
+    """
+    item = tag
+    for parent in tag.parents:
+        if parent.name is not None and pattern.match(parent):
+            return item.get_text(' ', strip=True)
+        item = parent
+    return ''
+
+
+def select_links(html, query, limit, container=None):
+    """
+    Backend selectolax: retorna (href, texto do link, texto do item dentro de container)
+    dos primeiros 'limit' elementos do seletor, como link_text e item_text.
+    """
+    tree = LexborHTMLParser(html)
+    containers = {node.mem_id for node in tree.css(container)} if container else set()
+    links = []
+    for node in tree.css(query)[:limit]:
+        text = ' '.join(filter(None, (node.text(separator=' ', strip=True), (node.attributes.get('title') or '').strip())))
+        teaser = ''
+        item = node
+        while containers and item.parent is not None:
+            if item.parent.mem_id in containers:
+                teaser = item.text(separator=' ', strip=True)
+                break
+            item = item.parent
+        links.append((node.attributes.get('href'), text, teaser))
+    return links
+
+
+def select_texts(html, selectors):
+    """
+    Backend selectolax: retorna o texto do primeiro elemento de cada seletor.
+    Gera AttributeError se algum seletor não encontrar elementos, como no BeautifulSoup.
+    """
+    tree = LexborHTMLParser(html)
+    texts = []
+    for selector in selectors:
+        node = tree.css_first(selector)
+        if node is None:
+            raise AttributeError(f"Nenhum elemento encontrado para o seletor '{selector}'")
+        texts.append(node.text(separator=' ', strip=True))
+    return texts
@@ -0,0 +1,96 @@
+# utils/http_cache.py
+# Cache de validação HTTP (ETag / Last-Modified / hash do corpo) das páginas índice
+
+import hashlib
+import json
+import os
+import threading
+
+HTTP_CACHE_ENABLED = os.environ.get("HTTP_CACHE", "1") == "1"
+HTTP_CACHE_PATH = os.environ.get("HTTP_CACHE_PATH", os.path.join("db", "http_cache.json"))
+
+_entries = None
+_lock = threading.Lock()
+
+
+def body_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _load():
+    global _entries
+    if _entries is None:
+        with _lock:
+            if _entries is None:
+                entries = {}
+                if os.path.exists(HTTP_CACHE_PATH):
+                    with open(HTTP_CACHE_PATH, "r", encoding="utf-8") as f:
+                        entries = json.load(f)
+                _entries = entries
+    return _entries
+
+
+def request_headers(url):
+    """Cabeçalhos de requisição condicional para a URL, a partir da última resposta guardada."""
+    if not HTTP_CACHE_ENABLED:
+        return {}
+
+    entry = _load().get(url, {})
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def is_unchanged(url, status_code, text=None):
+    """
+    Retorna True se a página não mudou desde a última execução:
+    resposta 304 ou corpo com o mesmo hash da última versão processada.
+    """
+    if not HTTP_CACHE_ENABLED:
+        return False
+    if status_code == 304:
+        return True
+
+    entry = _load().get(url)
+    return entry is not None and text is not None and entry.get("hash") == body_hash(text)
+
+
+def remember(url, headers, text):
+    """
+    Guarda os validadores e o hash da página índice.
+    Deve ser chamado só depois que as páginas filhas do alvo foram processadas,
+    para que uma execução interrompida não marque o índice como já visto.
+    """
+    if not HTTP_CACHE_ENABLED:
+        return
+
+    entries = _load()
+    with _lock:
+        entries[url] = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "hash": body_hash(text),
+        }
+
+
+def save_http_cache():
+    """Grava o cache em disco (gravação atômica via arquivo temporário)."""
+    if _entries is None:
+        return
+
+    os.makedirs(os.path.dirname(HTTP_CACHE_PATH) or ".", exist_ok=True)
+    temp_path = f"{HTTP_CACHE_PATH}.tmp"
+    with _lock:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(_entries, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, HTTP_CACHE_PATH)
+
+
+def clear_http_cache():
+    """Descarta o cache em memória; a próxima consulta relê o arquivo."""
+    global _entries
+    with _lock:
+        _entries = None
@@ -1,5 +1,17 @@
+import functools
 import os
-import re
+import threading
+import unicodedata
+from collections import deque
+
+import utils.metrics
+
+KEYWORDS_FILE = os.path.join('configs', 'keywords.txt')
+
+# Matcher do arquivo de palavras-chave, recompilado apenas quando o arquivo muda
+_matcher = None
+_matcher_mtime = None
+_matcher_lock = threading.Lock()
 
 
 def load_required_keywords():
@@ -7,36 +19,192 @@ def load_required_keywords():
     Carrega as palavras-chave do arquivo de configuração.
     Retorna uma lista de palavras-chave em lowercase, ignorando comentários e linhas vazias.
     """
-    keywords_file = os.path.join('configs', 'keywords.txt')
+    keywords_file = KEYWORDS_FILE
     if not os.path.exists(keywords_file):
         return []
-    
+
     with open(keywords_file, 'r', encoding='utf-8') as f:
         # Ignora linhas de comentário e linhas vazias, e converte para lowercase
         keywords = [line.strip().lower() for line in f if line.strip() and not line.startswith('#')]
     return keywords
 
 
+def normalize_text(text):
+    """Converte para minúsculas e remove os acentos ("Inteligência" -> "inteligencia")."""
+    text = text.lower()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _is_word_char(char):
+    # Mesma definição de \w das expressões regulares
+    return char.isalnum() or char == '_'
+
+
+class AhoCorasick:
+    """
+    Autômato de Aho–Corasick: encontra todas as ocorrências de todas as palavras
+    em uma única passada pelo texto, independente do número de palavras.
+    """
+
+    def __init__(self, words):
+        self.words = list(words)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+
+        for index, word in enumerate(self.words):
+            state = 0
+            for char in word:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state] += ((index, len(word)),)
+
+        # Links de falha calculados em largura a partir da raiz
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] += self.output[self.fail[next_state]]
+
+    def iter(self, text):
+        """Gera (início, fim, índice da palavra) para cada ocorrência no texto."""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index, length in output[state]:
+                yield position + 1 - length, position + 1, index
+
+
+class KeywordMatcher:
+    """
+    Busca de palavras-chave compilada uma única vez em um autômato de Aho–Corasick.
+    A busca é feita por palavras completas, sem diferenciar maiúsculas de minúsculas
+    nem acentos ("inteligência" encontra "inteligencia" e vice-versa).
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        # Palavras que ficam iguais após a normalização compartilham o mesmo estado final
+        self._originals = {}
+        for keyword in self.keywords:
+            self._originals.setdefault(normalize_text(keyword), []).append(keyword)
+        self.automaton = AhoCorasick(self._originals) if self._originals else None
+
+    def _whole_word_hits(self, content):
+        text = normalize_text(content)
+        for start, end, index in self.automaton.iter(text):
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if end < len(text) and _is_word_char(text[end]):
+                continue
+            yield index
+
+    def search(self, content):
+        """Retorna True se o conteúdo contém pelo menos uma das palavras-chave."""
+        if self.automaton is None:
+            return True
+        return next(self._whole_word_hits(content), None) is not None
+
+    def count(self, content):
+        """Retorna o número de ocorrências de cada palavra-chave encontrada no conteúdo."""
+        if self.automaton is None:
+            return {}
+        hits = {}
+        for index in self._whole_word_hits(content):
+            for keyword in self._originals[self.automaton.words[index]]:
+                hits[keyword] = hits.get(keyword, 0) + 1
+        return hits
+
+
+@functools.lru_cache(maxsize=32)
+def _matcher_for(keywords):
+    return KeywordMatcher(keywords)
+
+
+def _keywords_mtime():
+    try:
+        return os.path.getmtime(KEYWORDS_FILE)
+    except OSError:
+        return None
+
+
+def get_matcher():
+    """
+    Retorna o matcher das palavras-chave do arquivo de configuração.
+    O arquivo só é lido e o autômato Aho-Corasick só é montado de novo quando o mtime do arquivo muda.
+    """
+    global _matcher, _matcher_mtime
+    mtime = _keywords_mtime()
+    if _matcher is None or mtime != _matcher_mtime:
+        with _matcher_lock:
+            if _matcher is None or mtime != _matcher_mtime:
+                _matcher = KeywordMatcher(load_required_keywords())
+                _matcher_mtime = mtime
+    return _matcher
+
+
+def clear_matcher_cache():
+    """Descarta o matcher em cache; a próxima chamada a get_matcher() relê o arquivo."""
+    global _matcher, _matcher_mtime
+    with _matcher_lock:
+        _matcher = None
+        _matcher_mtime = None
+    _matcher_for.cache_clear()
+
+
+@utils.metrics.timed("keywords")
 def check_content_has_keywords(content, required_words=None):
     """
     Verifica se o conteúdo contém pelo menos uma das palavras-chave requeridas.
     A busca é feita por palavras completas, não partes de palavras.
-    
+
     Args:
         content (str): O conteúdo a ser verificado
-        required_words (list, optional): Lista de palavras-chave. Se None, carrega do arquivo.
-    
+        required_words (list, optional): Lista de palavras-chave. Se None, usa o matcher do arquivo.
+
     Returns:
         tuple: (bool, list) - (True se contém pelo menos uma palavra, lista de palavras requeridas)
     """
     if required_words is None:
-        required_words = load_required_keywords()
-    
+        matcher = get_matcher()
+        required_words = matcher.keywords
+    else:
+        matcher = _matcher_for(tuple(required_words))
+
     if not required_words:
         return True, []
-    
-    content_lower = content.lower()
-    # Cria um padrão regex que busca palavras completas
-    pattern = r'\b(' + '|'.join(re.escape(word) for word in required_words) + r')\b'
-    has_any_word = bool(re.search(pattern, content_lower))
-    return has_any_word, required_words 
\ No newline at end of file
+
+    return matcher.search(content), required_words
+
+
+@utils.metrics.timed("keywords")
+def find_keyword_hits(content, required_words=None):
+    """
+    Igual a check_content_has_keywords, mas informa quais palavras foram encontradas.
+
+    Returns:
+        tuple: (bool, dict) - (True se contém pelo menos uma palavra ou se não há
+               palavras requeridas, número de ocorrências de cada palavra encontrada)
+    """
+    if required_words is None:
+        matcher = get_matcher()
+    else:
+        matcher = _matcher_for(tuple(required_words))
+
+    hits = matcher.count(content)
+    return bool(hits) or not matcher.keywords, hits
@@ -1,10 +1,37 @@
 # utils/md.py
 # Scrapper do tipo Parent-child-list
 
+import hashlib
 import re
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
+import utils.metrics
+from utils.briefing import BriefingStore, Renderer, HtmlRenderer, normalize_item, render
+
+try:
+    import fcntl  # trava entre processos (indisponível no Windows)
+except ImportError:
+    fcntl = None
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Entrada de um briefing em Markdown (format_entry), para importar os gravados antes do .jsonl
+_ENTRY = re.compile(r'^## (?P<title>.*)\n\*\*URL:\*\* (?P<url>.*)\n\n\*\*Resumo:\*\* (?P<summary>.*)\n\n---$', re.M)
+
+# Saídas geradas a partir do briefing estruturado (.jsonl), que é sempre gravado
+# ("jsonl" pode aparecer na lista, mas não gera nada além dele)
+FORMATS = ("md", "html", "jsonl")
+BRIEFING_FORMATS = [fmt.strip() for fmt in os.environ.get("BRIEFING_FORMATS", "md,html").split(",") if fmt.strip()]
+
+# Travas entre processos dos briefings, fora do diretório das saídas
+BRIEFING_LOCK_DIR = os.environ.get("BRIEFING_LOCK_DIR", os.path.join("db", "locks"))
+
+# Writer aberto por main(); quando existe, save_markdown() acumula as entradas nele
+_active_writer = None
+
 def get_next_filename(base_dir="briefings"):
     """
     Gera o nome do arquivo de briefing baseado na data atual.
@@ -12,34 +39,169 @@ def get_next_filename(base_dir="briefings"):
     """
     # Cria o diretório se não existir
     os.makedirs(base_dir, exist_ok=True)
-    
+
     # Formato do nome do arquivo: YYYY-MM-DD-briefing.md
     today = datetime.now().strftime('%Y-%m-%d')
     return os.path.join(base_dir, f"{today}-briefing.md")
 
+def format_header():
+    return (
+        "# Briefing Diário\n\n"
+        f"*Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}*\n\n"
+        "---\n\n"
+    )
+
+def format_entry(dados):
+    return (
+        f"## {clear_and_normalize(dados['title'])}\n"  # Adiciona título com formato de cabeçalho (H2)
+        f"**URL:** {clear_and_normalize(dados['url'])}\n\n"  # Adiciona a URL em negrito
+        f"**Resumo:** {clear_and_normalize(dados['summary'])}\n\n"  # Adiciona o resumo em negrito
+        "---\n"  # Linha de separação entre os itens
+    )
+
 def save_markdown(dados, nome_arquivo=None):
     """
     Salva o conteúdo em um arquivo markdown.
     Se nome_arquivo não for fornecido, usa o padrão de data.
     Todos os briefings do mesmo dia serão salvos no mesmo arquivo.
+    Se há um BriefingWriter aberto (open_briefing), a entrada é acumulada nele.
     """
+    if nome_arquivo is None and _active_writer is not None:
+        _active_writer.add(dados)
+        return
+
     if nome_arquivo is None:
         nome_arquivo = get_next_filename()
-    
+
     # Check if file exists to add header
     file_exists = os.path.exists(nome_arquivo)
-    
+
     with open(nome_arquivo, 'a', encoding='utf-8') as f:
         # Add header if file is new
         if not file_exists:
-            f.write("# Briefing Diário\n\n")
-            f.write(f"*Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}*\n\n")
-            f.write("---\n\n")
-            
-        f.write(f"## {clear_and_normalize(dados['title'])}\n")  # Adiciona título com formato de cabeçalho (H2)
-        f.write(f"**URL:** {clear_and_normalize(dados['url'])}\n\n")  # Adiciona a URL em negrito
-        f.write(f"**Resumo:** {clear_and_normalize(dados['summary'])}\n\n")  # Adiciona o resumo em negrito
-        f.write("---\n")  # Linha de separação entre os itens
+            f.write(format_header())
+
+        f.write(format_entry(dados))
 
 def clear_and_normalize(string):
-    return re.sub(r'\s+', ' ', string).strip()
+    return _WHITESPACE.sub(' ', string).strip()
+
+def read_markdown_entries(nome_arquivo):
+    """Entradas (título, URL e resumo) de um briefing em Markdown; vazio se o arquivo não existe."""
+    if not os.path.exists(nome_arquivo):
+        return []
+    with open(nome_arquivo, encoding='utf-8') as f:
+        content = f.read()
+    return [normalize_item(match.groupdict()) for match in _ENTRY.finditer(content)]
+
+@contextmanager
+def _file_lock(path):
+    """
+    Trava exclusiva entre processos para o arquivo de briefing. O arquivo da trava fica
+    em BRIEFING_LOCK_DIR, com o nome do briefing e o hash do caminho completo.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(BRIEFING_LOCK_DIR, exist_ok=True)
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:12]
+    lock_path = os.path.join(BRIEFING_LOCK_DIR, f"{os.path.basename(path)}.{digest}.lock")
+    with open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class MarkdownRenderer(Renderer):
+    def begin(self, f):
+        f.write(format_header())
+
+    def item(self, f, item):
+        f.write(format_entry(item))
+
+
+class BriefingWriter:
+    """
+    Escreve o briefing do dia com os arquivos resolvidos uma única vez por execução.
+
+    Os itens são acumulados em memória; flush() os acrescenta ao briefing estruturado
+    (YYYY-MM-DD-briefing.jsonl) e às saídas (Markdown, HTML) já existentes, sem reler
+    nem renderizar de novo o dia inteiro. Cada saída é copiada para um arquivo temporário
+    no mesmo diretório, recebe os itens e substitui a original (Renderer.append); uma
+    saída que ainda não existe é gerada em uma única passada pelo .jsonl, também em um
+    arquivo temporário que é renomeado.
+    Um briefing em Markdown gravado antes do .jsonl existir tem as entradas importadas
+    para ele antes da primeira escrita, então nenhuma se perde.
+    """
+
+    def __init__(self, nome_arquivo=None, flush_every=50, formats=None):
+        self.nome_arquivo = nome_arquivo or get_next_filename()
+        self.flush_every = flush_every
+        base = os.path.splitext(self.nome_arquivo)[0]
+        self.store = BriefingStore(f"{base}.jsonl")
+
+        renderers = {"md": MarkdownRenderer(self.nome_arquivo), "html": HtmlRenderer(f"{base}.html")}
+        self.renderers = []
+        for fmt in formats or BRIEFING_FORMATS:
+            if fmt not in FORMATS:
+                raise ValueError(f"Opção inválida: {fmt}")
+            if fmt in renderers:
+                self.renderers.append(renderers[fmt])
+
+        self._items = []
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def add(self, dados):
+        item = normalize_item(dados)
+        with self._lock:
+            self._items.append(item)
+            full = len(self._items) >= self.flush_every
+        if full:
+            self.flush()
+
+    @utils.metrics.timed("write")
+    def flush(self):
+        """Grava os itens acumulados no .jsonl e nas saídas, gerando por inteiro só as que não existem."""
+        with self._lock:
+            if not self._items:
+                return
+            items, self._items = self._items, []
+
+            with _file_lock(self.store.path):
+                if not os.path.exists(self.store.path):
+                    legacy = read_markdown_entries(self.nome_arquivo)
+                    if legacy:
+                        print(f"[INFO] Importando {len(legacy)} entradas do briefing {self.nome_arquivo}")
+                        self.store.append(legacy)
+                self.store.append(items)
+                missing = [renderer for renderer in self.renderers if not renderer.append(items)]
+                if missing:
+                    render(self.store, missing)
+
+    def close(self):
+        if not self.closed:
+            self.flush()
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_briefing(nome_arquivo=None):
+    """Abre o BriefingWriter da execução; save_markdown() passa a acumular nele."""
+    global _active_writer
+    _active_writer = BriefingWriter(nome_arquivo)
+    return _active_writer
+
+def close_briefing():
+    """Grava as entradas pendentes e fecha o BriefingWriter da execução."""
+    global _active_writer
+    if _active_writer is not None:
+        _active_writer.close()
+        _active_writer = None
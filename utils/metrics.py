@@ -0,0 +1,261 @@
+# utils/metrics.py
+# Instrumentação da execução: tempo por etapa, contadores e histogramas por alvo
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Relatórios da execução (JSON) e métricas no formato texto do Prometheus
+METRICS_ENABLED = os.environ.get("METRICS", "1") == "1"
+METRICS_DIR = os.environ.get("METRICS_DIR", "reports")
+PROMETHEUS_PREFIX = "briefing"
+
+# Limites dos buckets dos histogramas, em segundos
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_local = threading.local()
+
+
+class Histogram:
+    """Histograma cumulativo no estilo Prometheus (contagem por bucket, soma, mínimo e máximo)."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        self.buckets = [a + b for a, b in zip(self.buckets, other["buckets"])]
+        self.count += other["count"]
+        self.sum += other["sum"]
+        for attr, pick in (("min", min), ("max", max)):
+            if other[attr] is not None:
+                current = getattr(self, attr)
+                setattr(self, attr, other[attr] if current is None else pick(current, other[attr]))
+
+    def to_dict(self):
+        return {"buckets": list(self.buckets), "count": self.count, "sum": self.sum,
+                "min": self.min, "max": self.max}
+
+
+class Metrics:
+    """
+    Registro de contadores e histogramas de tempo, por etapa e opcionalmente por alvo.
+    As chaves são (nome, alvo); alvo None é o total sem separação por fonte.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def incr(self, name, value=1, target=None):
+        with self._lock:
+            for key in _keys(name, target):
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, stage, seconds, target=None):
+        with self._lock:
+            for key in _keys(stage, target):
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram()
+                self.histograms[key].observe(seconds)
+
+    def snapshot(self):
+        """Cópia serializável (usada para trazer as medições dos workers de parse)."""
+        with self._lock:
+            return {
+                "counters": list(self.counters.items()),
+                "histograms": [(key, histogram.to_dict()) for key, histogram in self.histograms.items()],
+            }
+
+    def merge(self, snapshot):
+        with self._lock:
+            for key, value in snapshot["counters"]:
+                key = tuple(key)
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, data in snapshot["histograms"]:
+                key = tuple(key)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram()
+                self.histograms[key].merge(data)
+
+
+def _keys(name, target):
+    # Toda medição de um alvo também entra no total
+    return [(name, None)] if target is None else [(name, None), (name, target)]
+
+
+_registry = Metrics()
+
+
+def registry():
+    """Registro atual: o do worker (run_collected) ou o da execução."""
+    return getattr(_local, "registry", None) or _registry
+
+
+def reset():
+    """Começa um novo registro (no início de cada execução ou ciclo do daemon)."""
+    global _registry
+    _registry = Metrics()
+
+
+def incr(name, value=1, target=None):
+    registry().incr(name, value, target)
+
+
+def observe(stage, seconds, target=None):
+    registry().observe(stage, seconds, target)
+
+
+@contextmanager
+def timer(stage, target=None):
+    """Mede a duração do bloco na etapa 'stage' (e no histograma do alvo, se informado)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start, target)
+
+
+def timed(stage):
+    """Decorador: mede cada chamada da função na etapa 'stage'."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def run_collected(func, *args):
+    """
+    Executa func em um registro próprio e retorna (resultado, medições).
+    Usado no pool de parse, cujas medições não chegam ao registro do processo principal.
+    """
+    _local.registry = Metrics()
+    try:
+        return func(*args), _local.registry.snapshot()
+    finally:
+        _local.registry = None
+
+
+def merge(snapshot):
+    registry().merge(snapshot)
+
+
+def report(metrics=None):
+    """Relatório da execução em um dicionário (contadores e estatísticas de cada etapa)."""
+    metrics = metrics or registry()
+    finished_at = time.time()
+    result = {
+        "started_at": datetime.fromtimestamp(metrics.started_at).isoformat(timespec="seconds"),
+        "finished_at": datetime.fromtimestamp(finished_at).isoformat(timespec="seconds"),
+        "duration": round(finished_at - metrics.started_at, 3),
+        "counters": {},
+        "stages": {},
+    }
+    for (name, target), value in sorted(metrics.counters.items(), key=_sort_key):
+        entry = result["counters"].setdefault(name, {"total": 0, "targets": {}})
+        if target is None:
+            entry["total"] = value
+        else:
+            entry["targets"][target] = value
+
+    for (stage, target), histogram in sorted(metrics.histograms.items(), key=_sort_key):
+        stats = {
+            "count": histogram.count,
+            "sum": round(histogram.sum, 6),
+            "mean": round(histogram.sum / histogram.count, 6) if histogram.count else 0,
+            "min": histogram.min,
+            "max": histogram.max,
+            "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], histogram.buckets)),
+        }
+        entry = result["stages"].setdefault(stage, {"targets": {}})
+        if target is None:
+            entry.update(stats)
+        else:
+            entry["targets"][target] = stats
+    return result
+
+
+def _sort_key(item):
+    name, target = item[0]
+    return name, target or ""
+
+
+def _labels(**labels):
+    pairs = [f'{key}="{_escape(value)}"' for key, value in labels.items() if value is not None]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def prometheus_text(metrics=None):
+    """Métricas no formato texto de exposição do Prometheus."""
+    metrics = metrics or registry()
+    lines = []
+
+    counter_names = sorted({name for name, _ in metrics.counters})
+    for name in counter_names:
+        metric = f"{PROMETHEUS_PREFIX}_{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        for (counter, target), value in sorted(metrics.counters.items(), key=_sort_key):
+            if counter == name:
+                lines.append(f"{metric}{_labels(target=target)} {value}")
+
+    metric = f"{PROMETHEUS_PREFIX}_stage_seconds"
+    if metrics.histograms:
+        lines.append(f"# TYPE {metric} histogram")
+    for (stage, target), histogram in sorted(metrics.histograms.items(), key=_sort_key):
+        cumulative = 0
+        for bound, count in zip([str(b) for b in BUCKETS] + ["+Inf"], histogram.buckets):
+            cumulative += count
+            lines.append(f"{metric}_bucket{_labels(stage=stage, target=target, le=bound)} {cumulative}")
+        lines.append(f"{metric}_sum{_labels(stage=stage, target=target)} {histogram.sum}")
+        lines.append(f"{metric}_count{_labels(stage=stage, target=target)} {histogram.count}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_reports(base_dir=None):
+    """
+    Grava o relatório JSON da execução (YYYY-MM-DD-HHMMSS-run.json) e o arquivo
+    metrics.prom (sobrescrito a cada execução, para o textfile collector do node_exporter).
+    Retorna o caminho do relatório JSON, ou None com METRICS=0.
+    """
+    if not METRICS_ENABLED:
+        return None
+
+    base_dir = base_dir or METRICS_DIR
+    os.makedirs(base_dir, exist_ok=True)
+    metrics = registry()
+
+    report_path = os.path.join(base_dir, f"{datetime.now().strftime('%Y-%m-%d-%H%M%S')}-run.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report(metrics), f, ensure_ascii=False, indent=2)
+
+    prom_path = os.path.join(base_dir, "metrics.prom")
+    with open(f"{prom_path}.tmp", "w", encoding="utf-8") as f:
+        f.write(prometheus_text(metrics))
+    os.replace(f"{prom_path}.tmp", prom_path)
+    print(f"[INFO] Relatório da execução: {report_path}")
+    return report_path
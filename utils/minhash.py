@@ -0,0 +1,76 @@
+# utils/minhash.py
+# Assinaturas MinHash do conteúdo e chaves de LSH para encontrar notícias quase idênticas
+
+import hashlib
+import re
+
+import numpy as np
+
+import utils.keywords
+
+# Funções de hash da assinatura, divididas em BANDS faixas de NUM_PERM // BANDS linhas.
+# Com 32 faixas de 4 linhas, textos com similaridade acima de ~0.7 quase sempre
+# compartilham alguma faixa; abaixo de ~0.3 quase nunca. Os candidatos ainda são
+# confirmados comparando as assinaturas (NEAR_DUP_THRESHOLD).
+NUM_PERM = 128
+BANDS = 32
+# Palavras por shingle
+SHINGLE_SIZE = 3
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_TOKEN = re.compile(r'\w+')
+
+# Semente fixa: as assinaturas ficam gravadas no banco e precisam ser comparáveis entre execuções
+_rng = np.random.RandomState(20240501)
+_A = _rng.randint(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text):
+    """Sequências de SHINGLE_SIZE palavras do texto normalizado (sem acentos, minúsculas)."""
+    tokens = _TOKEN.findall(utils.keywords.normalize_text(text))
+    if len(tokens) < SHINGLE_SIZE:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def _hash32(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def signature(text):
+    """
+    Retorna a assinatura MinHash do texto (array de NUM_PERM inteiros de 32 bits).
+    A fração de posições iguais entre duas assinaturas estima a similaridade de
+    Jaccard entre os conjuntos de shingles dos textos.
+    """
+    hashes = np.fromiter((_hash32(shingle) for shingle in shingles(text)), dtype=np.uint64)
+    if hashes.size == 0:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    # (a * x + b) mod p, com x, a e b menores que 2**32: não há overflow em 64 bits
+    values = (np.outer(hashes, _A) + _B) % _MERSENNE & _MAX_HASH
+    return values.min(axis=0).astype(np.uint32)
+
+
+def similarity(first, second):
+    """Similaridade de Jaccard estimada a partir de duas assinaturas."""
+    return float(np.mean(np.asarray(first) == np.asarray(second)))
+
+
+def band_keys(sig):
+    """Chaves de LSH: um hash por faixa da assinatura, prefixado pelo número da faixa."""
+    rows = NUM_PERM // BANDS
+    data = np.asarray(sig, dtype="<u4")
+    return [
+        f"{band}:{hashlib.blake2b(data[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(BANDS)
+    ]
+
+
+def to_bytes(sig):
+    return np.asarray(sig, dtype="<u4").tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(data, dtype="<u4")
@@ -0,0 +1,193 @@
+# utils/page_cache.py
+# Cache em disco das páginas de notícia baixadas: comprimidas, endereçadas pelo hash do conteúdo e com descarte LRU
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+try:
+    import zstandard  # noqa: F401 - compressão opcional, mais rápida e menor que gzip
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Erros de read_object para um objeto ausente, truncado ou corrompido (gzip.BadGzipFile é um OSError)
+READ_ERRORS = (OSError, EOFError, zlib.error, UnicodeDecodeError) + ((zstandard.ZstdError,) if ZSTD_AVAILABLE else ())
+
+PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE", "1") == "1"
+PAGE_CACHE_DIR = os.environ.get("PAGE_CACHE_DIR", os.path.join("db", "page_cache"))
+# Tamanho máximo dos arquivos comprimidos; acima disso as páginas lidas há mais tempo são descartadas
+PAGE_CACHE_MAX_MB = float(os.environ.get("PAGE_CACHE_MAX_MB", 512))
+# Ao passar do limite, descarta até ficar nesta fração dele (evita descartar a cada página)
+EVICT_TO = 0.9
+
+# Índice: URL -> hash do conteúdo e alvo; hash -> arquivo, tamanho e último acesso
+_index = None
+_total_bytes = 0
+_lock = threading.Lock()
+
+
+def _index_path():
+    return os.path.join(PAGE_CACHE_DIR, "index.json")
+
+
+def _load():
+    global _index, _total_bytes
+    if _index is None:
+        with _lock:
+            if _index is None:
+                index = {"urls": {}, "objects": {}}
+                if os.path.exists(_index_path()):
+                    with open(_index_path(), "r", encoding="utf-8") as f:
+                        index = json.load(f)
+                _total_bytes = sum(stored["size"] for stored in index["objects"].values())
+                _index = index
+    return _index
+
+
+def target_key(target):
+    """Identifica o alvo da página no cache: o "label" ou, sem ele, a URL do índice."""
+    return target.get('label') or target['url']
+
+
+def content_hash(html):
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def object_path(name, directory=None):
+    """Arquivo de um objeto do cache (dois níveis, pelos primeiros caracteres do hash)."""
+    return os.path.join(directory or PAGE_CACHE_DIR, name[:2], name)
+
+
+def compress(html):
+    """Retorna (extensão, bytes comprimidos): zstd se instalado, senão gzip."""
+    data = html.encode("utf-8")
+    if ZSTD_AVAILABLE:
+        return ".zst", zstandard.ZstdCompressor(level=6).compress(data)
+    return ".gz", gzip.compress(data, compresslevel=6)
+
+
+def read_object(path):
+    """
+    Lê e descomprime um objeto do cache (pode ser chamado nos workers, sem o índice).
+    Gera um dos READ_ERRORS se o objeto não puder ser lido.
+    """
+    if path.endswith(".zst") and not ZSTD_AVAILABLE:
+        raise OSError(f"Pacote 'zstandard' não instalado - objeto ilegível: {path}")
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".zst"):
+        data = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        data = gzip.decompress(data)
+    return data.decode("utf-8")
+
+
+def put(url, html, target=None):
+    """
+    Guarda o HTML da página (target é o target_key do alvo). Páginas com o mesmo conteúdo (mesmo hash) compartilham
+    o arquivo; a URL passa a apontar para a versão mais recente. Retorna o hash.
+    """
+    global _total_bytes
+    if not PAGE_CACHE_ENABLED:
+        return None
+
+    index = _load()
+    digest = content_hash(html)
+    now = time.time()
+    with _lock:
+        stored = index["objects"].get(digest)
+    if stored is None:
+        suffix, blob = compress(html)
+        name = f"{digest}{suffix}"
+        path = object_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Nome único: outra thread ou processo pode estar gravando o mesmo objeto
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(blob)
+        os.replace(temp_path, path)
+        stored = {"file": name, "size": len(blob), "atime": now}
+
+    with _lock:
+        stored["atime"] = now
+        if digest not in index["objects"]:
+            index["objects"][digest] = stored
+            _total_bytes += stored["size"]
+        index["urls"][url] = {"hash": digest, "target": target, "fetched": now}
+        if _total_bytes > PAGE_CACHE_MAX_MB * 2 ** 20:
+            _evict(index, PAGE_CACHE_MAX_MB * 2 ** 20 * EVICT_TO)
+    return digest
+
+
+def get(url):
+    """HTML guardado para a URL (None se não estiver no cache)."""
+    path = path_for(url)
+    return read_object(path) if path is not None else None
+
+
+def path_for(url):
+    """Arquivo com o HTML da URL, marcado como acessado agora (None se não estiver no cache)."""
+    index = _load()
+    with _lock:
+        entry = index["urls"].get(url)
+        stored = index["objects"].get(entry["hash"]) if entry else None
+        if stored is None:
+            return None
+        stored["atime"] = time.time()
+    return object_path(stored["file"])
+
+
+def entries():
+    """(url, {"hash", "target", "fetched"}) de todas as páginas do cache, da mais antiga à mais recente."""
+    index = _load()
+    with _lock:
+        return sorted(index["urls"].items(), key=lambda item: item[1]["fetched"])
+
+
+def size():
+    """Bytes ocupados pelos arquivos comprimidos do cache."""
+    _load()
+    return _total_bytes
+
+
+def _evict(index, limit):
+    # Descarta os objetos lidos há mais tempo e as URLs que apontavam para eles
+    global _total_bytes
+    evicted = set()
+    for digest, stored in sorted(index["objects"].items(), key=lambda item: item[1]["atime"]):
+        if _total_bytes <= limit:
+            break
+        try:
+            os.remove(object_path(stored["file"]))
+        except FileNotFoundError:
+            pass
+        _total_bytes -= stored["size"]
+        evicted.add(digest)
+        del index["objects"][digest]
+    if evicted:
+        index["urls"] = {url: entry for url, entry in index["urls"].items() if entry["hash"] not in evicted}
+
+
+def save_page_cache():
+    """Grava o índice em disco (gravação atômica via arquivo temporário)."""
+    if _index is None:
+        return
+
+    os.makedirs(PAGE_CACHE_DIR, exist_ok=True)
+    temp_path = f"{_index_path()}.tmp"
+    with _lock:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(_index, f, ensure_ascii=False)
+    os.replace(temp_path, _index_path())
+
+
+def clear_page_cache():
+    """Descarta o índice em memória; a próxima consulta relê o arquivo."""
+    global _index
+    with _lock:
+        _index = None
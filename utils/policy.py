@@ -0,0 +1,255 @@
+# utils/policy.py
+# Política de requisições por host: limite de taxa, novas tentativas com backoff e circuit breaker
+
+import email.utils
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+# Requisições por segundo para um mesmo host (0 desabilita o limite) e rajada permitida
+RATE_PER_HOST = float(os.environ.get("CRAWL_RATE_PER_HOST", 2.0))
+RATE_BURST = int(os.environ.get("CRAWL_RATE_BURST", 4))
+# Novas tentativas após timeout, erro de conexão, 429 ou 5xx
+MAX_RETRIES = int(os.environ.get("CRAWL_MAX_RETRIES", 3))
+BACKOFF_BASE = float(os.environ.get("CRAWL_BACKOFF_BASE", 0.5))
+BACKOFF_MAX = float(os.environ.get("CRAWL_BACKOFF_MAX", 30.0))
+# Retry-After maior que isso desiste da requisição em vez de esperar
+RETRY_AFTER_MAX = float(os.environ.get("CRAWL_RETRY_AFTER_MAX", 120.0))
+# Falhas seguidas que abrem o circuito do host e tempo até uma nova tentativa
+BREAKER_THRESHOLD = int(os.environ.get("CRAWL_BREAKER_THRESHOLD", 5))
+BREAKER_COOLDOWN = float(os.environ.get("CRAWL_BREAKER_COOLDOWN", 300.0))
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_default_policy = None
+_default_lock = threading.Lock()
+
+
+class HostUnavailable(Exception):
+    """O circuito do host está aberto: as requisições para ele são puladas até o fim da espera."""
+
+
+def is_permanent_failure(error):
+    """
+    True para falhas que se repetiriam em uma nova execução: respostas 4xx (exceto 408
+    e 429) e páginas sem os elementos dos seletores (AttributeError). Timeouts, erros
+    de conexão e 5xx são temporários.
+    """
+    if isinstance(error, AttributeError):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status is not None and 400 <= status < 500 and status not in (408, 429)
+
+
+class TokenBucket:
+    """
+    Balde de fichas: permite rajadas de até 'burst' requisições e, na média, 'rate' por segundo.
+    reserve() reserva uma ficha e retorna quantos segundos esperar antes de usá-la.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        if self.rate <= 0:
+            return max(0.0, self.paused_until - self.clock())
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.paused_until - now)
+
+    def pause(self, seconds):
+        """Segura todas as requisições ao host (por exemplo, após um Retry-After)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+
+class CircuitBreaker:
+    """
+    Abre depois de 'threshold' falhas seguidas; enquanto aberto as requisições são
+    recusadas. Passado o 'cooldown' o circuito fica meio aberto: uma única requisição
+    de teste é liberada e as demais continuam recusadas até o resultado dela. Se der
+    certo o circuito fecha, se falhar ele abre de novo. Um teste sem resultado (a
+    requisição foi cancelada, por exemplo) libera outro depois de mais um 'cooldown'.
+    """
+
+    def __init__(self, threshold, cooldown, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.probe_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """True enquanto as requisições são recusadas (aberto ou com o teste em andamento)."""
+        if self.opened_at is None:
+            return False
+        now = self.clock()
+        if now - self.opened_at < self.cooldown:
+            return True
+        return self.probe_at is not None and now - self.probe_at < self.cooldown
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.is_open:
+                return False
+            # Meio aberto: esta é a requisição de teste
+            self.probe_at = self.clock()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probe_at is not None or (self.threshold > 0 and self.failures >= self.threshold):
+                self.opened_at = self.clock()
+                self.probe_at = None
+
+
+def retry_after(headers):
+    """Segundos pedidos pelo cabeçalho Retry-After (número ou data HTTP), ou None."""
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class FetchPolicy:
+    """
+    Estado por host compartilhado pelas requisições (baldes de fichas e circuit breakers).
+
+    Uso, a cada tentativa:
+        wait = policy.before_request(host)      # HostUnavailable se o circuito estiver aberto
+        ... espera 'wait' segundos e faz a requisição ...
+        delay = policy.after_response(host, attempt, status_code, headers, error)
+        # None: resultado final; senão, espera 'delay' segundos e tenta de novo
+    """
+
+    def __init__(self, rate=None, burst=None, max_retries=None, backoff_base=None, backoff_max=None,
+                 breaker_threshold=None, breaker_cooldown=None, clock=time.monotonic):
+        self.rate = RATE_PER_HOST if rate is None else rate
+        self.burst = RATE_BURST if burst is None else burst
+        self.max_retries = MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = BACKOFF_MAX if backoff_max is None else backoff_max
+        self.breaker_threshold = BREAKER_THRESHOLD if breaker_threshold is None else breaker_threshold
+        self.breaker_cooldown = BREAKER_COOLDOWN if breaker_cooldown is None else breaker_cooldown
+        self.clock = clock
+        self._buckets = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst, self.clock)
+            return self._buckets[host]
+
+    def breaker(self, host):
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown, self.clock)
+            return self._breakers[host]
+
+    def backoff(self, attempt):
+        """Backoff exponencial com jitter completo: aleatório entre 0 e base * 2^tentativa."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def before_request(self, host):
+        if not self.breaker(host).allow():
+            raise HostUnavailable(f"Host com falhas seguidas, ignorado temporariamente: {host}")
+        return self.bucket(host).reserve()
+
+    def after_response(self, host, attempt, status_code=None, headers=None, error=None):
+        """Registra o resultado da tentativa e retorna a espera até a próxima, ou None se não há nova tentativa."""
+        breaker = self.breaker(host)
+        if error is None and status_code not in RETRY_STATUSES:
+            breaker.record_success()
+            return None
+
+        breaker.record_failure()
+        if attempt >= self.max_retries or breaker.is_open:
+            return None
+
+        delay = self.backoff(attempt)
+        requested = retry_after(headers) if error is None else None
+        if requested is not None:
+            if requested > RETRY_AFTER_MAX:
+                return None
+            self.bucket(host).pause(requested)
+            delay = max(delay, requested)
+        return delay
+
+
+def get_policy():
+    """Política compartilhada pelas requisições síncronas (modo serial)."""
+    global _default_policy
+    if _default_policy is None:
+        with _default_lock:
+            if _default_policy is None:
+                _default_policy = FetchPolicy()
+    return _default_policy
+
+
+def reset_policy():
+    """Descarta o estado por host da política compartilhada."""
+    global _default_policy
+    with _default_lock:
+        _default_policy = None
+
+
+def get(url, policy=None, **kwargs):
+    """
+    requests.get com a política do host: espera o limite de taxa, tenta de novo
+    timeouts, erros de conexão, 429 e 5xx (respeitando Retry-After) e recusa hosts
+    com o circuito aberto (HostUnavailable). A última resposta é retornada como veio;
+    raise_for_status() continua com quem chamou.
+    """
+    policy = policy or get_policy()
+    host = urlparse(url).netloc
+    attempt = 0
+    while True:
+        time.sleep(policy.before_request(host))
+        try:
+            response = requests.get(url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            delay = policy.after_response(host, attempt, error=e)
+            if delay is None:
+                raise
+        else:
+            delay = policy.after_response(host, attempt, response.status_code, response.headers)
+            if delay is None:
+                return response
+            response.close()
+        time.sleep(delay)
+        attempt += 1
@@ -0,0 +1,113 @@
+# utils/reprocess.py
+# Modo reprocess: refaz extração, filtro e briefing a partir das páginas guardadas em cache, sem rede
+
+import os
+from datetime import datetime
+
+import scrapers.engine
+import utils.crawler
+import utils.db
+import utils.metrics
+import utils.minhash
+import utils.md
+import utils.page_cache
+
+# Processos de parse/extração (0 executa tudo no processo atual)
+REPROCESS_WORKERS = int(os.environ.get("REPROCESS_WORKERS", os.cpu_count() or 1))
+
+
+def reprocess_filename(base_dir="briefings"):
+    """Briefing próprio de cada reprocessamento, para não misturar com o briefing do dia."""
+    os.makedirs(base_dir, exist_ok=True)
+    return os.path.join(base_dir, f"{datetime.now().strftime('%Y-%m-%d-%H%M%S')}-reprocess.md")
+
+
+def reprocess_page(path, target, url):
+    """
+    Etapas de parse/extração e filtro de uma página do cache (executadas no pool de processos).
+    Retorna o item do briefing ou None se a página não contém as palavras-chave, se
+    os seletores atuais não encontram o título e o conteúdo ou se o objeto do cache
+    não pode ser lido (arquivo truncado ou apagado, compressão sem o pacote instalado).
+    """
+    try:
+        html = utils.page_cache.read_object(path)
+    except utils.page_cache.READ_ERRORS as e:
+        print(f"[WARN] Página ignorada - objeto do cache ilegível | URL: {url} | {e!r}")
+        return None
+    try:
+        return utils.crawler.extract_item(html, target, url)
+    except AttributeError as e:
+        print(f"[WARN] Página ignorada - seletores não encontrados | URL: {url} | {e}")
+        return None
+
+
+def drop_near_duplicates(items, threshold=None):
+    """
+    Remove as notícias quase idênticas a outra do mesmo reprocessamento, mantendo a
+    primeira. A comparação é feita só entre as páginas do cache (sem consultar o banco).
+    """
+    if threshold is None:
+        threshold = utils.db.NEAR_DUP_THRESHOLD
+
+    bands = {}
+    kept = []
+    for url, item in items:
+        signature = item.pop("signature", None) if item is not None else None
+        if signature is not None:
+            signature = utils.minhash.from_bytes(signature)
+            keys = utils.minhash.band_keys(signature)
+            duplicate = next((other for key in keys for other, other_signature in bands.get(key, ())
+                              if utils.minhash.similarity(signature, other_signature) >= threshold), None)
+            if duplicate is not None:
+                print(f"Página ignorada - mesma notícia que {duplicate}")
+                utils.metrics.incr("near_duplicates", target=item.get('source'))
+                continue
+            for key in keys:
+                bands.setdefault(key, []).append((url, signature))
+        kept.append((url, item))
+    return kept
+
+
+def run(targets, workers=REPROCESS_WORKERS, nome_arquivo=None):
+    """
+    Reprocessa as páginas do cache dos alvos da configuração com os seletores, as
+    palavras-chave e o resumo atuais e grava um briefing novo (briefings/...-reprocess.md).
+    Nada é baixado nem registrado no banco; o parse é distribuído entre os processos.
+
+    Args:
+        targets (list): Alvos de configs/urls.json (as páginas são associadas pelo "label")
+        workers (int): Processos para parse/extração (0 usa o processo atual)
+        nome_arquivo (str, optional): Arquivo do briefing gerado
+    """
+    scrapers.engine.validate(targets)
+    by_key = {utils.page_cache.target_key(target): target for target in targets}
+
+    pages = []
+    for url, entry in utils.page_cache.entries():
+        target = by_key.get(entry["target"])
+        path = utils.page_cache.path_for(url) if target is not None else None
+        if path is not None:
+            pages.append((url, path, target))
+    print(f"[INFO] Reprocessando {len(pages)} páginas do cache")
+
+    if workers > 0 and pages:
+        with utils.crawler.make_parse_pool(workers) as executor:
+            futures = [executor.submit(utils.metrics.run_collected, reprocess_page, path, target, url)
+                       for url, path, target in pages]
+            results = [future.result() for future in futures]
+    else:
+        results = [utils.metrics.run_collected(reprocess_page, path, target, url) for url, path, target in pages]
+
+    items = []
+    for (url, path, target), (item, snapshot) in zip(pages, results):
+        utils.metrics.merge(snapshot)
+        items.append((url, item))
+
+    items = drop_near_duplicates(items)
+    utils.crawler.summarize_items(items)
+
+    utils.md.open_briefing(nome_arquivo or reprocess_filename())
+    try:
+        utils.crawler.write_items(items, {url for url, item in items})
+    finally:
+        utils.md.close_briefing()
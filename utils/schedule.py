@@ -0,0 +1,90 @@
+# utils/schedule.py
+# Agendamento por alvo: só os alvos ativos e cujo intervalo já passou são coletados
+
+import json
+import os
+import threading
+import time
+
+SCHEDULE_PATH = os.environ.get("SCHEDULE_PATH", os.path.join("db", "schedule.json"))
+# Intervalo padrão entre coletas de um alvo, em minutos (0 coleta a cada execução)
+DEFAULT_INTERVAL = int(os.environ.get("CRAWL_INTERVAL_MINUTES", 0))
+
+_last_crawl = None
+_lock = threading.Lock()
+
+
+def _load():
+    global _last_crawl
+    if _last_crawl is None:
+        with _lock:
+            if _last_crawl is None:
+                entries = {}
+                if os.path.exists(SCHEDULE_PATH):
+                    with open(SCHEDULE_PATH, "r", encoding="utf-8") as f:
+                        entries = json.load(f)
+                _last_crawl = entries
+    return _last_crawl
+
+
+def interval(target):
+    """Intervalo do alvo em segundos (chave "interval" de configs/urls.json, em minutos)."""
+    return target.get('interval', DEFAULT_INTERVAL) * 60
+
+
+def next_run(target):
+    """Horário (epoch) em que o alvo volta a ser coletado; 0 se nunca foi coletado."""
+    last = _load().get(target['url'])
+    return 0 if last is None else last + interval(target)
+
+
+def is_due(target, now=None):
+    """Retorna True se o alvo está ativo e o seu intervalo desde a última coleta já passou."""
+    if not target.get('active', True):
+        return False
+    now = time.time() if now is None else now
+    return next_run(target) <= now
+
+
+def due_targets(targets, now=None):
+    """Filtra os alvos que devem ser coletados agora, mantendo a ordem da configuração."""
+    due = []
+    for target in targets:
+        if not target.get('active', True):
+            print(f"[INFO] Alvo inativo | {target.get('label', target['url'])}")
+        elif not is_due(target, now):
+            print(f"[INFO] Alvo fora do intervalo | {target.get('label', target['url'])}")
+        else:
+            due.append(target)
+    return due
+
+
+def mark_crawled(target, now=None):
+    """
+    Registra a coleta do alvo.
+    Deve ser chamado só depois que o alvo foi processado sem erros, para que uma
+    falha faça o alvo ser coletado de novo na próxima execução.
+    """
+    entries = _load()
+    with _lock:
+        entries[target['url']] = time.time() if now is None else now
+
+
+def save_schedule():
+    """Grava os horários da última coleta em disco (gravação atômica via arquivo temporário)."""
+    if _last_crawl is None:
+        return
+
+    os.makedirs(os.path.dirname(SCHEDULE_PATH) or ".", exist_ok=True)
+    temp_path = f"{SCHEDULE_PATH}.tmp"
+    with _lock:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(_last_crawl, f, indent=2)
+    os.replace(temp_path, SCHEDULE_PATH)
+
+
+def clear_schedule():
+    """Descarta os horários em memória; a próxima consulta relê o arquivo."""
+    global _last_crawl
+    with _lock:
+        _last_crawl = None
@@ -0,0 +1,262 @@
+# utils/storage.py
+# Backends de armazenamento das URLs coletadas e das assinaturas das notícias (MongoDB ou SQLite)
+
+import contextlib
+import datetime
+import os
+import sqlite3
+import threading
+
+import utils.db
+from pymongo import UpdateOne
+
+# Backends registrados (STORAGE_BACKEND -> classe)
+BACKENDS = {}
+
+# Arquivo do banco embutido (STORAGE_BACKEND=sqlite)
+SQLITE_PATH = os.environ.get("SQLITE_PATH", os.path.join("db", "scrapper.sqlite3"))
+# Limite de parâmetros por consulta (SQLITE_MAX_VARIABLE_NUMBER das versões antigas é 999)
+SQLITE_BATCH = 900
+
+
+def register(name):
+    """Decorador que registra um backend de armazenamento com esse nome."""
+    def decorator(cls):
+        cls.name = name
+        BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def open_storage(name):
+    """Cria o backend registrado com esse nome."""
+    if name not in BACKENDS:
+        raise ValueError(f"Opção inválida: {name}")
+    return BACKENDS[name]()
+
+
+def _chunks(items, size=SQLITE_BATCH):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _epoch(timestamp):
+    # Datas sem fuso (datetime.utcnow()) são UTC, como no MongoDB
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+    return timestamp.timestamp()
+
+
+class Storage:
+    """
+    Interface dos backends usados por utils.db. As funções públicas de utils.db
+    (should_scrape, filter_new_urls, save_scrapped, register_story, ...) cuidam do
+    filtro de Bloom, das métricas e da detecção de quase duplicatas; o backend só
+    guarda e consulta URLs e assinaturas.
+    """
+
+    name = None
+
+    def location(self):
+        """Identifica os dados do backend (servidor e coleção, arquivo...), para o snapshot do filtro de Bloom."""
+        return self.name
+
+    def contains(self, url):
+        """True se a URL já foi registrada."""
+        raise NotImplementedError
+
+    def find_urls(self, urls):
+        """Conjunto das URLs (sem repetição) que já foram registradas, em uma única consulta."""
+        raise NotImplementedError
+
+    def insert_url(self, url, timestamp):
+        """Registra a URL se ela ainda não existir; retorna True se foi registrada agora."""
+        raise NotImplementedError
+
+    def insert_urls(self, urls, timestamp):
+        """Registra as URLs (sem repetição) em lote; retorna, na ordem, as registradas agora."""
+        raise NotImplementedError
+
+    def iter_urls(self, since=None):
+        """URLs registradas a partir de since (todas, se None)."""
+        raise NotImplementedError
+
+    def find_stories(self, bands):
+        """(url, assinatura em bytes) das notícias que compartilham alguma faixa de LSH."""
+        raise NotImplementedError
+
+    def insert_story(self, url, bands, signature, timestamp):
+        """Registra a assinatura da notícia se a URL ainda não tiver uma."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+@register("mongo")
+class MongoStorage(Storage):
+    """MongoDB (padrão): coleções e índices de utils.db, com o cliente compartilhado do processo."""
+
+    def location(self):
+        return f"mongo:{utils.db.MONGO_URI}{utils.db.DB_NAME}/{utils.db.COLLECTION_NAME}"
+
+    def contains(self, url):
+        return utils.db.get_collection().find_one({"url": url}) is not None
+
+    def find_urls(self, urls):
+        cursor = utils.db.get_collection().find({"url": {"$in": urls}}, {"url": 1, "_id": 0})
+        return {doc["url"] for doc in cursor}
+
+    def insert_url(self, url, timestamp):
+        # Upsert: só grava se a URL ainda não existir, sem corrida entre workers
+        result = utils.db.get_collection().update_one(
+            {"url": url},
+            {"$setOnInsert": {"url": url, "timestamp": timestamp}},
+            upsert=True
+        )
+        return result.upserted_id is not None
+
+    def insert_urls(self, urls, timestamp):
+        result = utils.db.get_collection().bulk_write([
+            UpdateOne({"url": url}, {"$setOnInsert": {"url": url, "timestamp": timestamp}}, upsert=True)
+            for url in urls
+        ], ordered=False)
+        return [urls[index] for index in sorted(result.upserted_ids)]
+
+    def iter_urls(self, since=None):
+        query = {} if since is None else {"timestamp": {"$gte": since}}
+        for doc in utils.db.get_collection().find(query, {"url": 1, "_id": 0}, batch_size=10000):
+            yield doc["url"]
+
+    def find_stories(self, bands):
+        candidates = utils.db.get_signatures_collection().find(
+            {"bands": {"$in": bands}},
+            {"url": 1, "signature": 1, "_id": 0}
+        )
+        for doc in candidates:
+            yield doc["url"], doc["signature"]
+
+    def insert_story(self, url, bands, signature, timestamp):
+        utils.db.get_signatures_collection().update_one(
+            {"url": url},
+            {"$setOnInsert": {"url": url, "bands": bands, "signature": signature, "timestamp": timestamp}},
+            upsert=True
+        )
+
+    def close(self):
+        utils.db.close_mongo_client()
+
+
+@register("sqlite")
+class SqliteStorage(Storage):
+    """
+    Banco embutido em um arquivo (SQLITE_PATH), sem servidor: consultas pela chave
+    primária, escritas em lote em uma única transação e journal em WAL, que deixa
+    outros processos lerem enquanto um escreve. A retenção (SCRAPPED_RETENTION_DAYS)
+    é aplicada ao abrir o banco.
+    """
+
+    def __init__(self, path=None, retention_days=None):
+        self.path = path or SQLITE_PATH
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Uma conexão por processo, compartilhada pelas threads (asyncio.to_thread) com um lock
+        self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS scrapped_urls (url TEXT PRIMARY KEY, timestamp REAL NOT NULL) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS scrapped_urls_timestamp ON scrapped_urls (timestamp);
+                CREATE TABLE IF NOT EXISTS story_signatures (url TEXT PRIMARY KEY, signature BLOB NOT NULL, timestamp REAL NOT NULL) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS story_signatures_timestamp ON story_signatures (timestamp);
+                CREATE TABLE IF NOT EXISTS story_bands (band TEXT NOT NULL, url TEXT NOT NULL, PRIMARY KEY (band, url)) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS story_bands_url ON story_bands (url);
+            """)
+        self.purge(utils.db.RETENTION_DAYS if retention_days is None else retention_days)
+
+    def location(self):
+        return f"sqlite:{os.path.abspath(self.path)}"
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE: consultas e escritas da transação acontecem sem outro processo no meio
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def purge(self, retention_days):
+        """Remove as URLs e assinaturas mais antigas que a retenção (0 mantém para sempre)."""
+        if retention_days <= 0:
+            return
+        limit = _epoch(datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=retention_days))
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM scrapped_urls WHERE timestamp < ?", (limit,))
+            connection.execute(
+                "DELETE FROM story_bands WHERE url IN (SELECT url FROM story_signatures WHERE timestamp < ?)", (limit,))
+            connection.execute("DELETE FROM story_signatures WHERE timestamp < ?", (limit,))
+
+    def _existing(self, urls):
+        found = set()
+        for chunk in _chunks(urls):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._connection.execute(f"SELECT url FROM scrapped_urls WHERE url IN ({placeholders})", chunk)
+            found.update(url for url, in rows)
+        return found
+
+    def contains(self, url):
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM scrapped_urls WHERE url = ?", (url,)).fetchone() is not None
+
+    def find_urls(self, urls):
+        with self._lock:
+            return self._existing(urls)
+
+    def insert_url(self, url, timestamp):
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO scrapped_urls (url, timestamp) VALUES (?, ?)", (url, _epoch(timestamp)))
+            return cursor.rowcount == 1
+
+    def insert_urls(self, urls, timestamp):
+        with self._transaction() as connection:
+            existing = self._existing(urls)
+            new_urls = [url for url in urls if url not in existing]
+            connection.executemany("INSERT INTO scrapped_urls (url, timestamp) VALUES (?, ?)",
+                                   [(url, _epoch(timestamp)) for url in new_urls])
+        return new_urls
+
+    def iter_urls(self, since=None):
+        with self._lock:
+            if since is None:
+                rows = self._connection.execute("SELECT url FROM scrapped_urls").fetchall()
+            else:
+                rows = self._connection.execute(
+                    "SELECT url FROM scrapped_urls WHERE timestamp >= ?", (_epoch(since),)).fetchall()
+        return [url for url, in rows]
+
+    def find_stories(self, bands):
+        placeholders = ",".join("?" * len(bands))
+        with self._lock:
+            return self._connection.execute(
+                "SELECT url, signature FROM story_signatures WHERE url IN "
+                f"(SELECT url FROM story_bands WHERE band IN ({placeholders}))", bands).fetchall()
+
+    def insert_story(self, url, bands, signature, timestamp):
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO story_signatures (url, signature, timestamp) VALUES (?, ?, ?)",
+                (url, signature, _epoch(timestamp)))
+            if cursor.rowcount == 1:
+                connection.executemany(
+                    "INSERT OR IGNORE INTO story_bands (band, url) VALUES (?, ?)", [(band, url) for band in bands])
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
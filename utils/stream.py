@@ -0,0 +1,149 @@
+# utils/stream.py
+# Download em streaming das páginas filhas, parando assim que título e conteúdo foram encontrados
+
+import os
+import re
+
+import charset_normalizer
+from bs4 import BeautifulSoup
+
+import utils.html
+import utils.metrics
+import utils.policy
+
+# Modo streaming (desabilitado por padrão): lê o corpo em pedaços e para cedo
+STREAM_PAGES = os.environ.get("STREAM_PAGES", "0") == "1"
+# Máximo de bytes lidos por página
+STREAM_MAX_BYTES = int(os.environ.get("STREAM_MAX_BYTES", 1000000))
+# Caracteres de conteúdo suficientes para o resumo e a decisão por palavras-chave
+STREAM_MIN_CONTENT = int(os.environ.get("STREAM_MIN_CONTENT", 3000))
+# Primeiro ponto de verificação; os seguintes dobram de tamanho
+STREAM_FIRST_CHECK = 32 * 1024
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# A declaração de charset precisa estar nos primeiros 1024 bytes (HTML5), com folga
+_META_WINDOW = 4096
+_HEADER_CHARSET = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.I)
+# Marcador acrescentado ao fim do prefixo: fica dentro dos elementos que ainda não fecharam
+_END_SELECTOR = "i#stream-prefix-end"
+_END_MARKER = '<i id="stream-prefix-end"></i>'
+
+
+def charset_from_headers(content_type):
+    match = _HEADER_CHARSET.search(content_type or "")
+    return match.group(1) if match else None
+
+
+def charset_from_meta(prefix):
+    match = _META_CHARSET.search(prefix[:_META_WINDOW])
+    return match.group(1).decode("ascii", "ignore") if match else None
+
+
+class StreamingBody:
+    """
+    Acumula o corpo da resposta em pedaços.
+
+    A codificação vem do cabeçalho Content-Type ou da <meta charset> do início da
+    página; só se nenhum dos dois existir ela é detectada, e apenas no prefixo.
+    feed() retorna True quando vale a pena tentar extrair o conteúdo (pontos de
+    verificação que dobram de tamanho, para o custo total de parse ficar linear).
+    """
+
+    def __init__(self, content_type=None, max_bytes=None, first_check=None):
+        self.raw = bytearray()
+        self.max_bytes = max_bytes or STREAM_MAX_BYTES
+        self.exhausted = False
+        self.encoding = charset_from_headers(content_type)
+        self._next_check = first_check or STREAM_FIRST_CHECK
+
+    def feed(self, chunk):
+        self.raw += chunk
+        if len(self.raw) >= self.max_bytes:
+            del self.raw[self.max_bytes:]
+            self.exhausted = True
+            return True
+        if len(self.raw) >= self._next_check:
+            self._next_check = max(self._next_check * 2, len(self.raw) + 1)
+            return True
+        return False
+
+    def _resolve_encoding(self):
+        if self.encoding is None and (len(self.raw) >= _META_WINDOW or self.exhausted):
+            self.encoding = charset_from_meta(bytes(self.raw))
+            if self.encoding is None:
+                match = charset_normalizer.from_bytes(bytes(self.raw[:STREAM_FIRST_CHECK])).best()
+                self.encoding = match.encoding if match else "utf-8"
+        return self.encoding or charset_from_meta(bytes(self.raw)) or "utf-8"
+
+    @property
+    def text(self):
+        try:
+            return self.raw.decode(self._resolve_encoding(), errors="replace")
+        except LookupError:
+            return self.raw.decode("utf-8", errors="replace")
+
+
+def _with_end_marker(html):
+    # Um prefixo cortado no meio de uma tag engoliria o marcador; a tag incompleta é descartada
+    if html.rfind('<') > html.rfind('>'):
+        html = html[:html.rfind('<')]
+    return html + _END_MARKER
+
+
+def _is_closed(element, marker):
+    # O elemento terminou no HTML se o marcador do fim do prefixo ficou fora dele
+    # (o parse limitado descarta o que vem depois, então não dá para olhar os irmãos)
+    return marker is not None and element not in marker.parents
+
+
+@utils.metrics.timed("parse")
+def extract_prefix(html, target, final=False, min_content=STREAM_MIN_CONTENT):
+    """
+    Tenta extrair (título, conteúdo) de um prefixo da página.
+
+    Retorna None enquanto o título ou o conteúdo ainda podem estar incompletos.
+    O conteúdo é considerado suficiente quando seu elemento já fechou ou quando
+    tem pelo menos min_content caracteres. Com final=True (fim do corpo ou do
+    orçamento de bytes) extrai o que houver, gerando AttributeError se faltar algum
+    elemento, como parse_page.
+    """
+    parser = utils.html.get_parser(target)
+    if parser == 'selectolax':
+        parser = 'lxml' if utils.html.LXML_AVAILABLE else 'html.parser'
+
+    title_selector, content_selector = target['page']['title'], target['page']['content']
+    if final:
+        soup = BeautifulSoup(html, parser, parse_only=utils.html.strainer_for(title_selector, content_selector))
+        title = utils.html.compile_selector(title_selector).select_one(soup)
+        content = utils.html.compile_selector(content_selector).select_one(soup)
+        return title.get_text(' ', strip=True), content.get_text(' ', strip=True)
+
+    soup = BeautifulSoup(_with_end_marker(html), parser,
+                         parse_only=utils.html.strainer_for(title_selector, content_selector, _END_SELECTOR))
+    title = utils.html.compile_selector(title_selector).select_one(soup)
+    content = utils.html.compile_selector(content_selector).select_one(soup)
+    marker = utils.html.compile_selector(_END_SELECTOR).select_one(soup)
+
+    if title is None or content is None or not _is_closed(title, marker):
+        return None
+    content_text = content.get_text(' ', strip=True)
+    if _is_closed(content, marker) or len(content_text) >= min_content:
+        return title.get_text(' ', strip=True), content_text
+    return None
+
+
+def fetch_and_extract(url, target, max_bytes=None):
+    """Versão síncrona (requests) do download em streaming; retorna (título, conteúdo)."""
+    with utils.policy.get(url, timeout=10, stream=True) as response:
+        response.raise_for_status()  # Garante que a resposta foi 200
+        body = StreamingBody(response.headers.get('Content-Type'), max_bytes)
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            if body.feed(chunk):
+                result = extract_prefix(body.text, target)
+                if result is not None:
+                    return result
+            if body.exhausted:
+                break
+
+    return extract_prefix(body.text, target, final=True)
@@ -0,0 +1,150 @@
+# utils/summary.py
+# Resumo extrativo: escolhe as frases mais relevantes do texto dentro de um limite de caracteres
+
+import os
+import re
+
+import numpy as np
+
+import utils.keywords
+import utils.metrics
+
+# Limite de caracteres do resumo
+SUMMARY_CHARS = int(os.environ.get("SUMMARY_CHARS", 300))
+# Peso extra de cada palavra-chave encontrada na frase
+KEYWORD_WEIGHT = float(os.environ.get("SUMMARY_KEYWORD_WEIGHT", 2.0))
+
+# Fim de frase seguido de espaço e de um início de frase (maiúscula, número, aspas...)
+_SENTENCE_END = re.compile(r'(?<=[.!?…])\s+(?=["“\'(\[]?[A-ZÀ-Ý0-9])')
+_TOKEN = re.compile(r'\w+')
+
+# Palavras muito comuns (pt/en) que não ajudam a distinguir as frases
+STOPWORDS = frozenset("""
+a o as os um uma uns umas de do da dos das em no na nos nas por pelo pela pelos pelas para
+com sem sob sobre e ou mas que se ao aos à às é ser foi sao são esta está estao estão era
+isso isto esse essa este como mais menos muito tambem também ja já nao não seu sua seus suas
+the of and or to in on for with is are was were be been it its this that as at by from an
+""".split())
+
+
+def split_sentences(text):
+    """Divide o texto em frases, sem quebrar abreviações seguidas de minúscula."""
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text.strip()) if sentence.strip()]
+
+
+def tokenize(sentence):
+    return [token for token in _TOKEN.findall(utils.keywords.normalize_text(sentence))
+            if len(token) > 1 and token not in STOPWORDS]
+
+
+def truncate(text, limit):
+    """Corta o texto no limite, sem partir a última palavra quando possível."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    if not text[limit].isspace() and ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip()
+
+
+def _keyword_terms(keywords):
+    # Palavras-chave compostas contam por cada termo ("machine learning" -> machine, learning)
+    return {token for keyword in keywords for token in tokenize(keyword)}
+
+
+def score_sentences(documents, keywords=()):
+    """
+    Pontua as frases de todos os documentos de uma vez.
+
+    documents é uma lista de listas de frases. O peso de cada termo é TF-IDF, com o
+    IDF calculado uma única vez sobre o conjunto inteiro de documentos (se há um só
+    documento, cada frase conta como um documento). A pontuação de uma frase é a soma
+    dos pesos dos seus termos dividida pela raiz do número de termos, mais
+    KEYWORD_WEIGHT por ocorrência de palavra-chave.
+    Retorna uma lista com um array de pontuações por documento.
+    """
+    vocabulary = {}
+    rows, terms, doc_of_row = [], [], []
+    sentence_counts = []
+    row = 0
+    for doc_index, sentences in enumerate(documents):
+        sentence_counts.append(len(sentences))
+        for sentence in sentences:
+            for token in tokenize(sentence):
+                rows.append(row)
+                terms.append(vocabulary.setdefault(token, len(vocabulary)))
+            doc_of_row.append(doc_index)
+            row += 1
+
+    total_rows = row
+    if total_rows == 0:
+        return [np.zeros(0) for _ in documents]
+
+    rows = np.asarray(rows, dtype=np.int64)
+    terms = np.asarray(terms, dtype=np.int64)
+    doc_of_row = np.asarray(doc_of_row, dtype=np.int64)
+    n_terms = len(vocabulary)
+
+    # Unidade do IDF: documentos, ou frases quando só há um documento
+    units = doc_of_row[rows] if len(documents) > 1 else rows
+    n_units = len(documents) if len(documents) > 1 else total_rows
+    if len(terms):
+        pairs = np.unique(units * n_terms + terms)
+        df = np.bincount(pairs % n_terms, minlength=n_terms)
+    else:
+        df = np.zeros(n_terms, dtype=np.int64)
+    idf = np.log((1 + n_units) / (1 + df)) + 1
+
+    is_keyword = np.zeros(n_terms, dtype=np.float64)
+    keyword_ids = [vocabulary[term] for term in _keyword_terms(keywords) if term in vocabulary]
+    is_keyword[keyword_ids] = 1.0
+
+    length = np.bincount(rows, minlength=total_rows)
+    weight = np.bincount(rows, weights=idf[terms], minlength=total_rows)
+    hits = np.bincount(rows, weights=is_keyword[terms], minlength=total_rows)
+    scores = weight / np.sqrt(np.maximum(length, 1)) + KEYWORD_WEIGHT * hits
+
+    return np.split(scores, np.cumsum(sentence_counts)[:-1])
+
+
+def select_sentences(sentences, scores, budget):
+    """
+    Escolhe as frases de maior pontuação que cabem no limite e as devolve na ordem do texto.
+    Se nem a melhor frase couber, ela é cortada no limite.
+    """
+    text = " ".join(sentences)
+    if len(text) <= budget:
+        return text
+
+    chosen, used = [], 0
+    for index in np.argsort(-scores, kind="stable"):
+        length = len(sentences[index]) + (1 if chosen else 0)
+        if used + length <= budget:
+            chosen.append(index)
+            used += length
+
+    if not chosen:
+        return truncate(sentences[int(np.argmax(scores))], budget)
+    return " ".join(sentences[index] for index in sorted(chosen))
+
+
+@utils.metrics.timed("summarize")
+def summarize_many(texts, keywords=None, budget=None):
+    """
+    Resume vários textos de uma vez (por exemplo, todas as notícias de uma execução),
+    com o IDF calculado sobre o conjunto. Se keywords for None, usa as palavras-chave
+    do arquivo de configuração.
+    """
+    budget = budget or SUMMARY_CHARS
+    if keywords is None:
+        keywords = utils.keywords.get_matcher().keywords
+
+    documents = [split_sentences(text) for text in texts]
+    scores = score_sentences(documents, keywords)
+    return [select_sentences(sentences, doc_scores, budget) if sentences else ""
+            for sentences, doc_scores in zip(documents, scores)]
+
+
+def summarize(text, keywords=None, budget=None):
+    """Resume um único texto; o IDF é calculado sobre as frases do próprio texto."""
+    return summarize_many([text], keywords, budget)[0]